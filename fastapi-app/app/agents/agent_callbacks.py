@@ -0,0 +1,88 @@
+import time
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.services.metrics import LLM_CALL_SECONDS, LLM_TOKENS_TOTAL
+from app.services.tracing import begin_span
+from .context_budget import estimate_tokens
+
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    """Pull prompt/completion token counts from an LLM result, if reported."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    prompt = usage.get("prompt_tokens") or usage.get("input_tokens") or 0
+    completion = usage.get("completion_tokens") or usage.get("output_tokens") or 0
+
+    if not (prompt or completion):
+        for generations in response.generations:
+            for gen in generations:
+                meta = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                prompt += meta.get("input_tokens", 0)
+                completion += meta.get("output_tokens", 0)
+
+    return {"prompt": prompt, "completion": completion}
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records latency, token usage and a trace span for every LLM call the agent makes."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._starts: Dict[UUID, float] = {}
+        self._spans: Dict[UUID, Any] = {}
+        # LLM round trips made through this handler (one handler per agent query)
+        self.calls = 0
+        # Prompt tokens per call, in call order (reported by the provider, else estimated)
+        self.prompt_tokens: List[int] = []
+        self._call_index: Dict[UUID, int] = {}
+
+    def _record_prompt(self, run_id: UUID, estimate: int):
+        self._call_index[run_id] = len(self.prompt_tokens)
+        self.prompt_tokens.append(estimate)
+
+    def _start(self, run_id: UUID):
+        self.calls += 1
+        self._starts[run_id] = time.perf_counter()
+        span = begin_span("llm.call", {"llm.model": self.model})
+        if span is not None:
+            self._spans[run_id] = span
+
+    def _finish(self, run_id: UUID, error: BaseException = None) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - start, model=self.model)
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            span.end()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any):
+        self._record_prompt(run_id, sum(estimate_tokens(p) for p in prompts))
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any):
+        self._record_prompt(run_id, sum(estimate_tokens(m.content) + estimate_tokens(getattr(m, "tool_calls", None))
+                                        for batch in messages for m in batch))
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        usage = _token_usage(response)
+        index = self._call_index.pop(run_id, None)
+        if index is not None and usage["prompt"]:
+            self.prompt_tokens[index] = usage["prompt"]
+        span = self._spans.get(run_id)
+        if span is not None:
+            span.set_attribute("llm.prompt_tokens", usage["prompt"])
+            span.set_attribute("llm.completion_tokens", usage["completion"])
+        self._finish(run_id)
+        for kind, count in usage.items():
+            if count:
+                LLM_TOKENS_TOTAL.inc(count, model=self.model, kind=kind)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._call_index.pop(run_id, None)
+        self._finish(run_id, error)
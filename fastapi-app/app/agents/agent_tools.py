@@ -1,12 +1,23 @@
 from langchain_core.tools import tool
 from app.services.vector_service import search_similar
-from typing import Any
-import os
+from app.services.workflow_index import index_workflow
+from app.services.workflow_templates import index_template
+from app.services.dag_graph import validate_for_save
+from app.services.workflow_repository import GRAPH_FILE
+from app.services.workflow_store import create_workflow, new_workflow_id
+from app.services.tracing import traced
+from .context_budget import current_budget
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from contextvars import ContextVar
 import json
-import uuid
 from datetime import datetime
 
+# Prompt of the agent query being served, recorded in the workflows it saves
+request_prompt: ContextVar[Optional[str]] = ContextVar("agent_request_prompt", default=None)
+
 @tool
+@traced("tool.search_apis")
 def search_apis(query: str) -> str:
     """
     Search for existing APIs in the database.
@@ -21,21 +32,12 @@ def search_apis(query: str) -> str:
     results = search_similar(query, top_k=10)
     if not results:
         return "No similar APIs found in the database. Try different keywords."
-    
-    formatted = []
-    for res in results:
-        meta = res['metadata']
-        dist = res.get('hybrid_distance', res.get('distance', 0.0))
-        score = max(0, min(100, int((1 - dist) * 100)))
-        
-        info = (f"System: {meta.get('system_name', 'Unknown')} | API: {meta.get('api_name', 'Unknown')}\n"
-                f"Description: {meta.get('description', 'No description')}\n"
-                f"Match Score: {score}%")
-        formatted.append(info)
-    
-    return "\n\n".join(formatted)
+
+    # Sized to the query's token budget; APIs already shown are listed by name only
+    return current_budget().format_search_results(results)
 
 @tool
+@traced("tool.evaluate_feasibility")
 def evaluate_feasibility(input_data: str) -> str:
     """
     Evaluate if a workflow prompt is feasible based on retrieved APIs.
@@ -44,7 +46,77 @@ def evaluate_feasibility(input_data: str) -> str:
     """
     return "Please analyze the provided APIs against the prompt and give your judgment in the format: [FEASIBILITY_REPORT: is_feasible=True/False, score=0.8, reason='...']"
 
+def _persist_workflow(workflow_name: str, workflow_steps: Any, dag_python: str) -> str:
+    """
+    Validate the DAG, write workflow.json, airflow_dag.py and the extracted
+    graph.json as a new workflow and register it in the workflow index and
+    the template collection.
+
+    Args:
+        workflow_name: Workflow name
+        workflow_steps: Ordered steps (or {"raw_info": ...} for free text)
+        dag_python: airflow_dag.py source
+
+    Returns:
+        str: The new workflow ID (folder name)
+
+    Raises:
+        ValueError: If the DAG has errors and DAG_VALIDATION_MODE is strict
+    """
+    # 1. Create a unique ID/folder name
+    workflow_id = new_workflow_id()
+
+    # 2. Workflow JSON
+    workflow_data = {
+        "id": workflow_id,
+        "name": workflow_name,
+        "status": "draft",
+        "created_at": str(datetime.now()),
+        "steps": workflow_steps
+    }
+    if request_prompt.get():
+        workflow_data["prompt"] = request_prompt.get()
+
+    # 3. Python/Airflow file
+    if not dag_python or "DAG" not in dag_python:
+         dag_python = f"""from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+
+# Workflow: {workflow_name}
+# ID: {workflow_id}
+
+with DAG('{workflow_id}', start_date=datetime(2025,1,1), schedule_interval=None) as dag:
+    # Steps: {json.dumps(workflow_steps)}
+    pass
+"""
+    # 4. Static task graph: broken DAGs are rejected now instead of failing at run time
+    graph = validate_for_save(dag_python)
+    for problem in graph["errors"] + graph["warnings"]:
+        print(f"⚠️ [TOOL WARNING] {workflow_id} DAG: {problem}")
+
+    # DAG first, then workflow.json; readers never see a workflow without its DAG
+    json_mtime = create_workflow(workflow_id, workflow_data, dag_python,
+                                 extra_files={GRAPH_FILE: json.dumps(graph, indent=4)})
+
+    # 5. Register in the workflow index so listings don't rescan the disk
+    try:
+        index_workflow(workflow_data, file_mtime=json_mtime)
+    except Exception as e:
+        print(f"⚠️ [TOOL WARNING] Workflow index update failed: {e}")
+
+    # 6. Make it available as a template for similar requests
+    try:
+        index_template(workflow_data, file_mtime=json_mtime)
+    except Exception as e:
+        print(f"⚠️ [TOOL WARNING] Workflow template update failed: {e}")
+
+    print(f"✅ [TOOL SUCCESS] Workflow files created: {workflow_id}")
+    return workflow_id
+
+
 @tool
+@traced("tool.save_workflow_files")
 def save_workflow_files(json_input: str) -> str:
     """
     Create and save workflow files (JSON and Airflow DAG) to the disk.
@@ -60,56 +132,68 @@ def save_workflow_files(json_input: str) -> str:
         steps_json = data.get("steps_json", "[]")
         dag_python = data.get("dag_python", "")
 
-        # 1. Create a unique ID/folder name
-        workflow_id = f"wf_{uuid.uuid4().hex[:8]}"
-        base_dir = "/app/workflows"
-        workflow_dir = os.path.join(base_dir, workflow_id)
-        
-        os.makedirs(workflow_dir, exist_ok=True)
-        os.chmod(workflow_dir, 0o777)
-        
-        # 2. Save JSON file
-        json_path = os.path.join(workflow_dir, "workflow.json")
         try:
             workflow_steps = json.loads(steps_json)
         except:
             workflow_steps = {"raw_info": steps_json}
 
-        workflow_data = {
-            "id": workflow_id,
-            "name": workflow_name,
-            "status": "draft",
-            "created_at": str(datetime.now()),
-            "steps": workflow_steps
-        }
-        with open(json_path, "w") as f:
-            json.dump(workflow_data, f, indent=4)
-        os.chmod(json_path, 0o666)
-
-        # 3. Save Python/Airflow file
-        dag_path = os.path.join(workflow_dir, "airflow_dag.py")
-        
-        if not dag_python or "DAG" not in dag_python:
-             dag_python = f"""from airflow import DAG
-from airflow.operators.python import PythonOperator
-from datetime import datetime
-
-# Workflow: {workflow_name}
-# ID: {workflow_id}
-
-with DAG('{workflow_id}', start_date=datetime(2025,1,1), schedule_interval=None) as dag:
-    # Steps: {steps_json}
-    pass
-"""
-        with open(dag_path, "w") as f:
-            f.write(dag_python)
-        os.chmod(dag_path, 0o666)
-            
-        print(f"✅ [TOOL SUCCESS] Workflow files created: {workflow_id}")
+        workflow_id = _persist_workflow(workflow_name, workflow_steps, dag_python)
         return f"SUCCESS: Workflow '{workflow_name}' persisted in folder '{workflow_id}'."
     except Exception as e:
         print(f"❌ [TOOL ERROR] save_workflow_files: {e}")
         return f"ERROR: Failed to save workflow: {str(e)}"
 
+
+# ── Structured tools (native tool calling) ───────────────────────
+
+class FeasibilityReport(BaseModel):
+    is_feasible: bool = Field(description="True if the available APIs can implement every step of the request")
+    score: float = Field(ge=0.0, le=1.0, description="Confidence between 0 and 1")
+    reason: str = Field(description="One or two sentences justifying the verdict")
+
+
+class WorkflowStep(BaseModel):
+    step: int = Field(description="1-based position in the workflow")
+    system: str = Field(description="system_name of the API, e.g. UserSystem")
+    api: str = Field(description="api_name exactly as returned by search_apis, e.g. CreateUser")
+    description: Optional[str] = Field(default=None, description="What this step does")
+
+
+class SaveWorkflowInput(BaseModel):
+    workflow_name: str = Field(description="Short snake_case name for the workflow")
+    steps: List[WorkflowStep] = Field(description="Ordered workflow steps using only APIs found by search_apis")
+    dag_python: str = Field(description="Complete airflow_dag.py source with one PythonOperator per step")
+
+
+@tool(args_schema=FeasibilityReport)
+@traced("tool.report_feasibility")
+def report_feasibility(is_feasible: bool, score: float, reason: str) -> str:
+    """
+    Record the feasibility verdict for the request after searching for APIs.
+    Call exactly once, before save_workflow.
+    """
+    return f"Recorded: is_feasible={is_feasible}, score={score}"
+
+
+@tool(args_schema=SaveWorkflowInput)
+@traced("tool.save_workflow")
+def save_workflow(workflow_name: str, steps: List[WorkflowStep], dag_python: str) -> Dict[str, Any]:
+    """
+    Persist a feasible workflow (steps and Airflow DAG) and return its workflow_id.
+    Call once for every feasible request.
+    """
+    print(f"🚀 [TOOL INTERFACE] save_workflow called for '{workflow_name}'.")
+    try:
+        workflow_steps = [s.model_dump(exclude_none=True) if isinstance(s, BaseModel) else s for s in steps]
+        workflow_id = _persist_workflow(workflow_name, workflow_steps, dag_python)
+        return {"status": "success", "workflow_id": workflow_id}
+    except Exception as e:
+        print(f"❌ [TOOL ERROR] save_workflow: {e}")
+        return {"status": "error", "message": f"Failed to save workflow: {e}"}
+
+
 # List of tools for the agent to use
 tools = [search_apis, evaluate_feasibility, save_workflow_files]
+
+# Typed tools for AGENT_MODE=tool_calling
+structured_tools = [search_apis, report_feasibility, save_workflow]
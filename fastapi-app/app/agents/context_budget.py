@@ -0,0 +1,159 @@
+"""
+Agent Context Budget
+Keeps the agent's prompt small across iterations:
+
+- search_apis results are sized to AGENT_SEARCH_TOKEN_BUDGET, and APIs the
+  agent has already seen in this query are listed by name only.
+- Older tool observations in the scratchpad are replaced by one-line
+  summaries; the most recent AGENT_KEEP_RECENT_STEPS stay verbatim unless
+  the scratchpad still exceeds AGENT_SCRATCHPAD_TOKEN_BUDGET.
+
+Token counts are estimated at ~4 characters per token; Gemini's tokenizer
+isn't available offline and the estimate only has to be proportional.
+"""
+
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AGENT_SEARCH_TOKEN_BUDGET = int(os.getenv("AGENT_SEARCH_TOKEN_BUDGET", "500"))
+AGENT_SCRATCHPAD_TOKEN_BUDGET = int(os.getenv("AGENT_SCRATCHPAD_TOKEN_BUDGET", "3000"))
+AGENT_KEEP_RECENT_STEPS = int(os.getenv("AGENT_KEEP_RECENT_STEPS", "2"))
+
+CHARS_PER_TOKEN = 4
+DESCRIPTION_CHARS = 160
+SUMMARY_CHARS = 200
+
+_API_LINE = re.compile(r"System: (.+?) \| API: (.+)")
+
+
+def estimate_tokens(text: Any) -> int:
+    """Rough token count of a string (or anything with a str form)."""
+    if not text:
+        return 0
+    return max(1, len(str(text)) // CHARS_PER_TOKEN)
+
+
+class ContextBudget:
+    """Per-query budget state: which APIs the agent has already been shown."""
+
+    def __init__(self, search_tokens: int = AGENT_SEARCH_TOKEN_BUDGET):
+        self.search_tokens = search_tokens
+        self.shown: Set[Tuple[str, str]] = set()
+
+    def format_search_results(self, results: List[Dict[str, Any]]) -> str:
+        """
+        Render search hits best-first until the token budget is spent.
+
+        Args:
+            results: search_similar results (metadata + distance)
+
+        Returns:
+            str: Observation text for the agent
+        """
+        entries: List[str] = []
+        repeated: List[str] = []
+        skipped = 0
+        used = 0
+
+        for res in results:
+            meta = res["metadata"]
+            system, api = meta.get("system_name", "Unknown"), meta.get("api_name", "Unknown")
+            if (system, api) in self.shown:
+                repeated.append(f"{system}.{api}")
+                continue
+
+            dist = res.get("hybrid_distance", res.get("distance", 0.0))
+            score = max(0, min(100, int((1 - dist) * 100)))
+            description = meta.get("description", "No description")
+            if len(description) > DESCRIPTION_CHARS:
+                description = description[:DESCRIPTION_CHARS].rstrip() + "…"
+            entry = (f"System: {system} | API: {api}\n"
+                     f"Description: {description}\n"
+                     f"Match Score: {score}%")
+
+            cost = estimate_tokens(entry)
+            # Always show the best new hit, even if it alone exceeds the budget
+            if entries and used + cost > self.search_tokens:
+                skipped += 1
+                continue
+            entries.append(entry)
+            used += cost
+            self.shown.add((system, api))
+
+        parts = entries[:]
+        if repeated:
+            parts.append(f"Also matched (already shown above): {', '.join(repeated)}")
+        if skipped:
+            parts.append(f"({skipped} more matches omitted to save context; refine the query to see them)")
+        if not entries and not repeated:
+            return "No similar APIs found in the database. Try different keywords."
+        return "\n\n".join(parts)
+
+
+_current: ContextVar[Optional[ContextBudget]] = ContextVar("agent_context_budget", default=None)
+
+
+def current_budget() -> ContextBudget:
+    """The budget of the running agent query, or a fresh one outside a query."""
+    return _current.get() or ContextBudget()
+
+
+@contextmanager
+def budget_scope() -> Iterator[ContextBudget]:
+    """Give one agent query its own budget (dedup state)."""
+    budget = ContextBudget()
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+def summarize_observation(tool: str, observation: Any) -> str:
+    """One-line stand-in for an older tool observation."""
+    text = str(observation)
+    if tool == "search_apis":
+        apis = [f"{m.group(1)}.{m.group(2).strip()}" for m in _API_LINE.finditer(text)]
+        return f"[earlier search results: {', '.join(apis) if apis else 'no new APIs'}]"
+    if len(text) > SUMMARY_CHARS:
+        return text[:SUMMARY_CHARS].rstrip() + "… [truncated]"
+    return text
+
+
+def compress_steps(steps: List[Tuple[Any, Any]], keep_recent: int = AGENT_KEEP_RECENT_STEPS,
+                   budget_tokens: int = AGENT_SCRATCHPAD_TOKEN_BUDGET) -> List[Tuple[Any, Any]]:
+    """
+    Shrink the observations the next LLM call will see. The executor's own
+    intermediate_steps are left untouched.
+
+    Args:
+        steps: (AgentAction, observation) pairs so far
+        keep_recent: Observations kept verbatim at the end
+        budget_tokens: Target size of the scratchpad
+
+    Returns:
+        list: Steps with older observations summarized
+    """
+    cutoff = max(0, len(steps) - keep_recent)
+    compressed = [
+        (action, summarize_observation(action.tool, obs) if i < cutoff else obs)
+        for i, (action, obs) in enumerate(steps)
+    ]
+
+    # Still too large: summarize recent observations too, except the newest
+    total = sum(estimate_tokens(getattr(a, "log", "")) + estimate_tokens(o) for a, o in compressed)
+    i = cutoff
+    while total > budget_tokens and i < len(compressed) - 1:
+        action, obs = compressed[i]
+        summary = summarize_observation(action.tool, obs)
+        total -= estimate_tokens(obs) - estimate_tokens(summary)
+        compressed[i] = (action, summary)
+        i += 1
+    return compressed
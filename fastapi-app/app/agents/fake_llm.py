@@ -0,0 +1,151 @@
+"""
+Offline stand-in for the Gemini chat model (LLM_PROVIDER=fake).
+
+Replays a canned transcript (search -> feasibility -> save -> final answer)
+so the agent loop, tools, Chroma search and workflow persistence can be
+load-tested and benchmarked without network access or provider latency.
+FakeReActLLM serves AGENT_MODE=react, FakeToolCallingChatModel serves
+AGENT_MODE=tool_calling. The step is derived from the prompt, so one
+instance is safe to share across threads.
+"""
+
+import json
+import re
+import time
+import uuid
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+DAG_PYTHON = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+
+
+def create_user(**kwargs):
+    print("POST /api/user/create")
+    return {"user_id": "bench-user"}
+
+
+def send_welcome_email(**kwargs):
+    user = kwargs["ti"].xcom_pull(task_ids="create_user")
+    print(f"POST /api/notification/email for {user['user_id']}")
+    return {"status": "sent"}
+
+
+with DAG("bench_onboarding", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+    t1 = PythonOperator(task_id="create_user", python_callable=create_user)
+    t2 = PythonOperator(task_id="send_welcome_email", python_callable=send_welcome_email)
+    t1 >> t2
+'''
+
+SAVE_INPUT = json.dumps({
+    "workflow_name": "bench_onboarding",
+    "steps_json": json.dumps([
+        {"step": 1, "system": "UserSystem", "api": "CreateUser"},
+        {"step": 2, "system": "NotificationSystem", "api": "SendEmail"},
+    ]),
+    "dag_python": DAG_PYTHON,
+})
+
+TRANSCRIPT = [
+    "Do I need a tool? Yes\nAction: search_apis\nAction Input: create a user account",
+    "Do I need a tool? Yes\nAction: search_apis\nAction Input: send an email notification",
+    "Do I need a tool? Yes\nAction: evaluate_feasibility\n"
+    "Action Input: create user then send welcome email using UserSystem and NotificationSystem",
+    f"Do I need a tool? Yes\nAction: save_workflow_files\nAction Input: {SAVE_INPUT}",
+]
+
+FINAL_ANSWER = (
+    "I know the final answer\n"
+    "Final Answer: [FEASIBILITY_REPORT: is_feasible=True, score=0.9, "
+    "reason='UserSystem and NotificationSystem cover every step'] "
+    "Steps: CreateUser -> SendEmail. Folder ID: {workflow_id}"
+)
+
+_WORKFLOW_ID = re.compile(r"folder '(wf_[0-9a-f]+)'")
+
+
+class FakeReActLLM(LLM):
+    """Deterministic ReAct LLM."""
+
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-react"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        scratchpad = prompt.rsplit("Request:", 1)[-1]
+        step = scratchpad.count("\nObservation:")
+        if step < len(TRANSCRIPT):
+            return TRANSCRIPT[step]
+
+        match = _WORKFLOW_ID.search(scratchpad)
+        return FINAL_ANSWER.format(workflow_id=match.group(1) if match else "unknown")
+
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:8]}", "type": "tool_call"}
+
+
+TOOL_CALL_TRANSCRIPT = [
+    # Independent searches go out as parallel tool calls in one turn
+    [
+        ("search_apis", {"query": "create a user account"}),
+        ("search_apis", {"query": "send an email notification"}),
+    ],
+    [
+        ("report_feasibility", {
+            "is_feasible": True, "score": 0.9,
+            "reason": "UserSystem and NotificationSystem cover every step",
+        }),
+        ("save_workflow", {
+            "workflow_name": "bench_onboarding",
+            "steps": [
+                {"step": 1, "system": "UserSystem", "api": "CreateUser"},
+                {"step": 2, "system": "NotificationSystem", "api": "SendEmail"},
+            ],
+            "dag_python": DAG_PYTHON,
+        }),
+    ],
+]
+
+_TOOL_WORKFLOW_ID = re.compile(r'"workflow_id": "(wf_[0-9a-f]+)"')
+
+
+class FakeToolCallingChatModel(BaseChatModel):
+    """Deterministic tool-calling chat model."""
+
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeToolCallingChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        step = sum(1 for m in messages if isinstance(m, AIMessage))
+        if step < len(TOOL_CALL_TRANSCRIPT):
+            calls = [_tool_call(name, args) for name, args in TOOL_CALL_TRANSCRIPT[step]]
+            message = AIMessage(content="", tool_calls=calls)
+        else:
+            observations = " ".join(str(m.content) for m in messages if isinstance(m, ToolMessage))
+            match = _TOOL_WORKFLOW_ID.search(observations)
+            message = AIMessage(content=(
+                "Steps: CreateUser -> SendEmail. "
+                f"Workflow ID: `{match.group(1) if match else 'unknown'}`"
+            ))
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,265 @@
+"""
+LLM Providers
+Builds the chat model the agent talks to, selected by LLM_PROVIDER:
+
+- gemini (default): ChatGoogleGenerativeAI with LLM_MODEL.
+- fake: deterministic offline stand-in (see fake_llm), for load tests and
+  benchmarks of everything around the LLM.
+- record: Gemini, with every (prompt -> completion) pair appended to the
+  cassette file LLM_CASSETTE_PATH.
+- replay: answers from the cassette only, without network access. A prompt
+  that was never recorded raises CassetteMiss.
+- router: several backends with failover and optional hedging (see llm_router).
+
+Cassette keys are hashes of the request messages and bound tool names.
+Workflow IDs are masked in the key, because every run saves under a new
+random ID, and replayed completions get the IDs of the current run.
+Further providers can be added with register_provider.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+load_dotenv()
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-3-flash-preview")
+LLM_CASSETTE_PATH = Path(os.getenv(
+    "LLM_CASSETTE_PATH",
+    str(Path(__file__).resolve().parent.parent.parent / "llm_cassette.jsonl"),
+))
+# Simulated provider latency of the fake LLM
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+
+_WORKFLOW_ID = re.compile(r"wf_[0-9a-f]{8}")
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode for a prompt that is not in the cassette."""
+
+
+# ── Cassette ───────────────────────────────────────────────────────────
+
+class Cassette:
+    """JSONL file of recorded completions, keyed by request hash."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            entries = {}
+            if self.path.exists():
+                with open(self.path) as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            # Later recordings of the same request win
+                            entries[entry["key"]] = entry
+            self._entries = entries
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._load()[entry["key"]] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+
+def _workflow_ids(messages: List[BaseMessage]) -> List[str]:
+    """Workflow IDs in the conversation, in order of first appearance."""
+    seen: List[str] = []
+    for message in messages:
+        for wf_id in _WORKFLOW_ID.findall(json.dumps(message_to_dict(message), default=str)):
+            if wf_id not in seen:
+                seen.append(wf_id)
+    return seen
+
+
+def request_key(messages: List[BaseMessage], tool_names: List[str], stop: Optional[List[str]] = None) -> str:
+    """
+    Stable hash of one LLM request.
+
+    Args:
+        messages: Messages sent to the model
+        tool_names: Names of the tools bound to the model
+        stop: Stop sequences (ReAct mode)
+
+    Returns:
+        str: sha256 hex digest
+    """
+    parts = []
+    for message in messages:
+        # Tool call IDs are generated per run and carry no meaning for the answer
+        calls = [(c["name"], c["args"]) for c in getattr(message, "tool_calls", None) or []]
+        parts.append([message.type, message.content, calls])
+    material = json.dumps({"messages": parts, "tools": sorted(tool_names), "stop": stop or []},
+                          sort_keys=True, default=str)
+    return hashlib.sha256(_WORKFLOW_ID.sub("wf_<id>", material).encode()).hexdigest()
+
+
+def invoke_inner(model: Any, messages: List[BaseMessage], stop: Optional[List[str]] = None, **kwargs: Any) -> AIMessage:
+    """
+    Call a wrapped model from inside another model's _generate.
+
+    The wrapper's own run is the one callbacks see, so the inner call is
+    made without callbacks to avoid reporting it twice.
+    """
+    message = model.invoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+    if isinstance(message, str):
+        # Completion-style LLMs return plain text
+        message = AIMessage(content=message)
+    return message
+
+
+def _remap_ids(message: AIMessage, mapping: Dict[str, str]) -> AIMessage:
+    if not mapping:
+        return message
+    text = json.dumps(message_to_dict(message))
+    for recorded, current in mapping.items():
+        text = text.replace(recorded, current)
+    return messages_from_dict([json.loads(text)])[0]
+
+
+class RecordReplayChatModel(BaseChatModel):
+    """Chat model that records another model's completions or replays them from a cassette."""
+
+    cassette: Any
+    inner: Any = None
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "record" if self.inner is not None else "replay"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "RecordReplayChatModel":
+        inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+        names = [getattr(t, "name", None) or getattr(t, "__name__", str(t)) for t in tools]
+        return self.model_copy(update={"inner": inner, "tool_names": names})
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        key = request_key(messages, self.tool_names, stop)
+        current_ids = _workflow_ids(messages)
+
+        if self.inner is None:
+            entry = self.cassette.get(key)
+            if entry is None:
+                raise CassetteMiss(f"No recorded completion for this request in {self.cassette.path} "
+                                   f"(key {key[:12]}); record it with LLM_PROVIDER=record")
+            message = messages_from_dict([entry["message"]])[0]
+            message = _remap_ids(message, dict(zip(entry["workflow_ids"], current_ids)))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        message = invoke_inner(self.inner, messages, stop, **kwargs)
+        self.cassette.put({
+            "key": key,
+            "workflow_ids": current_ids,
+            "message": message_to_dict(message),
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+# ── Provider registry ──────────────────────────────────────────────────
+
+def _gemini(mode: str, model: Optional[str] = None):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    if not os.getenv("GOOGLE_API_KEY"):
+        raise Exception("Missing GOOGLE_API_KEY")
+    return ChatGoogleGenerativeAI(
+        model=model or LLM_MODEL,
+        google_api_key=os.getenv("GOOGLE_API_KEY"),
+        temperature=0.6,
+    )
+
+
+def _fake(mode: str, model: Optional[str] = None):
+    from .fake_llm import FakeReActLLM, FakeToolCallingChatModel
+
+    if mode == "tool_calling":
+        return FakeToolCallingChatModel(latency_ms=LLM_FAKE_LATENCY_MS)
+    return FakeReActLLM(latency_ms=LLM_FAKE_LATENCY_MS)
+
+
+_cassette = Cassette(LLM_CASSETTE_PATH)
+
+
+def _record(mode: str, model: Optional[str] = None):
+    return RecordReplayChatModel(cassette=_cassette, inner=_gemini(mode, model))
+
+
+def _replay(mode: str, model: Optional[str] = None):
+    return RecordReplayChatModel(cassette=_cassette)
+
+
+def _router(mode: str, model: Optional[str] = None):
+    from .llm_router import build_router
+    return build_router(mode)
+
+
+_PROVIDERS: Dict[str, Callable[..., Any]] = {
+    "gemini": _gemini,
+    "fake": _fake,
+    "record": _record,
+    "replay": _replay,
+    "router": _router,
+}
+
+
+def register_provider(name: str, factory: Callable[..., Any]):
+    """
+    Make a provider selectable through LLM_PROVIDER (and LLM_ROUTES).
+
+    Args:
+        name: Provider name
+        factory: Called with the agent mode ("tool_calling" or "react") and
+                 a model name (None for the provider's default), returns a
+                 LangChain model
+    """
+    _PROVIDERS[name.lower()] = factory
+
+
+def create_llm(mode: str, provider: Optional[str] = None, model: Optional[str] = None):
+    """
+    Build the agent's model for the configured provider.
+
+    Args:
+        mode: AGENT_MODE the model will serve
+        provider: Provider name (defaults to LLM_PROVIDER)
+        model: Model name (defaults to the provider's, e.g. LLM_MODEL)
+
+    Returns:
+        A LangChain chat model or LLM
+    """
+    provider = (provider or LLM_PROVIDER).lower()
+    if provider not in _PROVIDERS:
+        raise ValueError(f"LLM_PROVIDER must be one of {', '.join(sorted(_PROVIDERS))}, got '{provider}'")
+    return _PROVIDERS[provider](mode, model)
+
+
+def model_label(provider: Optional[str] = None) -> str:
+    """Model name used in metrics and logs for the configured provider."""
+    provider = (provider or LLM_PROVIDER).lower()
+    return provider if provider in ("fake", "router") else LLM_MODEL
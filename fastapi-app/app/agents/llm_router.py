@@ -0,0 +1,303 @@
+"""
+LLM Router
+LLM_PROVIDER=router spreads the agent's LLM calls over the backends in
+LLM_ROUTES, a comma-separated list of "provider:model" entries, e.g.
+"gemini:gemini-3-flash-preview,gemini:gemini-2.5-flash".
+
+Each backend keeps a rolling window of its last LLM_ROUTER_WINDOW calls
+(latency and outcome) in this worker. A call goes to the healthy backend
+with the lowest median latency; backends with fewer than
+LLM_ROUTER_MIN_SAMPLES calls rank first, in configured order, so every
+backend gets measured. On an error the call fails over to the next
+backend. A backend whose error rate over the window exceeds
+LLM_ROUTER_MAX_ERROR_RATE is only used as a last resort for
+LLM_ROUTER_COOLDOWN_SECONDS.
+
+With LLM_ROUTER_HEDGE=true, a call that is still running after the
+primary's p95 latency (LLM_ROUTER_HEDGE_AFTER_SECONDS until there are
+enough samples) is sent to the next backend as well, and the first answer
+wins. The slower call is not cancelled, so hedging trades tokens for tail
+latency.
+
+Without hedging, calls run on the caller's thread. With hedging, the
+primary call gets its own thread, so the hedge timer starts when the call
+does; only hedge and failover calls go to the LLM_ROUTER_HEDGE_WORKERS
+pool, which should be sized to the number of agent queries in flight.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.services.metrics import LLM_BACKEND_CALLS_TOTAL, LLM_BACKEND_SECONDS, LLM_HEDGES_TOTAL
+from .llm_providers import LLM_MODEL, create_llm, invoke_inner
+
+load_dotenv()
+
+LLM_ROUTES = os.getenv("LLM_ROUTES", f"gemini:{LLM_MODEL}")
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))
+LLM_ROUTER_MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "5"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_COOLDOWN_SECONDS = float(os.getenv("LLM_ROUTER_COOLDOWN_SECONDS", "30"))
+LLM_ROUTER_HEDGE = os.getenv("LLM_ROUTER_HEDGE", "false").lower() == "true"
+LLM_ROUTER_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_ROUTER_HEDGE_AFTER_SECONDS", "10"))
+# Threads for hedge and failover calls (primary calls never wait for this pool)
+LLM_ROUTER_HEDGE_WORKERS = int(os.getenv("LLM_ROUTER_HEDGE_WORKERS", "16"))
+
+
+class BackendStats:
+    """Rolling latency and error window of one backend in this worker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cooldown_until = 0.0
+        self._latencies: deque = deque(maxlen=LLM_ROUTER_WINDOW)
+        self._outcomes: deque = deque(maxlen=LLM_ROUTER_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool):
+        """Count one finished call; trips the cooldown when the error rate is too high."""
+        with self._lock:
+            self._outcomes.append(ok)
+            if ok:
+                self._latencies.append(seconds)
+            errors = self._outcomes.count(False)
+            if len(self._outcomes) >= LLM_ROUTER_MIN_SAMPLES and errors / len(self._outcomes) > LLM_ROUTER_MAX_ERROR_RATE:
+                self.cooldown_until = time.monotonic() + LLM_ROUTER_COOLDOWN_SECONDS
+                # Judge the backend afresh once the cooldown is over
+                self._outcomes.clear()
+                print(f"⚠️ [LLM] Backend {self.name} failing ({errors} errors), cooling down for {LLM_ROUTER_COOLDOWN_SECONDS}s")
+        LLM_BACKEND_CALLS_TOTAL.inc(backend=self.name, result="success" if ok else "error")
+        if ok:
+            LLM_BACKEND_SECONDS.observe(seconds, backend=self.name)
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile over the window, None until there are enough samples."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < LLM_ROUTER_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            errors = self._outcomes.count(False)
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "backend": self.name,
+            "healthy": self.healthy(),
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - time.monotonic()), 1),
+            "window_calls": calls,
+            "error_rate": round(errors / calls, 3) if calls else None,
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+_stats: Dict[str, BackendStats] = {}
+_stats_lock = threading.Lock()
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _backend_stats(name: str) -> BackendStats:
+    with _stats_lock:
+        if name not in _stats:
+            _stats[name] = BackendStats(name)
+        return _stats[name]
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=LLM_ROUTER_HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+    return _pool
+
+
+def parse_routes(spec: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parse LLM_ROUTES.
+
+    Args:
+        spec: Comma-separated "provider:model" entries (model optional)
+
+    Returns:
+        list: (provider, model or None) pairs in configured order
+    """
+    routes = []
+    for item in spec.split(","):
+        provider, _, model = item.strip().partition(":")
+        if provider.strip():
+            routes.append((provider.strip().lower(), model.strip() or None))
+    return routes
+
+
+def route_order(names: List[str]) -> List[str]:
+    """
+    Backends in the order they should be tried.
+
+    Args:
+        names: Backend names in configured order
+
+    Returns:
+        list: Unmeasured healthy backends, then measured healthy ones by
+              median latency, then cooling-down ones by time left
+    """
+    stats = {name: _backend_stats(name) for name in names}
+    healthy = [name for name in names if stats[name].healthy()]
+    cooling = sorted((name for name in names if name not in healthy), key=lambda n: stats[n].cooldown_until)
+
+    def rank(name: str):
+        p50 = stats[name].percentile(0.5)
+        return (p50 is not None, p50 or 0.0, names.index(name))
+
+    return sorted(healthy, key=rank) + cooling
+
+
+def _start_thread(fn, *args: Any) -> Future:
+    """Run fn on a new thread at once, instead of queueing it behind busy pool workers."""
+    future: Future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-primary", daemon=True).start()
+    return future
+
+
+def _timed_call(name: str, model: Any, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> AIMessage:
+    start = time.perf_counter()
+    try:
+        message = invoke_inner(model, messages, stop, **kwargs)
+    except Exception:
+        _backend_stats(name).record(time.perf_counter() - start, ok=False)
+        raise
+    _backend_stats(name).record(time.perf_counter() - start, ok=True)
+    return message
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that sends each call to the best backend, with failover and hedging."""
+
+    backends: List[Tuple[str, Any]]
+    hedge: bool = LLM_ROUTER_HEDGE
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "RoutedChatModel":
+        bound = [(name, model.bind_tools(tools, **kwargs)) for name, model in self.backends]
+        return self.model_copy(update={"backends": bound})
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        models = dict(self.backends)
+        queue = route_order([name for name, _ in self.backends])
+        last_error: Optional[Exception] = None
+
+        if not self.hedge:
+            # Plain failover on the caller's thread
+            for i, name in enumerate(queue):
+                try:
+                    message = _timed_call(name, models[name], messages, stop, kwargs)
+                except Exception as e:
+                    last_error = e
+                    if i + 1 < len(queue):
+                        print(f"⚠️ [LLM] {name} failed ({type(e).__name__}: {e}), failing over to {queue[i + 1]}")
+                    continue
+                return ChatResult(generations=[ChatGeneration(message=message, generation_info={"backend": name})])
+            raise last_error
+
+        primary = queue[0]
+        pending: Dict[Future, str] = {}
+        hedged = False
+
+        def launch():
+            name = queue.pop(0)
+            # Each thread needs its own copy of the caller's context (tracing, budgets)
+            ctx = contextvars.copy_context()
+            args = (ctx.run, _timed_call, name, models[name], messages, stop, kwargs)
+            # The primary starts at once, so queueing never counts toward the hedge deadline
+            future = _start_thread(*args) if name == primary else _get_pool().submit(*args)
+            pending[future] = name
+
+        launch()
+        while pending:
+            timeout = None
+            if not hedged and queue:
+                timeout = _backend_stats(primary).percentile(0.95) or LLM_ROUTER_HEDGE_AFTER_SECONDS
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                print(f"⏱️ [LLM] {primary} slower than {timeout:.2f}s, hedging to {queue[0]}")
+                launch()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    message = future.result()
+                except Exception as e:
+                    last_error = e
+                    # Fail over when nothing else is in flight, or replace a failed hedge
+                    if queue and (not pending or hedged):
+                        print(f"⚠️ [LLM] {name} failed ({type(e).__name__}: {e}), failing over to {queue[0]}")
+                        launch()
+                    continue
+                if hedged:
+                    LLM_HEDGES_TOTAL.inc(winner="primary" if name == primary else "hedge")
+                return ChatResult(generations=[ChatGeneration(message=message, generation_info={"backend": name})])
+
+        raise last_error
+
+
+def build_router(mode: str) -> RoutedChatModel:
+    """
+    Build the routed model from LLM_ROUTES.
+
+    Args:
+        mode: AGENT_MODE the backends will serve
+
+    Returns:
+        RoutedChatModel
+    """
+    backends = []
+    for provider, model in parse_routes(LLM_ROUTES):
+        if provider == "router":
+            raise ValueError("LLM_ROUTES cannot contain the router itself")
+        backends.append((f"{provider}:{model}" if model else provider, create_llm(mode, provider, model)))
+    if not backends:
+        raise ValueError("LLM_ROUTES must list at least one provider:model backend")
+    return RoutedChatModel(backends=backends)
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """Rolling latency and health of every configured backend in this worker."""
+    names = [f"{provider}:{model}" if model else provider for provider, model in parse_routes(LLM_ROUTES)]
+    return {
+        "hedge": LLM_ROUTER_HEDGE,
+        "order": route_order(names) if names else [],
+        "backends": [_backend_stats(name).snapshot() for name in names],
+    }
@@ -1,24 +1,81 @@
 import os
+import re
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import AgentExecutor, create_react_agent
+from langchain.agents import AgentExecutor, create_react_agent, create_tool_calling_agent
 from langchain.prompts import PromptTemplate
-from .agent_tools import tools
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnablePassthrough
+from .agent_tools import request_prompt, tools, structured_tools
+from .agent_callbacks import LLMMetricsHandler
+from .llm_providers import LLM_PROVIDER, create_llm, model_label
+from .context_budget import budget_scope, compress_steps
+from app.services.metrics import (
+    AGENT_ITERATIONS,
+    AGENT_PARSE_ERRORS_TOTAL,
+    AGENT_PROMPT_TOKENS,
+    WORKFLOW_TEMPLATE_LOOKUPS_TOTAL,
+)
+from app.services.workflow_templates import WORKFLOW_TEMPLATE_MODE, find_template, seed_prompt
+from app.services.tracing import traced
 
 load_dotenv()
 
+# tool_calling - native function calling with typed tool schemas (default)
+# react        - legacy text ReAct loop parsed from the model's output
+AGENT_MODE = os.getenv("AGENT_MODE", "tool_calling").lower()
+if AGENT_MODE not in ("tool_calling", "react"):
+    raise ValueError(f"AGENT_MODE must be 'tool_calling' or 'react', got '{AGENT_MODE}'")
+
+AGENT_MAX_ITERATIONS = 10
+
 def get_llm():
-    """Get the Gemini LLM instance."""
-    return ChatGoogleGenerativeAI(
-        model="gemini-3-flash-preview",
-        google_api_key=os.getenv("GOOGLE_API_KEY"),
-        temperature=0.6,
+    """Get the LLM for the configured provider (see llm_providers)."""
+    return create_llm(AGENT_MODE)
+
+TOOL_CALLING_SYSTEM_PROMPT = """You are a 'Workflow Architect'. Turn the user's request into a functional, persisted workflow.
+
+1. Call search_apis for each capability the request needs (you may call it several times in one turn).
+2. Call report_feasibility once with your verdict, based only on APIs returned by search_apis.
+3. If feasible, call save_workflow with the ordered steps and a complete airflow_dag.py
+   (one PythonOperator per step, real API names, no placeholders).
+4. Finish with a short summary of the steps and the workflow_id returned by save_workflow."""
+
+
+def _with_compressed_scratchpad(agent):
+    """Summarize older tool observations before they are rendered into the prompt."""
+    return RunnablePassthrough.assign(
+        intermediate_steps=lambda x: compress_steps(x["intermediate_steps"])
+    ) | agent
+
+
+def get_tool_calling_executor():
+    """Agent Executor that uses the model's native structured tool calling."""
+    llm = get_llm()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", TOOL_CALLING_SYSTEM_PROMPT),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+    agent = _with_compressed_scratchpad(create_tool_calling_agent(llm, structured_tools, prompt))
+
+    return AgentExecutor(
+        agent=agent,
+        tools=structured_tools,
+        verbose=True,
+        max_iterations=AGENT_MAX_ITERATIONS,
+        # A malformed tool call goes back to the model as an _Exception step instead of failing the query
+        handle_parsing_errors=True,
+        return_intermediate_steps=True,
     )
 
+
 def get_agent_executor():
     """Initialize and return the LangChain Agent Executor."""
+    if AGENT_MODE == "tool_calling":
+        return get_tool_calling_executor()
+
     llm = get_llm()
 
     template = """You are a 'Workflow Architect'. Build and PERSIST functional workflows using these tools:
@@ -44,34 +101,142 @@ Request: {input}
 Thought: {agent_scratchpad}"""
 
     prompt = PromptTemplate.from_template(template)
-    agent = create_react_agent(llm, tools, prompt)
+    agent = _with_compressed_scratchpad(create_react_agent(llm, tools, prompt))
 
     return AgentExecutor(
         agent=agent,
         tools=tools,
         verbose=True,
         handle_parsing_errors=True,
-        max_iterations=10,
+        max_iterations=AGENT_MAX_ITERATIONS,
         early_stopping_method="generate",
+        return_intermediate_steps=True,
     )
 
+_REPORT_PATTERN = re.compile(r"\[FEASIBILITY_REPORT:\s*is_feasible=(True|False),\s*score=([0-9.]+),\s*reason='(.*?)'\]")
+_WORKFLOW_ID_PATTERN = re.compile(r"wf_[a-z0-9]{8}")
+
+
+def _output_text(output: Any) -> str:
+    """Gemini may return the final message as a list of content parts."""
+    if isinstance(output, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in output).strip()
+    return (output or "").strip()
+
+
+def _collect_results(steps: List[Any]) -> Dict[str, Any]:
+    """Pull the feasibility report and saved workflow out of the structured tool calls."""
+    report, workflow_id, parse_errors = None, None, 0
+    for action, observation in steps:
+        if action.tool == "report_feasibility" and isinstance(action.tool_input, dict):
+            report = action.tool_input
+        elif action.tool == "save_workflow" and isinstance(observation, dict):
+            workflow_id = observation.get("workflow_id") or workflow_id
+        elif action.tool == "_Exception":
+            parse_errors += 1
+    return {"report": report, "workflow_id": workflow_id, "parse_errors": parse_errors}
+
+
+def _parse_react_answer(content: str) -> Dict[str, Any]:
+    """Legacy ReAct mode: the verdict and workflow ID only exist in the final text."""
+    report, workflow_id = None, None
+    match = _REPORT_PATTERN.search(content)
+    if match:
+        report = {"is_feasible": match.group(1) == "True", "score": float(match.group(2)), "reason": match.group(3)}
+        content = content.replace(match.group(0), "").strip()
+    id_match = _WORKFLOW_ID_PATTERN.search(content)
+    if id_match:
+        workflow_id = id_match.group(0)
+    return {"content": content, "report": report, "workflow_id": workflow_id}
+
+
+def _lookup_template(user_input: str) -> Optional[Dict[str, Any]]:
+    """Closest saved workflow for the request; lookup failures just mean no template."""
+    if WORKFLOW_TEMPLATE_MODE == "off":
+        return None
+    try:
+        return find_template(user_input)
+    except Exception as e:
+        print(f"⚠️ [AI] Workflow template lookup failed: {e}")
+        WORKFLOW_TEMPLATE_LOOKUPS_TOTAL.inc(result="error")
+        return None
+
+
+@traced("agent.run_agent")
+def run_agent(user_input: str) -> Dict[str, Any]:
+    """
+    Run the agent and return its answer with the structured results.
+    A close enough saved workflow is given to the agent as a worked
+    example (see workflow_templates).
+
+    Returns:
+        dict: content, is_feasible, score, reason, workflow_id, iterations,
+              prompt_tokens (per LLM call), mode, template_id
+    """
+    token = request_prompt.set(user_input)
+    try:
+        template = _lookup_template(user_input)
+        if WORKFLOW_TEMPLATE_MODE != "off":
+            WORKFLOW_TEMPLATE_LOOKUPS_TOTAL.inc(result="seed" if template is not None else "miss")
+
+        agent_input = user_input if template is None else f"{user_input}\n\n{seed_prompt(template)}"
+        result = _invoke_agent(agent_input)
+        result["template_id"] = template["workflow_id"] if template is not None else None
+        return result
+    finally:
+        request_prompt.reset(token)
+
+
+def _invoke_agent(agent_input: str) -> Dict[str, Any]:
+    """Run the LLM agent loop on the (possibly seeded) request."""
+    print(f"🚀 [AI] Calling {LLM_PROVIDER} ({model_label()}, {AGENT_MODE})...")
+    handler = LLMMetricsHandler(model_label())
+    executor = get_agent_executor()
+    with budget_scope():
+        response = executor.invoke({"input": agent_input}, config={"callbacks": [handler]})
+
+    content = _output_text(response.get("output"))
+    results = _collect_results(response.get("intermediate_steps", []))
+    if AGENT_MODE == "react":
+        parsed = _parse_react_answer(content)
+        content = parsed["content"]
+        results["report"] = parsed["report"]
+        results["workflow_id"] = parsed["workflow_id"]
+
+    AGENT_ITERATIONS.observe(handler.calls, mode=AGENT_MODE)
+    for tokens in handler.prompt_tokens:
+        AGENT_PROMPT_TOKENS.observe(tokens, mode=AGENT_MODE)
+    if results["parse_errors"]:
+        AGENT_PARSE_ERRORS_TOTAL.inc(results["parse_errors"], mode=AGENT_MODE)
+
+    report = results["report"] or {}
+    workflow_id = results["workflow_id"]
+    if workflow_id and workflow_id not in content:
+        content = f"{content}\n\nWorkflow ID: `{workflow_id}`".strip()
+
+    print(f"✅ [AI] Agent finished in {handler.calls} LLM call(s).")
+    return {
+        "content": content,
+        "is_feasible": report.get("is_feasible", True),
+        "score": report.get("score", 1.0),
+        "reason": report.get("reason"),
+        "workflow_id": workflow_id,
+        "iterations": handler.calls,
+        "prompt_tokens": handler.prompt_tokens,
+        "mode": AGENT_MODE,
+    }
+
+
+@traced("agent.run_agent_query")
 def run_agent_query(user_input: str) -> str:
     """Invoke the LangChain agent with a user query using Gemini."""
     try:
-        print("🚀 [AI] Calling Gemini (gemini-3-flash-preview)...")
-        if not os.getenv("GOOGLE_API_KEY"):
-            raise Exception("Missing GOOGLE_API_KEY")
-
-        executor = get_agent_executor()
-        response = executor.invoke({"input": user_input})
-        output = response.get("output", "").strip()
-
+        output = run_agent(user_input)["content"]
         if output:
-            print("✅ [AI] Success with Gemini.")
             return output
 
     except Exception as e:
-        print(f"❌ [AI] Gemini call failed: {e}")
+        print(f"❌ [AI] LLM call failed: {e}")
         return f"❌ AI provider failed. Error: {str(e)}"
 
     return "Sorry, I couldn't generate a proper response. Could you try rephrasing it?"
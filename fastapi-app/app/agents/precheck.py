@@ -0,0 +1,136 @@
+"""
+Agent Feasibility Pre-check
+Cheap local gate in front of the LLM agent. The prompt is split into
+action phrases ("create a user", "send a welcome email", ...), all phrases
+are searched in one batched vector query, and the share of phrases with a
+close enough API is the prompt's coverage. Prompts whose coverage is below
+PRECHECK_MIN_COVERAGE are answered as infeasible without calling the LLM.
+
+Similarity is the cosine similarity derived from Chroma's distance: the
+collection uses squared L2 over normalized embeddings, so
+cosine = 1 - distance / 2. Any pre-check failure lets the query through
+to the agent.
+"""
+
+import os
+import re
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from app.services.metrics import AGENT_PRECHECK_TOTAL
+from app.services.tracing import traced
+
+load_dotenv()
+
+PRECHECK_ENABLED = os.getenv("PRECHECK_ENABLED", "true").lower() == "true"
+# Cosine similarity a phrase's best API match needs to count as covered
+PRECHECK_MATCH_SIMILARITY = float(os.getenv("PRECHECK_MATCH_SIMILARITY", "0.35"))
+# Share of phrases that must be covered for the prompt to reach the agent
+PRECHECK_MIN_COVERAGE = float(os.getenv("PRECHECK_MIN_COVERAGE", "0.5"))
+PRECHECK_TOP_K = int(os.getenv("PRECHECK_TOP_K", "3"))
+
+MAX_PHRASES = 8
+MIN_PHRASE_WORDS = 2
+
+_CONNECTORS = re.compile(
+    r"[,;\n]|\.(?:\s|$)|\b(?:and then|then|and|after that|after|when|once|finally)\b",
+    re.IGNORECASE,
+)
+
+
+class PrecheckResult(BaseModel):
+    """Outcome of the pre-check for one prompt."""
+    feasible: bool
+    coverage: float
+    phrases: List[str] = []
+    uncovered: List[str] = []
+
+    def reason(self) -> str:
+        missing = "; ".join(f'"{p}"' for p in self.uncovered)
+        return (f"Pre-check: no registered API is close to {missing} "
+                f"(coverage {self.coverage:.0%}, need {PRECHECK_MIN_COVERAGE:.0%})")
+
+
+def split_actions(prompt: str) -> List[str]:
+    """
+    Split a prompt into action phrases on punctuation and connectors.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        list: Up to MAX_PHRASES phrases; the whole prompt if none qualify
+    """
+    phrases = []
+    for part in _CONNECTORS.split(prompt):
+        phrase = " ".join(part.split())
+        if len(phrase.split()) >= MIN_PHRASE_WORDS and phrase.lower() not in (p.lower() for p in phrases):
+            phrases.append(phrase)
+    if not phrases:
+        whole = " ".join(prompt.split())
+        return [whole] if whole else []
+    return phrases[:MAX_PHRASES]
+
+
+@traced("agent.precheck")
+def check_feasibility(prompt: str) -> PrecheckResult:
+    """
+    Score how much of a prompt the registered APIs can cover.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        PrecheckResult: feasible=False only when coverage is below PRECHECK_MIN_COVERAGE
+    """
+    from app.services.vector_service import search_similar_batch
+
+    phrases = split_actions(prompt)
+    if not phrases:
+        return PrecheckResult(feasible=True, coverage=1.0)
+
+    batch = search_similar_batch(phrases, top_k=PRECHECK_TOP_K)
+    if not any(batch):
+        # Nothing indexed (yet): the pre-check can't tell, leave it to the agent
+        raise RuntimeError("API vector index is empty")
+
+    uncovered = []
+    for phrase, results in zip(phrases, batch):
+        best = max((1 - r["hybrid_distance"] / 2 for r in results), default=0.0)
+        if best < PRECHECK_MATCH_SIMILARITY:
+            uncovered.append(phrase)
+
+    coverage = round(1 - len(uncovered) / len(phrases), 3)
+    return PrecheckResult(
+        feasible=coverage >= PRECHECK_MIN_COVERAGE,
+        coverage=coverage,
+        phrases=phrases,
+        uncovered=uncovered,
+    )
+
+
+def run_precheck(prompt: str, skip: bool = False) -> Optional[PrecheckResult]:
+    """
+    Pre-check wrapper used by the API: honours PRECHECK_ENABLED and the
+    caller's bypass, counts the outcome, and fails open.
+
+    Args:
+        prompt: User prompt
+        skip: Bypass the pre-check for this query
+
+    Returns:
+        PrecheckResult or None when the pre-check did not run
+    """
+    if skip or not PRECHECK_ENABLED:
+        AGENT_PRECHECK_TOTAL.inc(result="skipped")
+        return None
+    try:
+        result = check_feasibility(prompt)
+    except Exception as e:
+        print(f"⚠️ Feasibility pre-check failed, passing query to the agent: {e}")
+        AGENT_PRECHECK_TOTAL.inc(result="error")
+        return None
+    AGENT_PRECHECK_TOTAL.inc(result="pass" if result.feasible else "reject")
+    return result
@@ -1,20 +1,19 @@
 import asyncio
-import json
 import os
-from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
-from app.agents.open_router import chat_with_gemini, run_agent_query
 from app.services.vector_service import reindex_all_apis
 from app.services.job_service import JobService
-from app.services.dag_runner import run_dag
+from app.services.workflow_index import list_indexed_workflows
+from app.services.workflow_templates import rebuild_templates
+from app.services.workflow_store import local_dag_path, read_graph, read_workflow_async, workflow_exists
+from app.services.dag_runner import checkpoint_status
+from app.services.run_queue import enqueue_run, get_queue_stats, get_run, requeue_run
 from typing import Optional, List, Dict, Any
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
 
-WORKFLOWS_DIR = Path(__file__).resolve().parent.parent.parent / "workflows"
-
 class ChatRequest(BaseModel):
     prompt: str
     model: Optional[str] = "gemini-3-flash-preview"
@@ -22,6 +21,8 @@ class ChatRequest(BaseModel):
 
 class AgentQueryRequest(BaseModel):
     prompt: str
+    # Send the prompt to the agent even if the feasibility pre-check would reject it
+    skip_precheck: bool = False
 
 class ChatResponse(BaseModel):
     content: str
@@ -36,41 +37,47 @@ class AgentQueryResponse(BaseModel):
     score: float = 1.0
     reason: Optional[str] = None
     workflow_id: Optional[str] = None
+    iterations: Optional[int] = None
+    prompt_tokens: Optional[List[int]] = None
+    # Saved workflow the answer was copied from or seeded with
+    template_id: Optional[str] = None
 
 @router.post("/query", response_model=AgentQueryResponse)
 async def query_agent(request: AgentQueryRequest):
     """
     Invoke the LangChain agent with tools (Vector Search & Feasibility).
-    """
-    try:
-        content = run_agent_query(request.prompt)
+    The feasibility verdict and workflow ID come from the agent's
+    structured tool calls rather than from parsing its final text.
 
-        is_feasible = True
-        score = 1.0
-        reason = None
-        workflow_id = None
-
-        report_match = re.search(r"\[FEASIBILITY_REPORT:\s*is_feasible=(True|False),\s*score=([0-9.]+),\s*reason='(.*?)'\]", content)
-
-        if report_match:
-            is_feasible = report_match.group(1) == "True"
-            score = float(report_match.group(2))
-            reason = report_match.group(3)
-            content = content.replace(report_match.group(0), "").strip()
+    Prompts that no registered API comes close to are rejected by a local
+    pre-check before any LLM call (bypass with skip_precheck).
+    """
+    from app.agents.open_router import run_agent
+    from app.agents.precheck import run_precheck
 
-        id_match = re.search(r"`(wf_[a-z0-9]+)`", content)
-        if not id_match:
-            id_match = re.search(r"wf_[a-z0-9]{8}", content)
+    try:
+        # Embedding, LLM calls and workflow file writes all block: keep them off the event loop
+        precheck = await asyncio.to_thread(run_precheck, request.prompt, request.skip_precheck)
+        if precheck is not None and not precheck.feasible:
+            return AgentQueryResponse(
+                content=f"❌ Not feasible with the registered APIs. {precheck.reason()}",
+                is_feasible=False,
+                score=precheck.coverage,
+                reason=precheck.reason(),
+                iterations=0
+            )
 
-        if id_match:
-            workflow_id = id_match.group(1) if "`" in id_match.group(0) else id_match.group(0)
+        result = await asyncio.to_thread(run_agent, request.prompt)
 
         return AgentQueryResponse(
-            content=content,
-            is_feasible=is_feasible,
-            score=score,
-            reason=reason,
-            workflow_id=workflow_id
+            content=result["content"],
+            is_feasible=result["is_feasible"],
+            score=result["score"],
+            reason=result["reason"],
+            workflow_id=result["workflow_id"],
+            iterations=result["iterations"],
+            prompt_tokens=result["prompt_tokens"],
+            template_id=result["template_id"]
         )
     except Exception as e:
         error_detail = str(e)
@@ -87,40 +94,50 @@ async def query_agent(request: AgentQueryRequest):
         )
 
 @router.get("/workflows")
-async def list_workflows():
-    """List all saved workflows."""
-    workflows = []
-    if WORKFLOWS_DIR.exists():
-        for wf_dir in sorted(WORKFLOWS_DIR.iterdir()):
-            wf_file = wf_dir / "workflow.json"
-            if wf_dir.is_dir() and wf_file.exists():
-                try:
-                    data = json.loads(wf_file.read_text())
-                    steps = data.get("steps", [])
-                    if isinstance(steps, dict):
-                        steps = steps.get("raw_info", [])
-                    workflows.append({
-                        "id": data.get("id", wf_dir.name),
-                        "name": data.get("name", "Untitled"),
-                        "status": data.get("status", "draft"),
-                        "created_at": data.get("created_at", ""),
-                        "step_count": len(steps) if isinstance(steps, list) else 0,
-                    })
-                except (json.JSONDecodeError, OSError):
-                    continue
+async def list_workflows(
+    response: Response,
+    status: Optional[str] = None,
+    sort: str = "id",
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    List saved workflows from the workflow index.
+    Supports filtering by status, sorting and pagination; the total
+    number of matching workflows is returned in the X-Total-Count header.
+    """
+    try:
+        workflows, total = await asyncio.to_thread(
+            list_indexed_workflows, status=status, sort=sort, order=order, limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Total-Count"] = str(total)
     return workflows
 
 
 @router.get("/workflows/{workflow_id}")
 async def get_workflow(workflow_id: str):
-    """Return full workflow JSON for a given workflow ID."""
-    wf_file = WORKFLOWS_DIR / workflow_id / "workflow.json"
-    if not wf_file.exists():
-        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
-    try:
-        return json.loads(wf_file.read_text())
-    except (json.JSONDecodeError, OSError) as e:
-        raise HTTPException(status_code=500, detail=f"Error reading workflow: {e}")
+    """Return full workflow JSON for a given workflow ID, with its run history folded in."""
+    data = await read_workflow_async(workflow_id)
+    if data is None:
+        if not await asyncio.to_thread(workflow_exists, workflow_id):
+            raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
+        raise HTTPException(status_code=500, detail=f"Error reading workflow {workflow_id}")
+    return data
+
+
+@router.get("/workflows/{workflow_id}/graph")
+async def get_workflow_graph(workflow_id: str):
+    """
+    Task graph of a workflow's DAG (tasks, dependency edges, topological
+    order and validation problems), extracted without executing the DAG.
+    """
+    graph = await asyncio.to_thread(read_graph, workflow_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail=f"No airflow_dag.py found for {workflow_id}")
+    return graph
 
 
 @router.post("/reindex")
@@ -134,14 +151,27 @@ async def reindex_apis():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/templates/reindex")
+async def reindex_templates():
+    """
+    Rebuild the workflow template collection from the saved workflows.
+    """
+    try:
+        result = await asyncio.to_thread(rebuild_templates)
+        return {"success": True, **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/test-chat", response_model=ChatResponse)
 async def test_chat_post(request: ChatRequest):
     """
     Test the Gemini model with a simple prompt (POST).
     """
+    from app.agents.open_router import chat_with_gemini
+
     try:
         messages = [{"role": "user", "content": request.prompt}]
-        result = chat_with_gemini(messages=messages)
+        result = await asyncio.to_thread(chat_with_gemini, messages)
         return ChatResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -154,9 +184,11 @@ async def test_chat_get(
     Test the Gemini model via GET.
     Example: /agents/test-chat?prompt=Hello
     """
+    from app.agents.open_router import chat_with_gemini
+
     try:
         messages = [{"role": "user", "content": prompt}]
-        result = chat_with_gemini(messages=messages)
+        result = await asyncio.to_thread(chat_with_gemini, messages)
         return ChatResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -165,52 +197,67 @@ async def test_chat_get(
 # ── Workflow execution endpoints ─────────────────────────────────
 
 @router.post("/workflows/{workflow_id}/run")
-async def run_workflow(workflow_id: str):
-    """Trigger execution of a workflow's airflow_dag.py."""
-    dag_path = WORKFLOWS_DIR / workflow_id / "airflow_dag.py"
-    if not dag_path.exists():
+async def run_workflow(workflow_id: str, priority: int = Query(0, ge=-100, le=100)):
+    """
+    Queue execution of a workflow's airflow_dag.py.
+    Runs are picked up by the DAG worker pool; higher priority runs first.
+    """
+    graph = await asyncio.to_thread(read_graph, workflow_id)
+    if graph is None:
         raise HTTPException(status_code=404, detail=f"No airflow_dag.py found for {workflow_id}")
+    if graph["errors"]:
+        raise HTTPException(status_code=422, detail=f"airflow_dag.py is invalid: {'; '.join(graph['errors'])}")
 
-    job_id = JobService.create_job("workflow_run")
-    JobService.update_job(job_id, status="running", progress=0)
-
-    async def _execute():
-        def on_update(task_id, status, idx, total):
-            progress = int(((idx + 1) / total) * 100) if status != "running" else int((idx / total) * 100)
-            JobService.update_job(job_id, progress=progress)
-
-        result = await asyncio.to_thread(run_dag, str(dag_path), on_update)
-
-        if result["status"] == "completed":
-            JobService.update_job(job_id, status="completed", progress=100, result=result)
-            # Update workflow status to active on success
-            wf_file = WORKFLOWS_DIR / workflow_id / "workflow.json"
-            if wf_file.exists():
-                try:
-                    data = json.loads(wf_file.read_text())
-                    data["status"] = "active"
-                    wf_file.write_text(json.dumps(data, indent=2))
-                except (json.JSONDecodeError, OSError):
-                    pass
-        else:
-            JobService.update_job(
-                job_id,
-                status="failed",
-                progress=100,
-                result=result,
-                error=result.get("error") or "One or more tasks failed",
-            )
-
-    asyncio.create_task(_execute())
+    job_id = await asyncio.to_thread(enqueue_run, workflow_id, priority)
     return {"job_id": job_id}
 
 
+@router.get("/runs/queue")
+async def get_run_queue():
+    """Run queue depth by status and worker pool settings."""
+    return await asyncio.to_thread(get_queue_stats)
+
+
+@router.post("/workflows/{workflow_id}/runs/{job_id}/resume")
+async def resume_workflow_run(workflow_id: str, job_id: str):
+    """
+    Re-queue a failed run. Tasks that completed before the failure are
+    restored from the run's checkpoint instead of being executed again.
+    """
+    run = await asyncio.to_thread(get_run, job_id)
+    if run is None or run["workflow_id"] != workflow_id:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if run["status"] != "failed":
+        raise HTTPException(status_code=409, detail=f"Only failed runs can be resumed (run is {run['status']})")
+
+    dag_path = await asyncio.to_thread(local_dag_path, workflow_id)
+    resumable = await asyncio.to_thread(checkpoint_status, str(dag_path), job_id) if dag_path else None
+    if resumable is None:
+        raise HTTPException(status_code=409, detail="Run has no checkpoint to resume from; start a new run instead")
+    if not resumable:
+        raise HTTPException(status_code=409, detail="DAG file changed since the checkpoint was written; start a new run instead")
+
+    await asyncio.to_thread(JobService.reset_job, job_id)
+    if not await asyncio.to_thread(requeue_run, job_id):
+        raise HTTPException(status_code=409, detail="Run was already re-queued")
+    return {"job_id": job_id, "resumed": True}
+
+
 @router.get("/workflows/{workflow_id}/runs/{job_id}")
 async def get_run_status(workflow_id: str, job_id: str):
     """Poll execution status for a workflow run."""
-    job = JobService.get_job(job_id)
+    job = await asyncio.to_thread(JobService.get_job, job_id)
     if job is None:
-        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        # Job progress lives in memory by default; fall back to the durable queue entry
+        run = await asyncio.to_thread(get_run, job_id)
+        if run is None or run["workflow_id"] != workflow_id:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return {
+            "status": "pending" if run["status"] == "queued" else run["status"],
+            "progress": 100 if run["status"] in ("completed", "failed") else 0,
+            "tasks": [],
+            "error": run["error"],
+        }
     return {
         "status": job["status"],
         "progress": job["progress"],
@@ -1,39 +1,57 @@
+import asyncio
+import os
+import time
+
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
 from app.services import CSVService, encode_text, JobService
+from app.services.metrics import CSV_STAGE_SECONDS
 
 router = APIRouter(prefix="/csv", tags=["CSV Upload"])
 
+# Short pauses between stages let the UI progress bars animate.
+# Set CSV_UI_PACING=false (e.g. for benchmarks) to skip them.
+CSV_UI_PACING = os.getenv("CSV_UI_PACING", "true").lower() in ("1", "true", "yes")
+
+
+def _pace(seconds: float):
+    if CSV_UI_PACING:
+        time.sleep(seconds)
+
 
 def background_csv_processor(job_id: str, file_content: bytes, filename: str):
     """
     Background task to process CSV: ETL -> Embedding -> Check Existence -> MySQL -> ChromaDB
     """
-    import time
     try:
         from app.services import upsert_api_records, store_in_chroma, search_similar
         
         # 1. Start Stage 1 (Transform)
         JobService.update_job(job_id, status="processing", progress=2)
-        time.sleep(0.3)
+        _pace(0.3)
 
         import io
         import pandas as pd
+        stage_start = time.perf_counter()
         df = pd.read_csv(io.BytesIO(file_content))
         rows = df.to_dict('records')
         JobService.update_job(job_id, progress=15) # Mid-transform
-        time.sleep(0.4)
+        transform_seconds = time.perf_counter() - stage_start
+        _pace(0.4)
 
+        stage_start = time.perf_counter()
         transform_result = CSVService.transform_to_api_list(rows)
+        CSV_STAGE_SECONDS.observe(transform_seconds + time.perf_counter() - stage_start, stage="transform")
         if not transform_result["success"]:
             JobService.update_job(job_id, status="error", error=transform_result["error"])
             return
             
         records = transform_result["data"]
         JobService.update_job(job_id, progress=30) # Stage 1 DONE
-        time.sleep(0.8) # Show 100% on Bar 1
+        _pace(0.8) # Show 100% on Bar 1
 
         # 2. Start Stage 2 (Embedding)
         JobService.update_job(job_id, progress=31)
+        stage_start = time.perf_counter()
         texts_to_embed = CSVService.prepare_api_texts(records)
         chunk_size = 50
         all_embeddings = []
@@ -47,11 +65,13 @@ def background_csv_processor(job_id: str, file_content: bytes, filename: str):
             current_progress = 31 + int((i + len(chunk)) / len(texts_to_embed) * 38)
             JobService.update_job(job_id, progress=current_progress)
 
+        CSV_STAGE_SECONDS.observe(time.perf_counter() - stage_start, stage="embedding")
         JobService.update_job(job_id, progress=70) # Stage 2 DONE
-        time.sleep(0.8) # Show 100% on Bar 2
+        _pace(0.8) # Show 100% on Bar 2
 
         # 3. Start Stage 3 (Existence Scan)
         JobService.update_job(job_id, progress=71)
+        stage_start = time.perf_counter()
         
         final_to_save = []
         skipped_count = 0
@@ -82,8 +102,9 @@ def background_csv_processor(job_id: str, file_content: bytes, filename: str):
             except Exception:
                 final_to_save.append({"record": record, "embedding": all_embeddings[i]})
 
+        CSV_STAGE_SECONDS.observe(time.perf_counter() - stage_start, stage="existence_scan")
         JobService.update_job(job_id, progress=80) # Stage 3 DONE
-        time.sleep(0.8)
+        _pace(0.8)
 
         # Early exit if all skipped
         if not final_to_save:
@@ -98,24 +119,27 @@ def background_csv_processor(job_id: str, file_content: bytes, filename: str):
         filtered_records = [item["record"] for item in final_to_save]
         filtered_embeddings = [item["embedding"] for item in final_to_save]
 
+        stage_start = time.perf_counter()
         mysql_result = upsert_api_records(filtered_records)
+        CSV_STAGE_SECONDS.observe(time.perf_counter() - stage_start, stage="mysql")
         if not mysql_result["success"]:
             JobService.update_job(job_id, status="error", error=f"MySQL Save Failed: {mysql_result['error']}")
             return
         
         JobService.update_job(job_id, progress=90) # Stage 4 DONE
-        time.sleep(0.8)
+        _pace(0.8)
 
         # 5. Start Stage 5 (ChromaDB)
         JobService.update_job(job_id, progress=91)
         try:
-            store_in_chroma(filtered_records, filtered_embeddings)
+            with CSV_STAGE_SECONDS.time(stage="chroma"):
+                store_in_chroma(filtered_records, filtered_embeddings)
         except Exception as ve:
             JobService.update_job(job_id, status="error", error=f"ChromaDB Save Failed: {str(ve)}")
             return
         
         JobService.update_job(job_id, progress=100) # FINAL DONE
-        time.sleep(0.5)
+        _pace(0.5)
 
         # 7. Finalize
         result_summary = {
@@ -149,7 +173,7 @@ async def process_csv_async(background_tasks: BackgroundTasks, file: UploadFile
         raise HTTPException(status_code=400, detail=validation["error"])
 
     contents = await file.read()
-    job_id = JobService.create_job("csv_transformation")
+    job_id = await asyncio.to_thread(JobService.create_job, "csv_transformation")
     
     # Add to background tasks
     background_tasks.add_task(background_csv_processor, job_id, contents, file.filename)
@@ -166,7 +190,7 @@ async def get_job_status(job_id: str):
     """
     Check status of a background job
     """
-    job = JobService.get_job(job_id)
+    job = await asyncio.to_thread(JobService.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
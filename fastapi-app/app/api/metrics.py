@@ -0,0 +1,36 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import render_metrics
+from app.services.entity_cache import get_entity_cache_stats
+from app.services.workflow_store import get_workflow_cache_stats
+
+router = APIRouter(tags=["Observability"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text exposition of the service's hot-path metrics
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Entity and workflow cache size and hit/miss counts for this worker
+    """
+    # Generation reads are database queries with STATE_BACKEND=sql
+    entity_stats, workflow_stats = await asyncio.gather(
+        asyncio.to_thread(get_entity_cache_stats),
+        asyncio.to_thread(get_workflow_cache_stats),
+    )
+    return {**entity_stats, "workflows": workflow_stats}
+
+@router.get("/llm/backends")
+async def llm_backends():
+    """
+    Rolling latency, error rate and routing order of the LLM_ROUTES backends in this worker
+    """
+    from app.agents.llm_router import get_router_stats
+    return get_router_stats()
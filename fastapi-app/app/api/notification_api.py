@@ -3,14 +3,20 @@ NotificationSystem API Endpoints
 Provides endpoints for sending email and SMS notifications
 """
 
+import os
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from app.db.mysql import get_db
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.mysql import get_async_db
 from app.services.notification_service import NotificationService
+from app.services.notification_writer import NotificationQueueFull
 
 router = APIRouter(prefix="/api/notification", tags=["NotificationSystem"])
 
+MAX_BATCH_ITEMS = int(os.getenv("MOCK_API_BATCH_MAX_ITEMS", "5000"))
+
 
 # Request/Response Models
 class SendEmailRequest(BaseModel):
@@ -30,9 +36,26 @@ class NotificationResponse(BaseModel):
     message: str = None
 
 
+class SendEmailBatchRequest(BaseModel):
+    emails: List[SendEmailRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class BatchNotificationResult(BaseModel):
+    index: int
+    status: str
+    notification_id: str = None
+    message: str = None
+
+
+class BatchNotificationResponse(BaseModel):
+    status: str
+    count: int
+    results: List[BatchNotificationResult]
+
+
 # Endpoints
 @router.post("/email", response_model=NotificationResponse)
-async def send_email(request: SendEmailRequest, db: Session = Depends(get_db)):
+async def send_email(request: SendEmailRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Send an email notification (mock - logs to database)
     
@@ -46,14 +69,37 @@ async def send_email(request: SendEmailRequest, db: Session = Depends(get_db)):
     - notification_id: UUID of the notification log
     """
     try:
-        result = NotificationService.send_email(request.email, request.subject, request.body, db)
+        result = await NotificationService.send_email(request.email, request.subject, request.body, db)
+        return result
+    except NotificationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/email/batch", response_model=BatchNotificationResponse)
+async def send_email_batch(request: SendEmailBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Send many email notifications in one request (mock - logs to database)
+
+    Request body:
+    - emails: List of { email, subject, body } (1 to MOCK_API_BATCH_MAX_ITEMS items)
+
+    Returns:
+    - status: "sent"
+    - count: Number of notifications logged
+    - results: Per-item { index, status, notification_id } in request order
+    """
+    try:
+        emails = [item.model_dump() for item in request.emails]
+        result = await NotificationService.send_email_batch(emails, db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/sms", response_model=NotificationResponse)
-async def send_sms(request: SendSMSRequest, db: Session = Depends(get_db)):
+async def send_sms(request: SendSMSRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Send an SMS notification (mock - logs to database)
     
@@ -66,7 +112,9 @@ async def send_sms(request: SendSMSRequest, db: Session = Depends(get_db)):
     - notification_id: UUID of the notification log
     """
     try:
-        result = NotificationService.send_sms(request.phone_number, request.message, db)
+        result = await NotificationService.send_sms(request.phone_number, request.message, db)
         return result
+    except NotificationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,14 +3,19 @@ PaymentSystem API Endpoints
 Provides endpoints for payment processing and refunds
 """
 
+import os
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.db.mysql import get_db
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.mysql import get_async_db
 from app.services.payment_service import PaymentService
 
 router = APIRouter(prefix="/api/payment", tags=["PaymentSystem"])
 
+MAX_BATCH_ITEMS = int(os.getenv("MOCK_API_BATCH_MAX_ITEMS", "5000"))
+
 
 # Request/Response Models
 class ProcessPaymentRequest(BaseModel):
@@ -24,6 +29,23 @@ class ProcessPaymentResponse(BaseModel):
     message: str = None
 
 
+class ProcessPaymentBatchRequest(BaseModel):
+    payments: List[ProcessPaymentRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class BatchPaymentResult(BaseModel):
+    index: int
+    status: str
+    transaction_id: str = None
+    message: str = None
+
+
+class ProcessPaymentBatchResponse(BaseModel):
+    status: str
+    count: int
+    results: List[BatchPaymentResult]
+
+
 class RefundPaymentRequest(BaseModel):
     transaction_id: str
 
@@ -36,7 +58,7 @@ class RefundPaymentResponse(BaseModel):
 
 # Endpoints
 @router.post("/process", response_model=ProcessPaymentResponse)
-async def process_payment(request: ProcessPaymentRequest, db: Session = Depends(get_db)):
+async def process_payment(request: ProcessPaymentRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Process a payment transaction
     
@@ -49,14 +71,35 @@ async def process_payment(request: ProcessPaymentRequest, db: Session = Depends(
     - transaction_id: UUID of the transaction (on success)
     """
     try:
-        result = PaymentService.process_payment(request.amount, request.currency, db)
+        result = await PaymentService.process_payment(request.amount, request.currency, db)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/process/batch", response_model=ProcessPaymentBatchResponse)
+async def process_payment_batch(request: ProcessPaymentBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Process many payment transactions in one request and one transaction
+
+    Request body:
+    - payments: List of { amount, currency } (1 to MOCK_API_BATCH_MAX_ITEMS items)
+
+    Returns:
+    - status: "success"
+    - count: Number of transactions created
+    - results: Per-item { index, status, transaction_id } in request order
+    """
+    try:
+        payments = [item.model_dump() for item in request.payments]
+        result = await PaymentService.process_payment_batch(payments, db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/refund", response_model=RefundPaymentResponse)
-async def refund_payment(request: RefundPaymentRequest, db: Session = Depends(get_db)):
+async def refund_payment(request: RefundPaymentRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Refund a payment transaction
     
@@ -67,7 +110,7 @@ async def refund_payment(request: RefundPaymentRequest, db: Session = Depends(ge
     - status: "success" or "error"
     - refund_id: UUID of the refund transaction (on success)
     """
-    result = PaymentService.refund_payment(request.transaction_id, db)
+    result = await PaymentService.refund_payment(request.transaction_id, db)
     
     if result.get("status") == "error":
         raise HTTPException(status_code=404, detail=result.get("message"))
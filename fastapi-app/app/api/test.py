@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.db import get_db, get_pool_stats
 from app.services import check_mysql_health, check_chroma_health, test_embedding
 from datetime import datetime
 
@@ -43,6 +43,15 @@ def mysql_health(db: Session = Depends(get_db)):
     return check_mysql_health(db)
 
 
+@router.get("/health/mysql/pool")
+def mysql_pool_stats():
+    """
+    MySQL connection pool statistics
+    Checked-out/overflow gauges, pre-ping counters and checkout wait histogram
+    """
+    return get_pool_stats()
+
+
 @router.get("/health/chromadb")
 def chromadb_health():
     """
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+from app.services.tracing import get_trace
+
+router = APIRouter(prefix="/traces", tags=["Observability"])
+
+@router.get("/{request_id}")
+async def get_request_trace(request_id: str):
+    """
+    Get the recorded spans for a request.
+    The request id is returned in the X-Request-ID response header.
+    """
+    spans = get_trace(request_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail=f"No trace found for request {request_id}")
+
+    start = min(s["start_time_unix_nano"] for s in spans)
+    end = max(s["end_time_unix_nano"] or s["start_time_unix_nano"] for s in spans)
+    return {
+        "request_id": request_id,
+        "trace_id": spans[0]["trace_id"],
+        "duration_ms": round((end - start) / 1e6, 3),
+        "span_count": len(spans),
+        "spans": spans,
+    }
@@ -3,14 +3,19 @@ UserSystem API Endpoints
 Provides endpoints for user creation and retrieval
 """
 
+import os
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from app.db.mysql import get_db
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.mysql import get_async_db
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/api/user", tags=["UserSystem"])
 
+MAX_BATCH_ITEMS = int(os.getenv("MOCK_API_BATCH_MAX_ITEMS", "5000"))
+
 
 # Request/Response Models
 class CreateUserRequest(BaseModel):
@@ -24,6 +29,24 @@ class CreateUserResponse(BaseModel):
     message: str = None
 
 
+class CreateUserBatchRequest(BaseModel):
+    users: List[CreateUserRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class BatchUserResult(BaseModel):
+    index: int
+    status: str
+    user_id: str = None
+    message: str = None
+
+
+class CreateUserBatchResponse(BaseModel):
+    status: str
+    created: int
+    failed: int
+    results: List[BatchUserResult]
+
+
 class UserData(BaseModel):
     id: str
     username: str
@@ -39,7 +62,7 @@ class GetUserResponse(BaseModel):
 
 # Endpoints
 @router.post("/create", response_model=CreateUserResponse)
-async def create_user(request: CreateUserRequest, db: Session = Depends(get_db)):
+async def create_user(request: CreateUserRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new user
     
@@ -51,7 +74,7 @@ async def create_user(request: CreateUserRequest, db: Session = Depends(get_db))
     - status: "success" or "error"
     - user_id: UUID of created user (on success)
     """
-    result = UserService.create_user(request.username, request.email, db)
+    result = await UserService.create_user(request.username, request.email, db)
     
     if result.get("status") == "error":
         raise HTTPException(status_code=400, detail=result.get("message"))
@@ -59,8 +82,28 @@ async def create_user(request: CreateUserRequest, db: Session = Depends(get_db))
     return result
 
 
+@router.post("/create/batch", response_model=CreateUserBatchResponse)
+async def create_user_batch(request: CreateUserBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create many users in one request and one transaction
+
+    Request body:
+    - users: List of { username, email } (1 to MOCK_API_BATCH_MAX_ITEMS items)
+
+    Returns:
+    - status: "success", "partial" (some items failed) or "error" (all failed)
+    - created / failed: Item counts
+    - results: Per-item { index, status, user_id | message } in request order
+    """
+    users = [item.model_dump() for item in request.users]
+    try:
+        return await UserService.create_user_batch(users, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{user_id}", response_model=GetUserResponse)
-async def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get user details by ID
     
@@ -71,7 +114,7 @@ async def get_user(user_id: str, db: Session = Depends(get_db)):
     - status: "success" or "error"
     - user: User object with id, username, email (on success)
     """
-    result = UserService.get_user(user_id, db)
+    result = await UserService.get_user(user_id, db)
     
     if result.get("status") == "error":
         raise HTTPException(status_code=404, detail=result.get("message"))
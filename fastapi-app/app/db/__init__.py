@@ -9,12 +9,19 @@ from .mysql import (
     Base,
     get_db,
     init_db,
-    close_db
+    close_db,
+    async_engine,
+    AsyncSessionLocal,
+    get_async_db,
+    close_async_db,
+    get_pool_stats
 )
 
 from .chroma import (
     get_chroma_client,
     get_or_create_collection,
+    with_collection,
+    invalidate_collection,
     list_collections,
     delete_collection,
     reset_chroma,
@@ -29,9 +36,16 @@ __all__ = [
     "get_db",
     "init_db",
     "close_db",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_async_db",
+    "close_async_db",
+    "get_pool_stats",
     # ChromaDB
     "get_chroma_client",
     "get_or_create_collection",
+    "with_collection",
+    "invalidate_collection",
     "list_collections",
     "delete_collection",
     "reset_chroma",
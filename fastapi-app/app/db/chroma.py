@@ -1,57 +1,137 @@
 """
 ChromaDB Vector Database Connection Module
-Handles ChromaDB client connection and collection management
+Handles ChromaDB client connection and collection management.
+
+All Chroma access goes through one shared client with a tuned keep-alive
+connection pool and timeouts. Collection handles are cached and refreshed
+automatically when they go stale (e.g. after a re-index drops the
+collection), and transient transport errors are retried with jittered
+backoff inside a bounded time budget. Safe to use from many threads.
 """
 
 import os
-import chromadb
-from chromadb.config import Settings
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
 from dotenv import load_dotenv
 
+from .shared_state import bump_generation, get_generation
+
 # Load environment variables
 load_dotenv()
 
+# "http" talks to the Chroma server; "ephemeral" (in-memory) and "persistent"
+# (local directory) run Chroma in-process, e.g. for benchmarks
+CHROMA_MODE = os.getenv("CHROMA_MODE", "http").lower()
+CHROMA_PERSIST_PATH = os.getenv("CHROMA_PERSIST_PATH", "./chroma_data")
+
 # Get ChromaDB host and port from environment
 CHROMA_HOST = os.getenv("CHROMA_HOST", "chromadb")
 CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
 
-# Global ChromaDB client
+# Transport tuning
+CHROMA_TIMEOUT_SECONDS = float(os.getenv("CHROMA_TIMEOUT_SECONDS", "10"))
+CHROMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CHROMA_CONNECT_TIMEOUT_SECONDS", "2"))
+CHROMA_MAX_CONNECTIONS = int(os.getenv("CHROMA_MAX_CONNECTIONS", "32"))
+CHROMA_MAX_KEEPALIVE = int(os.getenv("CHROMA_MAX_KEEPALIVE", "16"))
+CHROMA_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("CHROMA_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+# Retry budget
+CHROMA_MAX_RETRIES = int(os.getenv("CHROMA_MAX_RETRIES", "3"))
+CHROMA_RETRY_BASE_DELAY = float(os.getenv("CHROMA_RETRY_BASE_DELAY", "0.1"))
+CHROMA_RETRY_MAX_DELAY = float(os.getenv("CHROMA_RETRY_MAX_DELAY", "2.0"))
+CHROMA_RETRY_BUDGET_SECONDS = float(os.getenv("CHROMA_RETRY_BUDGET_SECONDS", "5"))
+
+# Global ChromaDB client and cached collection handles, each with the
+# cache generation it was resolved at (bumped when a collection is dropped)
 _chroma_client = None
+_client_lock = threading.Lock()
+_collections: Dict[str, Tuple[Any, int]] = {}
+_collections_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def _build_http_transport() -> httpx.Client:
+    return httpx.Client(
+        timeout=httpx.Timeout(CHROMA_TIMEOUT_SECONDS, connect=CHROMA_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=CHROMA_MAX_CONNECTIONS,
+            max_keepalive_connections=CHROMA_MAX_KEEPALIVE,
+            keepalive_expiry=CHROMA_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def _tune_transport(client):
+    """
+    Swap the HTTP client's default session (no timeout, default limits)
+    for a pooled keep-alive session with timeouts.
+    """
+    server = getattr(client, "_server", None)
+    session = getattr(server, "_session", None)
+    if not isinstance(session, httpx.Client):
+        return
+    tuned = _build_http_transport()
+    tuned.headers.update(session.headers)
+    server._session = tuned
+    session.close()
 
 
 def get_chroma_client():
     """
     Get or create ChromaDB client instance.
     Returns a singleton client to reuse connections.
-    
+
     Returns:
         chromadb.Client: ChromaDB client instance
     """
     global _chroma_client
-    
+
     if _chroma_client is None:
-        _chroma_client = chromadb.HttpClient(
-            host=CHROMA_HOST,
-            port=CHROMA_PORT,
-            settings=Settings(
-                anonymized_telemetry=False,
-            )
-        )
-    
+        with _client_lock:
+            if _chroma_client is None:
+                # Deferred so importing this module doesn't pull in chromadb
+                import chromadb
+                from chromadb.config import Settings
+
+                settings = Settings(anonymized_telemetry=False, allow_reset=CHROMA_MODE != "http")
+                if CHROMA_MODE == "ephemeral":
+                    client = chromadb.EphemeralClient(settings=settings)
+                elif CHROMA_MODE == "persistent":
+                    client = chromadb.PersistentClient(path=CHROMA_PERSIST_PATH, settings=settings)
+                else:
+                    client = chromadb.HttpClient(
+                        host=CHROMA_HOST,
+                        port=CHROMA_PORT,
+                        settings=settings
+                    )
+                    _tune_transport(client)
+                _chroma_client = client
+
     return _chroma_client
 
 
+def _generation_key(collection_name: str) -> str:
+    return f"chroma:{collection_name}"
+
+
 def get_or_create_collection(collection_name: str, metadata: dict = None):
     """
     Get or create a ChromaDB collection.
-    
+    The handle is cached, so repeated calls don't hit the server; it is
+    re-resolved when another worker drops the collection.
+
     Args:
         collection_name (str): Name of the collection
         metadata (dict, optional): Collection metadata
-    
+
     Returns:
         chromadb.Collection: ChromaDB collection instance
-    
+
     Example:
         collection = get_or_create_collection("my_documents")
         collection.add(
@@ -60,18 +140,104 @@ def get_or_create_collection(collection_name: str, metadata: dict = None):
             ids=["doc1"]
         )
     """
-    client = get_chroma_client()
-    
-    return client.get_or_create_collection(
-        name=collection_name,
-        metadata=metadata or {}
-    )
+    generation = get_generation(_generation_key(collection_name))
+    cached = _collections.get(collection_name)
+    if cached is not None and cached[1] == generation:
+        return cached[0]
+
+    with _collections_lock:
+        cached = _collections.get(collection_name)
+        if cached is not None and cached[1] == generation:
+            return cached[0]
+        client = get_chroma_client()
+        collection = client.get_or_create_collection(
+            name=collection_name,
+            metadata=metadata or None
+        )
+        _collections[collection_name] = (collection, generation)
+    return collection
+
+
+def invalidate_collection(collection_name: Optional[str] = None):
+    """
+    Drop cached collection handle(s) so the next access re-resolves them.
+
+    Args:
+        collection_name (str, optional): Collection to forget; all when omitted
+    """
+    with _collections_lock:
+        if collection_name is None:
+            _collections.clear()
+        else:
+            _collections.pop(collection_name, None)
+
+
+def _is_stale_handle_error(error: Exception) -> bool:
+    name = type(error).__name__
+    if name in ("InvalidCollectionException", "NotFoundError"):
+        return True
+    message = str(error).lower()
+    return "does not exist" in message and "collection" in message
+
+
+def _is_transient_error(error: Exception) -> bool:
+    return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+def with_collection(
+    collection_name: str,
+    operation: Callable[[Any], T],
+    metadata: dict = None,
+    max_retries: int = None,
+) -> T:
+    """
+    Run an operation against a collection with stale-handle refresh and
+    bounded, jittered retries on transport errors.
+
+    Args:
+        collection_name (str): Name of the collection
+        operation (callable): Receives the collection handle, returns a result
+        metadata (dict, optional): Metadata used if the collection is (re)created
+        max_retries (int, optional): Override CHROMA_MAX_RETRIES for this call
+
+    Returns:
+        Whatever `operation` returns
+
+    Example:
+        results = with_collection("api_vectors", lambda c: c.query(query_embeddings=vec, n_results=5))
+    """
+    retries = CHROMA_MAX_RETRIES if max_retries is None else max_retries
+    deadline = time.monotonic() + CHROMA_RETRY_BUDGET_SECONDS
+    refreshed = False
+    attempt = 0
+
+    while True:
+        try:
+            # Resolving the handle talks to the server too (first use, after invalidate_collection)
+            collection = get_or_create_collection(collection_name, metadata)
+            return operation(collection)
+        except Exception as e:
+            if _is_stale_handle_error(e) and not refreshed:
+                # Collection was dropped/recreated behind our back: re-resolve once
+                invalidate_collection(collection_name)
+                refreshed = True
+                continue
+            if not _is_transient_error(e) or attempt >= retries:
+                raise
+
+            # Full jitter exponential backoff, never past the retry budget
+            delay = random.uniform(0, min(CHROMA_RETRY_MAX_DELAY, CHROMA_RETRY_BASE_DELAY * (2 ** attempt)))
+            if time.monotonic() + delay > deadline:
+                raise
+            attempt += 1
+            print(f"⚠️ ChromaDB transient error ({type(e).__name__}), retry {attempt}/{retries} in {delay:.2f}s")
+            time.sleep(delay)
 
 
 def list_collections():
     """
     List all collections in ChromaDB.
-    
+
     Returns:
         list: List of collection names
     """
@@ -83,12 +249,16 @@ def list_collections():
 def delete_collection(collection_name: str):
     """
     Delete a collection from ChromaDB.
-    
+
     Args:
         collection_name (str): Name of the collection to delete
     """
     client = get_chroma_client()
-    client.delete_collection(name=collection_name)
+    try:
+        client.delete_collection(name=collection_name)
+    finally:
+        invalidate_collection(collection_name)
+        bump_generation(_generation_key(collection_name))
 
 
 def reset_chroma():
@@ -97,7 +267,13 @@ def reset_chroma():
     Use with caution!
     """
     client = get_chroma_client()
-    client.reset()
+    try:
+        client.reset()
+    finally:
+        names = list(_collections)
+        invalidate_collection()
+        for name in names:
+            bump_generation(_generation_key(name))
 
 
 def close_chroma():
@@ -106,6 +282,10 @@ def close_chroma():
     Call this on application shutdown.
     """
     global _chroma_client
-    if _chroma_client is not None:
-        # ChromaDB HttpClient doesn't need explicit closing
-        _chroma_client = None
+    with _client_lock:
+        invalidate_collection()
+        if _chroma_client is not None:
+            session = getattr(getattr(_chroma_client, "_server", None), "_session", None)
+            if isinstance(session, httpx.Client):
+                session.close()
+            _chroma_client = None
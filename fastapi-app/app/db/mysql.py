@@ -5,27 +5,85 @@ Handles SQLAlchemy database connection and session management
 
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from .pool_stats import PRE_PING_STRATEGIES, PoolStats, attach_pool_listeners, instrumented_pool_class
+
 # Load environment variables
 load_dotenv()
 
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://user:password@db:3306/myapp")
 
+# Connection pool tuning (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# "always" pings on every checkout, "idle" only after DB_POOL_PRE_PING_IDLE_SECONDS unused, "never" skips it
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+DB_POOL_PRE_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "30"))
+
+if DB_POOL_PRE_PING not in PRE_PING_STRATEGIES:
+    raise ValueError(f"DB_POOL_PRE_PING must be one of {sorted(PRE_PING_STRATEGIES)}, got '{DB_POOL_PRE_PING}'")
+
+# Pool statistics, exposed via /test/health/mysql/pool
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
+
+def _pool_options(pool_class, stats: PoolStats) -> dict:
+    return {
+        "poolclass": instrumented_pool_class(pool_class, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,          # Recycle connections after this many seconds
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+    }
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_recycle=3600,   # Recycle connections after 1 hour
     echo=False,          # Set to True for SQL query logging
+    **_pool_options(QueuePool, sync_pool_stats),
 )
+attach_pool_listeners(engine, sync_pool_stats, DB_POOL_PRE_PING, DB_POOL_PRE_PING_IDLE_SECONDS)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async driver URL for request handlers (sync engine stays for background jobs)
+def _default_async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (("mysql+pymysql://", "mysql+aiomysql://"), ("sqlite://", "sqlite+aiosqlite://")):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _default_async_url(DATABASE_URL))
+
+# Create async SQLAlchemy engine
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **_pool_options(AsyncAdaptedQueuePool, async_pool_stats),
+)
+attach_pool_listeners(async_engine.sync_engine, async_pool_stats, DB_POOL_PRE_PING, DB_POOL_PRE_PING_IDLE_SECONDS)
+
+# Create AsyncSessionLocal class
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -47,6 +105,42 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Use this in async FastAPI routes so queries don't block the event loop.
+    
+    Example:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(text("SELECT * FROM items"))
+            return result.fetchall()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    """
+    Snapshot of both connection pools.
+    
+    Returns:
+        dict: Pool configuration plus per-engine gauges, counters and wait histogram
+    """
+    return {
+        "config": {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pre_ping": DB_POOL_PRE_PING,
+            "pre_ping_idle_seconds": DB_POOL_PRE_PING_IDLE_SECONDS,
+        },
+        "sync": sync_pool_stats.snapshot(),
+        "async": async_pool_stats.snapshot(),
+    }
+
+
 def init_db():
     """
     Initialize database tables.
@@ -61,3 +155,11 @@ def close_db():
     Call this on application shutdown.
     """
     engine.dispose()
+
+
+async def close_async_db():
+    """
+    Close async database connections.
+    Call this on application shutdown.
+    """
+    await async_engine.dispose()
@@ -0,0 +1,192 @@
+"""
+Connection Pool Statistics Module
+Instruments SQLAlchemy pools with checkout wait times and pre-ping outcomes
+so pool sizing can be tuned from data.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+PRE_PING_STRATEGIES = {"always", "idle", "never"}
+
+
+class PoolStats:
+    """
+    Thread-safe counters for one engine's connection pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_pings = 0
+        self.pre_ping_failures = 0
+        self.checkout_timeouts = 0
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        wait_ms = seconds * 1000
+        with self._lock:
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self._wait_counts[i] += 1
+                    break
+            else:
+                self._wait_counts[-1] += 1
+            self._wait_sum_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current pool occupancy plus cumulative counters
+
+        Returns:
+            dict: Pool gauges, counters and the checkout wait histogram
+        """
+        pool = self._pool
+        gauges: Dict[str, Any] = {}
+        if pool is not None and hasattr(pool, "checkedout"):
+            gauges = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            }
+
+        with self._lock:
+            count = sum(self._wait_counts)
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(WAIT_BUCKETS_MS + [float("inf")], self._wait_counts):
+                cumulative += bucket_count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+
+            return {
+                "name": self.name,
+                **gauges,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "pre_pings": self.pre_pings,
+                "pre_ping_failures": self.pre_ping_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_ms": {
+                    "count": count,
+                    "sum": round(self._wait_sum_ms, 3),
+                    "max": round(self._wait_max_ms, 3),
+                    "avg": round(self._wait_sum_ms / count, 3) if count else 0.0,
+                    "buckets": buckets,
+                },
+            }
+
+
+class _TimedCheckoutMixin:
+    """Times how long callers wait for a connection from the pool."""
+
+    _stats: Optional[PoolStats] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self._stats is not None:
+            self._stats._pool = self
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self._stats is not None:
+                self._stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self._stats is not None:
+            self._stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def instrumented_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Build a pool class that reports checkout waits to `stats`.
+    A class per engine keeps the stats attached across pool.recreate().
+    """
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"_stats": stats})
+
+
+def _ping(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def attach_pool_listeners(engine: Engine, stats: PoolStats, pre_ping: str, idle_seconds: float):
+    """
+    Register pool event listeners on a (sync) engine.
+
+    Args:
+        engine: Engine to instrument (use async_engine.sync_engine for async engines)
+        stats: Stats object that receives the counts
+        pre_ping: "always" (SQLAlchemy pre-ping on every checkout),
+                  "idle" (ping only connections idle longer than idle_seconds),
+                  "never"
+        idle_seconds: Idle threshold for the "idle" strategy
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.increment("connects")
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.increment("invalidations")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.increment("checkouts")
+        if pre_ping == "always":
+            # SQLAlchemy already pinged this connection before handing it out
+            stats.increment("pre_pings")
+            return
+        if pre_ping != "idle":
+            return
+        last_used = connection_record.info.get("last_used", 0.0)
+        if time.monotonic() - last_used < idle_seconds:
+            return
+        stats.increment("pre_pings")
+        try:
+            _ping(dbapi_connection)
+        except Exception:
+            stats.increment("pre_ping_failures")
+            # Tells the pool to discard this connection and retry with a fresh one
+            raise exc.DisconnectionError()
+
+    if pre_ping == "always":
+        @event.listens_for(engine, "handle_error")
+        def _on_error(context):
+            if getattr(context, "is_pre_ping", False):
+                stats.increment("pre_ping_failures")
@@ -0,0 +1,196 @@
+"""
+Shared State Module
+Cross-worker state for multi-worker deployments (uvicorn --workers N,
+gunicorn): background job records and cache generation counters.
+
+STATE_BACKEND=memory keeps everything in-process (single worker, default).
+STATE_BACKEND=sql stores it in SHARED_STATE_URL: a SQLite file for several
+workers on one host, or the MySQL database for several containers.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, Text, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from dotenv import load_dotenv
+
+from .state_store import get_store_engine
+
+load_dotenv()
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+if STATE_BACKEND not in ("memory", "sql"):
+    raise ValueError(f"STATE_BACKEND must be 'memory' or 'sql', got '{STATE_BACKEND}'")
+
+SHARED_STATE_URL = os.getenv(
+    "SHARED_STATE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'wfgen-shared-state.sqlite3')}",
+)
+
+# How long a worker trusts its last read of a cache generation
+STATE_GENERATION_CACHE_SECONDS = float(os.getenv("STATE_GENERATION_CACHE_SECONDS", "1.0"))
+
+_metadata = MetaData()
+
+jobs = Table(
+    "shared_jobs",
+    _metadata,
+    Column("id", String(36), primary_key=True),
+    Column("type", String(64), nullable=False),
+    Column("status", String(32), nullable=False),
+    Column("progress", Integer, nullable=False, default=0),
+    Column("result", Text, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", String(32), nullable=False),
+    Column("updated_at", String(32), nullable=False),
+    Index("ix_shared_jobs_created", "created_at"),
+)
+
+cache_generations = Table(
+    "cache_generations",
+    _metadata,
+    Column("name", String(128), primary_key=True),
+    Column("generation", Integer, nullable=False, default=0),
+    Column("updated_at", Float, nullable=False, default=0.0),
+)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+# Local generation counters (memory backend) and short-lived read cache (sql backend)
+_generations: Dict[str, int] = {}
+_generation_reads: Dict[str, Tuple[int, float]] = {}
+_generations_lock = threading.Lock()
+
+
+def is_shared() -> bool:
+    """True when state goes through the shared SQL backend."""
+    return STATE_BACKEND == "sql"
+
+
+def _get_engine():
+    """Helper to get the shared state engine and create the tables on first use"""
+    global _schema_ready
+    engine = get_store_engine(SHARED_STATE_URL)
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                _metadata.create_all(engine, checkfirst=True)
+                _schema_ready = True
+    return engine
+
+
+# ── Jobs ─────────────────────────────────────────────────────────
+
+def _to_row(job: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(job)
+    if "result" in row:
+        row["result"] = json.dumps(row["result"], default=str) if row["result"] is not None else None
+    return row
+
+
+def _from_row(row) -> Dict[str, Any]:
+    job = dict(row._mapping)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def insert_job(job: Dict[str, Any]):
+    """Store a new job record."""
+    with _get_engine().begin() as conn:
+        conn.execute(insert(jobs).values(**_to_row(job)))
+
+
+def update_job(job_id: str, values: Dict[str, Any]):
+    """Apply a partial update to a job record."""
+    with _get_engine().begin() as conn:
+        conn.execute(update(jobs).where(jobs.c.id == job_id).values(**_to_row(values)))
+
+
+def fetch_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Load one job record, or None if unknown."""
+    with _get_engine().connect() as conn:
+        row = conn.execute(select(jobs).where(jobs.c.id == job_id)).fetchone()
+    return _from_row(row) if row else None
+
+
+def fetch_jobs(limit: int = 500) -> List[Dict[str, Any]]:
+    """Load the most recent job records, newest first."""
+    with _get_engine().connect() as conn:
+        rows = conn.execute(select(jobs).order_by(jobs.c.created_at.desc()).limit(limit)).fetchall()
+    return [_from_row(r) for r in rows]
+
+
+# ── Cache generations ────────────────────────────────────────────
+
+def get_generation(name: str) -> int:
+    """
+    Current generation of a named cache. Workers compare it with the
+    generation their cached entry was built at and rebuild on mismatch.
+
+    Args:
+        name: Cache name, e.g. "chroma:api_vectors"
+
+    Returns:
+        int: Generation counter (0 if never bumped)
+    """
+    if not is_shared():
+        return _generations.get(name, 0)
+
+    now = time.monotonic()
+    cached = _generation_reads.get(name)
+    if cached is not None and now - cached[1] < STATE_GENERATION_CACHE_SECONDS:
+        return cached[0]
+
+    with _get_engine().connect() as conn:
+        value = conn.execute(
+            select(cache_generations.c.generation).where(cache_generations.c.name == name)
+        ).scalar()
+    generation = value or 0
+    _generation_reads[name] = (generation, now)
+    return generation
+
+
+def bump_generation(name: str) -> int:
+    """
+    Invalidate a named cache in every worker.
+
+    Args:
+        name: Cache name, e.g. "chroma:api_vectors"
+
+    Returns:
+        int: The new generation
+    """
+    if not is_shared():
+        with _generations_lock:
+            _generations[name] = _generations.get(name, 0) + 1
+            return _generations[name]
+
+    engine = _get_engine()
+    stmt = (
+        update(cache_generations)
+        .where(cache_generations.c.name == name)
+        .values(generation=cache_generations.c.generation + 1, updated_at=time.time())
+    )
+    with engine.begin() as conn:
+        updated = conn.execute(stmt).rowcount
+    if not updated:
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(cache_generations).values(name=name, generation=1, updated_at=time.time()))
+        except IntegrityError:
+            # Another worker created the row first
+            with engine.begin() as conn:
+                conn.execute(stmt)
+    with engine.connect() as conn:
+        generation = conn.execute(
+            select(cache_generations.c.generation).where(cache_generations.c.name == name)
+        ).scalar()
+
+    _generation_reads[name] = (generation, time.monotonic())
+    return generation
@@ -0,0 +1,88 @@
+"""
+Local State Store Module
+Provides SQLAlchemy engines for small service-owned tables (indexes, queues).
+Defaults to an on-disk SQLite file but accepts any SQLAlchemy URL, so the
+same tables can live in MySQL when several containers share them.
+"""
+
+import threading
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.schema import Table
+
+# One engine per URL, created lazily
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _configure_sqlite(engine: Engine):
+    """Enable WAL and a busy timeout so readers never block the writer."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
+def get_store_engine(url: str) -> Engine:
+    """
+    Get or create the engine for a state store URL.
+
+    Args:
+        url: SQLAlchemy URL, e.g. "sqlite:////app/workflows/.index.sqlite3"
+
+    Returns:
+        Engine: Shared engine instance for that URL
+    """
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            if url.startswith("sqlite"):
+                engine = create_engine(
+                    url,
+                    connect_args={"check_same_thread": False, "timeout": 5},
+                )
+                _configure_sqlite(engine)
+            else:
+                engine = create_engine(url, pool_pre_ping=True, pool_recycle=3600)
+            _engines[url] = engine
+        return engine
+
+
+def upsert(conn: Connection, table: Table, values: Dict[str, Any], key_columns: Iterable[str]):
+    """
+    Insert a row or update it when the primary key already exists.
+    Uses the native upsert syntax of SQLite or MySQL.
+    """
+    key_columns = set(key_columns)
+    update_values = {k: v for k, v in values.items() if k not in key_columns}
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=update_values)
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(**update_values)
+    else:
+        raise NotImplementedError(f"Upsert not supported for dialect '{dialect}'")
+
+    conn.execute(stmt)
+
+
+def close_stores():
+    """
+    Dispose all state store engines.
+    Call this on application shutdown.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
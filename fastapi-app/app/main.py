@@ -1,4 +1,9 @@
-from fastapi import FastAPI
+import asyncio
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.api.test import router as test_router
 from app.api.csv import router as csv_router
 from app.api.mysql import router as mysql_router
@@ -7,17 +12,54 @@ from app.api.agents import router as agents_router
 from app.api.user_api import router as user_router
 from app.api.payment_api import router as payment_router
 from app.api.notification_api import router as notification_router
+from app.api.metrics import router as metrics_router
+from app.api.traces import router as traces_router
 from fastapi.middleware.cors import CORSMiddleware
-from app.services.vector_service import _get_model
+from app.services.vector_service import _get_model, get_model_status, warm_up_model_in_background
+from app.services.workflow_index import start_index_watcher, stop_index_watcher
+from app.services.workflow_templates import start_template_sync, stop_template_sync
+from app.services.run_queue import start_run_workers, stop_run_workers
+from app.services.notification_writer import start_notification_writer, stop_notification_writer
+from app.db.mysql import close_async_db
+from app.db.chroma import close_chroma
+from app.db.shared_state import is_shared
+from app.services.metrics import HTTP_REQUEST_SECONDS
+from app.services.tracing import new_request_id, request_scope
 
 app = FastAPI() 
 
+# How the embedding model is loaded at startup:
+#   background - load on a thread; /live is up at once, /ready turns 200 when loaded
+#   eager      - block startup until the model is loaded
+#   lazy       - load on first use
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "background").lower()
+
 # Pre-load the AI model during startup to avoid timeout on first request
 @app.on_event("startup")
 async def startup_event():
-    print("🚀 Pre-loading Vector Model...")
-    _get_model()
-    print("✅ Vector Model Loaded and Ready!")
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 and not is_shared():
+        print("⚠️ Running several workers with STATE_BACKEND=memory: job status is only visible to the worker that created it")
+    if MODEL_WARMUP == "eager":
+        print("🚀 Pre-loading Vector Model...")
+        _get_model()
+        print("✅ Vector Model Loaded and Ready!")
+    elif MODEL_WARMUP != "lazy":
+        print("🚀 Loading Vector Model in the background...")
+        warm_up_model_in_background()
+    start_index_watcher()
+    start_template_sync()
+    start_run_workers()
+    start_notification_writer()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Thread joins: keep them off the event loop
+    await asyncio.to_thread(stop_run_workers)
+    await asyncio.to_thread(stop_index_watcher)
+    await asyncio.to_thread(stop_template_sync)
+    await stop_notification_writer()
+    await close_async_db()
+    close_chroma()
 
 # Allow requests from frontend (Vite dev server)
 origins = [
@@ -33,10 +75,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histogram for /metrics
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+# Request-scoped trace; fetch it later via /traces/{request_id}
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    with request_scope(request_id, f"{request.method} {request.url.path}",
+                       {"http.method": request.method, "http.target": request.url.path}) as span:
+        response = await call_next(request)
+        span.set_attribute("http.status_code", response.status_code)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 @app.get("/")
 def root():
     return {"message": "FastAPI running 🚀"}
 
+# Liveness: the process is up and serving
+@app.get("/live")
+def live():
+    return {"status": "alive"}
+
+# Readiness: the embedding model is loaded (always ready in lazy mode)
+@app.get("/ready")
+def ready():
+    model = get_model_status()
+    is_ready = model["status"] == "ready" or (MODEL_WARMUP == "lazy" and model["status"] != "failed")
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "starting", "model": model, "warmup": MODEL_WARMUP},
+    )
+
 app.include_router(test_router)
 app.include_router(csv_router)
 app.include_router(mysql_router)
@@ -45,3 +131,5 @@ app.include_router(agents_router)
 app.include_router(user_router)
 app.include_router(payment_router)
 app.include_router(notification_router)
+app.include_router(metrics_router)
+app.include_router(traces_router)
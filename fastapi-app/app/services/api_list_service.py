@@ -1,14 +1,37 @@
 from typing import List, Dict, Any, Optional
 import json
 import sqlalchemy as sa
-from app.db.mysql import SessionLocal
+from app.db.mysql import SessionLocal, engine
+from app.services.metrics import MYSQL_UPSERT_ROWS_TOTAL, MYSQL_UPSERT_SECONDS
+from app.services.tracing import traced
 
+_UPSERT_CONFLICT_CLAUSE = {
+    "mysql": """
+                    ON DUPLICATE KEY UPDATE 
+                        system_name = VALUES(system_name),
+                        api_name = VALUES(api_name),
+                        params_values = VALUES(params_values),
+                        return_values = VALUES(return_values),
+                        description = VALUES(description)
+    """,
+    # Local stand-in used by the benchmarks
+    "sqlite": """
+                    ON CONFLICT(id) DO UPDATE SET
+                        system_name = excluded.system_name,
+                        api_name = excluded.api_name,
+                        params_values = excluded.params_values,
+                        return_values = excluded.return_values,
+                        description = excluded.description
+    """,
+}
+
+@traced("mysql.upsert_api_records")
 def upsert_api_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Insert or Update multiple API records (Upsert)
     """
     try:
-        with SessionLocal() as session:
+        with MYSQL_UPSERT_SECONDS.time(), SessionLocal() as session:
             saved_count = 0
             for rec in records:
                 # Convert dicts to JSON strings for MySQL
@@ -18,13 +41,7 @@ def upsert_api_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
                 sql = sa.text("""
                     INSERT INTO api_list (id, system_name, api_name, params_values, return_values, description)
                     VALUES (:id, :system, :api, :params, :returns, :desc)
-                    ON DUPLICATE KEY UPDATE 
-                        system_name = VALUES(system_name),
-                        api_name = VALUES(api_name),
-                        params_values = VALUES(params_values),
-                        return_values = VALUES(return_values),
-                        description = VALUES(description)
-                """)
+                """ + _UPSERT_CONFLICT_CLAUSE[engine.dialect.name])
                 
                 session.execute(sql, {
                     "id": rec["id"],
@@ -37,6 +54,7 @@ def upsert_api_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
                 saved_count += 1
             
             session.commit()
+            MYSQL_UPSERT_ROWS_TOTAL.inc(saved_count)
             return {"success": True, "count": saved_count}
             
     except Exception as e:
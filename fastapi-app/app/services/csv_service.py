@@ -3,7 +3,6 @@ CSV Upload Service
 Handles CSV file upload, validation, and parsing
 """
 
-import pandas as pd
 import io
 import json
 import uuid
@@ -105,6 +104,8 @@ class CSVService:
         Returns:
             dict: Parsed data with rows, columns, and preview
         """
+        import pandas as pd
+
         try:
             # Read file content
             contents = await file.read()
@@ -178,6 +179,8 @@ class CSVService:
         Returns:
             dict: Transformed data ready for api_list table
         """
+        import pandas as pd
+
         try:
             transformed_records = []
             
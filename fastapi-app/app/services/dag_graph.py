@@ -0,0 +1,372 @@
+"""
+DAG Graph Service
+Reads the task graph of an airflow_dag.py with `ast`, without executing
+it: operators (task_id, operator class, python_callable) and the
+dependencies wired with >>, << and set_upstream / set_downstream.
+
+The graph is validated for the problems run_dag would otherwise only hit
+at run time:
+
+- syntax errors
+- airflow imports the DAG runner's shims don't provide
+- operators without a task_id or python_callable, duplicate task_ids
+- python_callables that are not defined (or only defined further down)
+- dependencies on names that are not tasks, and cycles
+
+Operators built in loops (non-constant task_ids) can't be resolved
+statically; they make the graph "static": false and are reported as
+warnings, not errors. Workflows store the result as graph.json so
+listings, visualization and scheduling can use it without exec.
+"""
+
+import ast
+import builtins
+import hashlib
+import os
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# strict: saving a DAG with errors fails | warn: it is saved, errors are recorded in graph.json
+DAG_VALIDATION_MODE = os.getenv("DAG_VALIDATION_MODE", "strict").lower()
+if DAG_VALIDATION_MODE not in ("strict", "warn"):
+    raise ValueError(f"DAG_VALIDATION_MODE must be 'strict' or 'warn', got '{DAG_VALIDATION_MODE}'")
+
+# What the DAG runner's airflow shims provide (see dag_runner._build_airflow_modules)
+_SHIM_IMPORTS = {
+    "airflow": {"DAG"},
+    "airflow.operators": {"python", "python_operator"},
+    "airflow.operators.python": {"PythonOperator"},
+    "airflow.operators.python_operator": {"PythonOperator"},
+}
+
+_BUILTINS = set(dir(builtins))
+
+
+def source_digest(source: str) -> str:
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _name(node: ast.AST) -> Optional[str]:
+    """Dotted name of a Name/Attribute node, e.g. "airflow.DAG"."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _name(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.AST]:
+    for kw in call.keywords:
+        if kw.arg == name:
+            return kw.value
+    return None
+
+
+def _constant_str(node: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+class _Scopes(ast.NodeVisitor):
+    """Names bound at module level (with the line they're first bound on) and inside functions."""
+
+    def __init__(self):
+        self.module: Dict[str, int] = {}
+        self.local: set = set()
+        self._depth = 0
+
+    def _bind(self, name: str, line: int):
+        if self._depth:
+            self.local.add(name)
+        else:
+            self.module.setdefault(name, line)
+
+    def _visit_function(self, node):
+        self._bind(node.name, node.lineno)
+        for arg in node.args.posonlyargs + node.args.args + node.args.kwonlyargs:
+            self.local.add(arg.arg)
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._bind(node.name, node.lineno)
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Store):
+            self._bind(node.id, node.lineno)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self._bind((alias.asname or alias.name).split(".")[0], node.lineno)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            self._bind(alias.asname or alias.name, node.lineno)
+
+
+class _GraphVisitor(ast.NodeVisitor):
+    """Collects operators, the variables they are assigned to and dependency expressions."""
+
+    def __init__(self):
+        self.dag_ids: List[str] = []
+        self.operators: List[Tuple[ast.Call, bool]] = []   # (call, inside a function)
+        self.assigned: Dict[int, str] = {}                 # id(call) -> variable name
+        self.dependencies: List[ast.AST] = []
+        self.imports: List[Tuple[str, Optional[str], int]] = []
+        self._depth = 0
+
+    def _visit_scope(self, node):
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append((alias.name, None, node.lineno))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            self.imports.append((node.module or "", alias.name, node.lineno))
+
+    def visit_Assign(self, node: ast.Assign):
+        if isinstance(node.value, ast.Call) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            self.assigned[id(node.value)] = node.targets[0].id
+        self.generic_visit(node)
+
+    def visit_Expr(self, node: ast.Expr):
+        value = node.value
+        if isinstance(value, ast.BinOp) and isinstance(value.op, (ast.RShift, ast.LShift)):
+            self.dependencies.append(value)
+        elif isinstance(value, ast.Call) and isinstance(value.func, ast.Attribute) \
+                and value.func.attr in ("set_upstream", "set_downstream"):
+            self.dependencies.append(value)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        name = _name(node.func) or ""
+        short = name.rsplit(".", 1)[-1]
+        if short == "DAG":
+            dag_id = _constant_str(node.args[0] if node.args else _keyword(node, "dag_id"))
+            if dag_id:
+                self.dag_ids.append(dag_id)
+        elif short.endswith("Operator"):
+            self.operators.append((node, self._depth > 0))
+        self.generic_visit(node)
+
+
+def _topo_order(task_ids: List[str], edges: List[Tuple[str, str]]) -> List[str]:
+    """Kahn's algorithm, like dag_runner._topo_sort; tasks on or behind a cycle are left out."""
+    in_degree = {tid: 0 for tid in task_ids}
+    adj: Dict[str, List[str]] = defaultdict(list)
+    for up, down in edges:
+        adj[up].append(down)
+        in_degree[down] += 1
+
+    queue = deque(tid for tid in task_ids if in_degree[tid] == 0)
+    order: List[str] = []
+    while queue:
+        tid = queue.popleft()
+        order.append(tid)
+        for down in adj[tid]:
+            in_degree[down] -= 1
+            if in_degree[down] == 0:
+                queue.append(down)
+    return order
+
+
+def extract_graph(source: str) -> Dict[str, Any]:
+    """
+    Parse an airflow_dag.py and extract its task graph without executing it.
+
+    Args:
+        source: airflow_dag.py source
+
+    Returns:
+        dict: dag_id, tasks, edges, order (topological, None if cyclic or
+              not static), static, valid, errors, warnings, source_sha256
+    """
+    graph: Dict[str, Any] = {
+        "dag_id": None,
+        "tasks": [],
+        "edges": [],
+        "order": None,
+        "static": True,
+        "valid": False,
+        "errors": [],
+        "warnings": [],
+        "source_sha256": source_digest(source),
+    }
+    errors, warnings = graph["errors"], graph["warnings"]
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        errors.append(f"Syntax error on line {e.lineno}: {e.msg}")
+        return graph
+
+    scopes = _Scopes()
+    scopes.visit(tree)
+    visitor = _GraphVisitor()
+    visitor.visit(tree)
+    graph["dag_id"] = visitor.dag_ids[0] if visitor.dag_ids else None
+
+    for module, name, line in visitor.imports:
+        root = module.split(".")[0]
+        if root != "airflow":
+            continue
+        if module not in _SHIM_IMPORTS or (name is not None and name not in _SHIM_IMPORTS[module]):
+            target = f"{module}.{name}" if name else module
+            errors.append(f"Line {line}: '{target}' is not available to the DAG runner "
+                          f"(only DAG and PythonOperator are)")
+
+    # Operators
+    task_vars: Dict[str, str] = {}
+    task_ids: List[str] = []
+    for call, in_function in visitor.operators:
+        line = call.lineno
+        operator = (_name(call.func) or "").rsplit(".", 1)[-1]
+        task_node = call.args[0] if call.args else _keyword(call, "task_id")
+        task_id = _constant_str(task_node)
+        if task_node is None:
+            errors.append(f"Line {line}: {operator} has no task_id")
+            continue
+        if task_id is None:
+            graph["static"] = False
+            warnings.append(f"Line {line}: task_id is computed at run time; the task is not in the static graph")
+            continue
+        if task_id in task_ids:
+            errors.append(f"Line {line}: duplicate task_id '{task_id}'")
+            continue
+
+        task = {"task_id": task_id, "operator": operator, "callable": None, "line": line}
+        callable_node = _keyword(call, "python_callable")
+        if callable_node is None:
+            errors.append(f"Line {line}: task '{task_id}' has no python_callable")
+        elif isinstance(callable_node, ast.Lambda):
+            task["callable"] = "<lambda>"
+        else:
+            callable_name = _name(callable_node)
+            task["callable"] = callable_name
+            base = (callable_name or "").split(".")[0]
+            if isinstance(callable_node, ast.Name):
+                defined_at = scopes.module.get(base)
+                if defined_at is None and base not in _BUILTINS and not (in_function and base in scopes.local):
+                    errors.append(f"Line {line}: task '{task_id}' calls '{base}', which is not defined")
+                elif defined_at is not None and defined_at > line and not in_function:
+                    errors.append(f"Line {line}: task '{task_id}' calls '{base}' before it is defined (line {defined_at})")
+
+        task_ids.append(task_id)
+        graph["tasks"].append(task)
+        variable = visitor.assigned.get(id(call))
+        if variable:
+            task_vars[variable] = task_id
+
+    # Dependencies
+    edges: List[Tuple[str, str]] = []
+
+    def add_edges(upstream: List[str], downstream: List[str]):
+        for up in upstream:
+            for down in downstream:
+                if (up, down) not in edges:
+                    edges.append((up, down))
+
+    def resolve(node: ast.AST) -> Optional[List[str]]:
+        """Task IDs an expression stands for; None if it can't be resolved statically."""
+        if isinstance(node, ast.Name):
+            if node.id in task_vars:
+                return [task_vars[node.id]]
+            if node.id in scopes.module or node.id in scopes.local:
+                return None
+            errors.append(f"Line {node.lineno}: dependency on '{node.id}', which is not a task")
+            return []
+        if isinstance(node, (ast.List, ast.Tuple)):
+            ids: List[str] = []
+            for element in node.elts:
+                resolved = resolve(element)
+                if resolved is None:
+                    return None
+                ids.extend(resolved)
+            return ids
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.RShift, ast.LShift)):
+            left, right = resolve(node.left), resolve(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, ast.RShift):
+                add_edges(left, right)
+            else:
+                add_edges(right, left)
+            # `a >> b` and `a << b` both evaluate to b
+            return right
+        return None
+
+    for dependency in visitor.dependencies:
+        if isinstance(dependency, ast.Call):
+            owner = resolve(dependency.func.value)
+            others = resolve(dependency.args[0]) if dependency.args else []
+            if owner is None or others is None:
+                resolved = False
+            else:
+                resolved = True
+                if dependency.func.attr == "set_downstream":
+                    add_edges(owner, others)
+                else:
+                    add_edges(others, owner)
+        else:
+            resolved = resolve(dependency) is not None
+        if not resolved:
+            graph["static"] = False
+            warnings.append(f"Line {dependency.lineno}: dependency can't be resolved statically")
+
+    graph["edges"] = [{"upstream": up, "downstream": down} for up, down in edges]
+
+    if not visitor.operators and not errors:
+        warnings.append("No tasks found; the DAG runner will refuse to run it")
+    order = _topo_order(task_ids, edges)
+    if len(order) < len(task_ids):
+        blocked = [tid for tid in task_ids if tid not in order]
+        errors.append(f"Cycle in task dependencies (involving {', '.join(blocked)})")
+    elif graph["static"]:
+        graph["order"] = order
+
+    graph["valid"] = not errors
+    return graph
+
+
+def validate_for_save(source: str) -> Dict[str, Any]:
+    """
+    Extract the graph of a DAG about to be saved.
+
+    Args:
+        source: airflow_dag.py source
+
+    Returns:
+        dict: The extracted graph
+
+    Raises:
+        ValueError: With DAG_VALIDATION_MODE=strict, if the DAG has errors
+    """
+    graph = extract_graph(source)
+    if graph["errors"] and DAG_VALIDATION_MODE == "strict":
+        raise ValueError("airflow_dag.py is invalid: " + "; ".join(graph["errors"]))
+    return graph
@@ -5,12 +5,25 @@ that capture task definitions and dependencies, then runs them
 in topological order.
 """
 
+import contextvars
+import copy
+import hashlib
 import io
+import json
+import os
+import pickle
 import sys
+import threading
 import time
 import types
+import uuid
 from collections import defaultdict, deque
-from typing import Any, Dict, List, Optional
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.cache import TTLCache
+from app.services.metrics import DAG_TASK_SECONDS
+from app.services.tracing import start_span, traced
 
 
 # ── Mock Airflow classes ──────────────────────────────────────────
@@ -41,21 +54,58 @@ class _TaskInstance:
         pass  # not needed — return values auto-stored
 
 
+def _seconds(value: Any) -> Optional[float]:
+    """Accept a timedelta or a number of seconds, like Airflow does."""
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+# Airflow BaseOperator arguments the runner honours, with Airflow's defaults
+_RETRY_ARGS = {
+    "retries": 0,
+    "retry_delay": timedelta(seconds=float(os.getenv("DAG_DEFAULT_RETRY_DELAY_SECONDS", "300"))),
+    "retry_exponential_backoff": False,
+    "max_retry_delay": None,
+    "execution_timeout": None,
+}
+
+
 class _PythonOperator:
-    """Mock PythonOperator that records task metadata."""
+    """Mock PythonOperator that records task metadata and retry/timeout policy."""
 
     def __init__(self, task_id: str, python_callable, op_kwargs: Optional[dict] = None,
-                 dag=None, provide_context: bool = False, **ignored):
+                 dag=None, provide_context: bool = False, memoize_ttl: Any = None, **kwargs):
         self.task_id = task_id
         self.python_callable = python_callable
         self.op_kwargs = op_kwargs or {}
         self._downstream: List[str] = []
         self._upstream: List[str] = []
+
+        dag = dag if dag is not None else _DAG._current()
+        # Explicit operator arguments win over the DAG's default_args
+        defaults = dag.default_args if dag is not None else {}
+        policy = {name: kwargs.get(name, defaults.get(name, default)) for name, default in _RETRY_ARGS.items()}
+        self.retries = int(policy["retries"] or 0)
+        self.retry_delay = _seconds(policy["retry_delay"]) or 0.0
+        self.retry_exponential_backoff = bool(policy["retry_exponential_backoff"])
+        self.max_retry_delay = _seconds(policy["max_retry_delay"])
+        self.execution_timeout = _seconds(policy["execution_timeout"])
+        # Opt-in only: set for idempotent, read-only tasks
+        self.memoize_ttl = _seconds(memoize_ttl)
+
         # auto-register on current DAG
         if dag is not None:
             dag._register_task(self)
-        elif _DAG._current is not None:
-            _DAG._current._register_task(self)
+
+    def retry_wait(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        delay = self.retry_delay * (2 ** (attempt - 1) if self.retry_exponential_backoff else 1)
+        if self.max_retry_delay is not None:
+            delay = min(delay, self.max_retry_delay)
+        return delay
 
     # Support >> and << operators for dependency wiring
     def __rshift__(self, other):
@@ -83,6 +133,12 @@ class _PythonOperator:
                 o._add_downstream(self)
         return self
 
+    def set_downstream(self, other):
+        self >> other
+
+    def set_upstream(self, other):
+        self << other
+
     def _add_downstream(self, other: "_PythonOperator"):
         if other.task_id not in self._downstream:
             self._downstream.append(other.task_id)
@@ -93,10 +149,16 @@ class _PythonOperator:
 class _DAG:
     """Mock DAG that collects tasks via context manager or explicit dag= param."""
 
-    _current: Optional["_DAG"] = None
+    # Per thread, so DAG files can be parsed by several run workers at once
+    _local = threading.local()
 
-    def __init__(self, dag_id: str, **ignored):
+    @staticmethod
+    def _current() -> Optional["_DAG"]:
+        return getattr(_DAG._local, "dag", None)
+
+    def __init__(self, dag_id: str, default_args: Optional[dict] = None, **ignored):
         self.dag_id = dag_id
+        self.default_args = default_args or {}
         self.tasks: Dict[str, _PythonOperator] = {}
 
     def _register_task(self, task: _PythonOperator):
@@ -104,11 +166,11 @@ class _DAG:
 
     # Context manager support: `with DAG(...) as dag:`
     def __enter__(self):
-        _DAG._current = self
+        _DAG._local.dag = self
         return self
 
     def __exit__(self, *args):
-        _DAG._current = None
+        _DAG._local.dag = None
 
 
 # ── Build mock airflow modules ───────────────────────────────────
@@ -138,6 +200,79 @@ def _build_airflow_modules() -> Dict[str, types.ModuleType]:
     }
 
 
+_shim_lock = threading.Lock()
+_shim_users = 0
+_saved_modules: Dict[str, Optional[types.ModuleType]] = {}
+
+
+def _install_airflow_shims():
+    """Inject the mock airflow modules; reference-counted across concurrent runs."""
+    global _shim_users
+    with _shim_lock:
+        if _shim_users == 0:
+            for name, mod in _build_airflow_modules().items():
+                _saved_modules[name] = sys.modules.get(name)
+                sys.modules[name] = mod
+        _shim_users += 1
+
+
+def _remove_airflow_shims():
+    """Restore the original modules once the last concurrent run finishes."""
+    global _shim_users
+    with _shim_lock:
+        _shim_users -= 1
+        if _shim_users == 0:
+            for name, orig in _saved_modules.items():
+                if orig is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = orig
+            _saved_modules.clear()
+
+
+# ── Per-thread stdout capture ────────────────────────────────────
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """
+    sys.stdout replacement that sends writes from a capturing thread to that
+    thread's buffer and everything else to the real stdout, so concurrent
+    runs don't steal each other's task output.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]):
+        self._local.buffer = buffer
+
+    def _stream(self):
+        return getattr(self._local, "buffer", None) or self._target
+
+    def write(self, s: str) -> int:
+        return self._stream().write(s)
+
+    def flush(self):
+        self._stream().flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+def _stdout_proxy() -> _ThreadLocalStdout:
+    """Install the capturing proxy over sys.stdout once and return it."""
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        return sys.stdout
+
+
 # ── Topological sort ─────────────────────────────────────────────
 
 def _topo_sort(tasks: Dict[str, _PythonOperator]) -> List[str]:
@@ -166,28 +301,311 @@ def _topo_sort(tasks: Dict[str, _PythonOperator]) -> List[str]:
     return order
 
 
+# ── Run checkpoints ──────────────────────────────────────────────
+
+def checkpoint_path(dag_path: str, run_id: str) -> str:
+    """Checkpoint file for a run, kept next to the DAG file."""
+    return os.path.join(os.path.dirname(os.path.abspath(dag_path)), ".checkpoints", f"{run_id}.pkl")
+
+
+def checkpoint_status(dag_path: str, run_id: str) -> Optional[bool]:
+    """
+    Whether a run's checkpoint can be resumed against the current DAG file.
+
+    Returns:
+        bool: True if the checkpoint matches airflow_dag.py, False if the DAG
+        changed since it was written (or it is unreadable); None if there is
+        no checkpoint
+    """
+    try:
+        with open(checkpoint_path(dag_path, run_id), "rb") as f:
+            checkpoint = pickle.load(f)
+        with open(dag_path, "r") as f:
+            code = f.read()
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return False
+    return checkpoint.get("code_hash") == hashlib.sha256(code.encode()).hexdigest()
+
+
+def _load_checkpoint(path: str, code_hash: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    if checkpoint.get("code_hash") != code_hash:
+        raise RuntimeError("DAG file changed since the checkpoint was written; start a new run instead")
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> bool:
+    """Write-then-rename so a crash never leaves a torn checkpoint."""
+    # Unique per writer: a reclaimed lease can run the same run_id twice at once
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return True
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        print(f"⚠️ XCom values can't be pickled, checkpointing disabled for this run: {e}")
+    except OSError as e:
+        print(f"⚠️ Could not write checkpoint, checkpointing disabled for this run: {e}")
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+    return False
+
+
+def discard_checkpoint(dag_path: str, run_id: str):
+    """Remove a run's checkpoint once it is no longer needed."""
+    try:
+        os.remove(checkpoint_path(dag_path, run_id))
+    except FileNotFoundError:
+        pass
+
+
+# ── Task memoization ─────────────────────────────────────────────
+
+# Results of tasks declared with memoize_ttl, shared by all runs in this process
+_memo_cache = TTLCache("dag_task_memo", max_entries=int(os.getenv("DAG_MEMO_MAX_ENTRIES", "1024")))
+
+
+def _code_digest(code: types.CodeType) -> str:
+    # Nested code objects repr with their address, so digest them recursively
+    consts = [_code_digest(c) if isinstance(c, types.CodeType) else repr(c) for c in code.co_consts]
+    parts = [code.co_name, code.co_code.hex(), "|".join(consts), repr(code.co_names)]
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+def _global_names(code: types.CodeType) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _value_fingerprint(value: Any, seen: set) -> str:
+    """Stable description of a global or closure value a callable reads."""
+    if isinstance(value, types.ModuleType):
+        return f"module:{value.__name__}"
+    if isinstance(value, types.FunctionType):
+        return "<recursive>" if id(value) in seen else _callable_fingerprint(value, seen)
+    if isinstance(value, (type, types.BuiltinFunctionType)):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    try:
+        return json.dumps(value, sort_keys=True, default=repr)
+    except Exception:
+        # Objects whose repr carries an address never match, which only costs a miss
+        return repr(value)
+
+
+def _callable_fingerprint(fn, seen: Optional[set] = None) -> str:
+    """
+    Identify a callable by its code rather than its object identity, since
+    the DAG file is exec'd again (new function objects) on every run.
+    The module globals it reads and its closure cells are part of the
+    fingerprint, so DAGs that differ only in a constant don't share results.
+    """
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+    seen = (seen or set()) | {id(fn)}
+    fn_globals = getattr(fn, "__globals__", {})
+    env = {name: _value_fingerprint(fn_globals[name], seen)
+           for name in sorted(_global_names(code)) if name in fn_globals}
+    cells = []
+    for cell in fn.__closure__ or ():
+        try:
+            cells.append(_value_fingerprint(cell.cell_contents, seen))
+        except ValueError:  # empty cell
+            cells.append("<empty>")
+    material = json.dumps({
+        "code": _code_digest(code),
+        "defaults": repr(fn.__defaults__),
+        "kwdefaults": repr(fn.__kwdefaults__),
+        "globals": env,
+        "closure": cells,
+    }, sort_keys=True)
+    return f"{fn.__qualname__}:{hashlib.sha256(material.encode()).hexdigest()[:16]}"
+
+
+def _memo_key(task: _PythonOperator, xcom: _XComStore, scope: str) -> str:
+    # Every XCom value so far, not only direct upstreams: a task may xcom_pull any task
+    available = dict(sorted(xcom._data.items()))
+    payload = json.dumps({"scope": scope, "task_id": task.task_id, "op_kwargs": task.op_kwargs,
+                          "xcom": available}, sort_keys=True, default=repr)
+    return f"{_callable_fingerprint(task.python_callable)}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def _memo_lookup(task: _PythonOperator, xcom: _XComStore, scope: str) -> Tuple[Optional[str], Optional[Tuple[dict, Any]]]:
+    """
+    Args:
+        task: Task about to run
+        xcom: XCom values of the run so far
+        scope: DAG file and dag_id, so results never cross workflows
+
+    Returns:
+        (key, (task_result, return_value)) on a hit, (key, None) on a miss,
+        (None, None) for tasks that aren't memoized
+    """
+    if not task.memoize_ttl:
+        return None, None
+    key = _memo_key(task, xcom, scope)
+    cached = _memo_cache.get(key)
+    if cached is None:
+        return key, None
+    output, ret = cached
+    result = {
+        "task_id": task.task_id,
+        "status": "success",
+        "output": output,
+        "return_value": repr(ret) if ret is not None else None,
+        "error": None,
+        "attempts": 0,
+        "cached": True,
+        "duration_ms": 0,
+    }
+    # Callers get their own copy so a downstream mutation can't poison the cache
+    return key, (result, copy.deepcopy(ret))
+
+
+def _memo_store(task: _PythonOperator, key: str, result: dict, ret: Any):
+    try:
+        _memo_cache.set(key, (result["output"], copy.deepcopy(ret)), ttl=task.memoize_ttl)
+    except Exception as e:
+        print(f"⚠️ Could not memoize {task.task_id}: {e}")
+
+
+def clear_task_memo():
+    """Forget every memoized task result in this process."""
+    _memo_cache.clear()
+
+
+# ── Task execution ───────────────────────────────────────────────
+
+class TaskTimeout(Exception):
+    """Raised when a task exceeds its execution_timeout."""
+
+
+def _call_with_timeout(task: _PythonOperator, kwargs: Dict[str, Any], stdout: _ThreadLocalStdout,
+                       capture: io.StringIO) -> Any:
+    """
+    Run the callable on a helper thread and stop waiting after
+    execution_timeout. Python threads can't be killed, so a timed-out
+    callable is abandoned (daemon thread) rather than interrupted; the
+    caller must not retry it while that thread may still be running.
+    """
+    outcome: Dict[str, Any] = {}
+    context = contextvars.copy_context()
+
+    def _target():
+        stdout.capture(capture)
+        try:
+            outcome["value"] = context.run(task.python_callable, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            stdout.capture(None)
+
+    worker = threading.Thread(target=_target, name=f"dag-task-{task.task_id}", daemon=True)
+    worker.start()
+    worker.join(task.execution_timeout)
+    if worker.is_alive():
+        raise TaskTimeout(f"Task exceeded execution_timeout of {task.execution_timeout:g}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def _execute_task(task: _PythonOperator, ti: _TaskInstance, dag_id: str,
+                  stdout: _ThreadLocalStdout) -> Tuple[dict, Any]:
+    """
+    Run one task with its retry policy.
+
+    Returns:
+        (task_result, return_value)
+    """
+    capture = io.StringIO()
+    attempts = 0
+    start = time.time()
+
+    while True:
+        attempts += 1
+        attempt_start = time.time()
+        stdout.capture(capture)
+        try:
+            kwargs = {**task.op_kwargs, "ti": ti}
+            with start_span("dag.task", {"dag_id": dag_id, "task_id": task.task_id, "attempt": attempts}):
+                if task.execution_timeout:
+                    ret = _call_with_timeout(task, kwargs, stdout, capture)
+                else:
+                    ret = task.python_callable(**kwargs)
+            DAG_TASK_SECONDS.observe(time.time() - attempt_start, status="success")
+            stdout.capture(None)
+            return {
+                "task_id": task.task_id,
+                "status": "success",
+                "output": capture.getvalue().strip() or None,
+                "return_value": repr(ret) if ret is not None else None,
+                "error": None,
+                "attempts": attempts,
+                "duration_ms": int((time.time() - start) * 1000),
+            }, ret
+
+        except Exception as e:
+            DAG_TASK_SECONDS.observe(time.time() - attempt_start, status="failed")
+            stdout.capture(None)
+            # A timed-out callable may still be running on its abandoned thread;
+            # retrying would run a non-idempotent task twice at once
+            if attempts <= task.retries and not isinstance(e, TaskTimeout):
+                wait = task.retry_wait(attempts)
+                capture.write(f"\n[attempt {attempts} failed: {e}; retrying in {wait:g}s]\n")
+                time.sleep(wait)
+                continue
+            return {
+                "task_id": task.task_id,
+                "status": "failed",
+                "output": capture.getvalue().strip() or None,
+                "error": str(e),
+                "attempts": attempts,
+                "duration_ms": int((time.time() - start) * 1000),
+            }, None
+
+
 # ── Public API ────────────────────────────────────────────────────
 
-def run_dag(dag_path: str, on_task_update=None) -> dict:
+@traced("dag.run")
+def run_dag(dag_path: str, on_task_update=None, run_id: Optional[str] = None) -> dict:
     """
     Execute an airflow_dag.py file and return execution results.
 
+    Tasks honour Airflow's retries / retry_delay / retry_exponential_backoff /
+    max_retry_delay / execution_timeout (directly or via DAG default_args).
+    Tasks declared with memoize_ttl reuse a cached result when the same code
+    runs with the same op_kwargs and upstream XCom values.
+    With a run_id, XCom values are checkpointed after every successful task;
+    running the same run_id again resumes after the last completed task.
+
     Args:
         dag_path: Absolute path to the airflow_dag.py file
         on_task_update: Optional callback(task_id, status, index, total) for progress
+        run_id: Optional run identifier enabling checkpoint/resume
 
     Returns:
-        { status, tasks: [{ task_id, status, output, error, duration_ms }] }
+        { status, tasks: [{ task_id, status, output, error, attempts, cached, duration_ms }], resumed_tasks }
     """
-    # Reset global DAG state
-    _DAG._current = None
+    # Reset this thread's DAG state
+    _DAG._local.dag = None
 
     # Inject mock airflow modules
-    fake_modules = _build_airflow_modules()
-    saved_modules = {}
-    for name, mod in fake_modules.items():
-        saved_modules[name] = sys.modules.get(name)
-        sys.modules[name] = mod
+    _install_airflow_shims()
+    stdout = _stdout_proxy()
 
     try:
         # Read and exec the DAG file
@@ -218,9 +636,20 @@ def run_dag(dag_path: str, on_task_update=None) -> dict:
 
         # Topological sort
         order = _topo_sort(dag.tasks)
+        memo_scope = f"{os.path.abspath(dag_path)}:{dag.dag_id}"
         xcom = _XComStore()
         ti = _TaskInstance(xcom)
 
+        # Resume from an earlier attempt of this run, if any
+        ckpt_path = checkpoint_path(dag_path, run_id) if run_id else None
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        checkpoint = _load_checkpoint(ckpt_path, code_hash) if ckpt_path else None
+        completed: Dict[str, dict] = dict(checkpoint["completed"]) if checkpoint else {}
+        resumed = len(completed)
+        if checkpoint:
+            xcom._data.update(checkpoint["xcom"])
+            print(f"⏩ Resuming run {run_id} after {len(completed)} completed task(s)")
+
         task_results: List[dict] = []
         failed = False
 
@@ -230,6 +659,12 @@ def run_dag(dag_path: str, on_task_update=None) -> dict:
             if on_task_update:
                 on_task_update(task_id, "running", idx, len(order))
 
+            if task_id in completed:
+                task_results.append({**completed[task_id], "resumed": True})
+                if on_task_update:
+                    on_task_update(task_id, "success", idx, len(order))
+                continue
+
             if failed:
                 task_results.append({
                     "task_id": task_id,
@@ -242,62 +677,40 @@ def run_dag(dag_path: str, on_task_update=None) -> dict:
                     on_task_update(task_id, "skipped", idx, len(order))
                 continue
 
-            # Capture stdout
-            capture = io.StringIO()
-            old_stdout = sys.stdout
-            sys.stdout = capture
-
-            start = time.time()
-            try:
-                kwargs = {**task.op_kwargs, "ti": ti}
-                ret = task.python_callable(**kwargs)
-                duration = int((time.time() - start) * 1000)
+            memo_key, hit = _memo_lookup(task, xcom, memo_scope)
+            if hit is not None:
+                result, ret = hit
+            else:
+                result, ret = _execute_task(task, ti, dag.dag_id, stdout)
+                if memo_key and result["status"] == "success":
+                    _memo_store(task, memo_key, result, ret)
+            task_results.append(result)
 
+            if result["status"] == "success":
                 # Store return value as XCom
                 if ret is not None:
                     xcom.push(task_id, ret)
-
-                sys.stdout = old_stdout
-                output = capture.getvalue().strip() or None
-
-                task_results.append({
-                    "task_id": task_id,
-                    "status": "success",
-                    "output": output,
-                    "return_value": repr(ret) if ret is not None else None,
-                    "error": None,
-                    "duration_ms": duration,
-                })
-                if on_task_update:
-                    on_task_update(task_id, "success", idx, len(order))
-
-            except Exception as e:
-                duration = int((time.time() - start) * 1000)
-                sys.stdout = old_stdout
-                output = capture.getvalue().strip() or None
+                if ckpt_path:
+                    completed[task_id] = result
+                    if not _save_checkpoint(ckpt_path, {"code_hash": code_hash, "completed": completed,
+                                                        "xcom": xcom._data}):
+                        ckpt_path = None
+            else:
                 failed = True
 
-                task_results.append({
-                    "task_id": task_id,
-                    "status": "failed",
-                    "output": output,
-                    "error": str(e),
-                    "duration_ms": duration,
-                })
-                if on_task_update:
-                    on_task_update(task_id, "failed", idx, len(order))
+            if on_task_update:
+                on_task_update(task_id, result["status"], idx, len(order))
 
         overall = "failed" if failed else "completed"
-        return {"status": overall, "tasks": task_results}
+        if run_id and not failed:
+            discard_checkpoint(dag_path, run_id)
+        return {"status": overall, "tasks": task_results, "resumed_tasks": resumed}
 
     except Exception as e:
         return {"status": "failed", "tasks": [], "error": str(e)}
 
     finally:
         # Restore original modules
-        for name, orig in saved_modules.items():
-            if orig is None:
-                sys.modules.pop(name, None)
-            else:
-                sys.modules[name] = orig
-        _DAG._current = None
+        stdout.capture(None)
+        _remove_airflow_shims()
+        _DAG._local.dag = None
@@ -0,0 +1,112 @@
+"""
+Entity Cache Service
+Read-through cache for single-entity lookups (users, transactions) in the
+mock API services.
+
+Entries live in each worker's TTL/LRU cache. Every entry remembers the
+generation of its namespace when it was loaded; a write that changes an
+entity bumps that generation through shared_state, so with
+STATE_BACKEND=sql the other workers drop their copies within
+STATE_GENERATION_CACHE_SECONDS. Lookups that find nothing are not cached.
+Generation reads and bumps are SQL queries then, so they run in a thread
+instead of on the event loop.
+
+ENTITY_CACHE_BACKEND=memory (default) enables the cache, off disables it.
+"""
+
+import asyncio
+import copy
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.db.shared_state import bump_generation, get_generation, is_shared
+from app.services.cache import TTLCache
+
+load_dotenv()
+
+ENTITY_CACHE_BACKEND = os.getenv("ENTITY_CACHE_BACKEND", "memory").lower()
+if ENTITY_CACHE_BACKEND not in ("memory", "off"):
+    raise ValueError(f"ENTITY_CACHE_BACKEND must be 'memory' or 'off', got '{ENTITY_CACHE_BACKEND}'")
+
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "30"))
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+
+
+class EntityCache:
+    """Read-through cache for one entity type, e.g. users by id."""
+
+    def __init__(self, namespace: str, ttl: float = ENTITY_CACHE_TTL_SECONDS,
+                 max_entries: int = ENTITY_CACHE_MAX_ENTRIES):
+        self.namespace = namespace
+        self.enabled = ENTITY_CACHE_BACKEND != "off"
+        self._cache = TTLCache(f"entity:{namespace}", max_entries=max_entries, ttl=ttl)
+
+    def _generation_key(self) -> str:
+        return f"entity:{self.namespace}"
+
+    async def _shared_call(self, fn: Callable[[str], int]) -> int:
+        """Run a generation read or bump; off the event loop when it hits the database."""
+        if not is_shared():
+            return fn(self._generation_key())
+        return await asyncio.to_thread(fn, self._generation_key())
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entity, or load it and cache it.
+
+        Args:
+            key: Entity id
+            loader: Coroutine function returning the entity, or None if it doesn't exist
+
+        Returns:
+            dict: A copy of the entity, or None
+        """
+        if not self.enabled:
+            return await loader()
+
+        generation = await self._shared_call(get_generation)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == generation:
+            return copy.deepcopy(cached[1])
+
+        entity = await loader()
+        if entity is not None:
+            self._cache.set(key, (generation, copy.deepcopy(entity)))
+        return entity
+
+    async def invalidate(self, key: str, broadcast: bool = True):
+        """
+        Drop an entity after a write.
+
+        Args:
+            key: Entity id
+            broadcast: Also invalidate the namespace in every other worker
+        """
+        self._cache.invalidate(key)
+        if broadcast and self.enabled:
+            await self._shared_call(bump_generation)
+
+    def invalidate_sync(self, key: str, broadcast: bool = True):
+        """invalidate for synchronous callers, e.g. background jobs on the sync session."""
+        self._cache.invalidate(key)
+        if broadcast and self.enabled:
+            bump_generation(self._generation_key())
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "enabled": self.enabled,
+                "generation": get_generation(self._generation_key())}
+
+
+user_cache = EntityCache("user")
+transaction_cache = EntityCache("transaction")
+
+
+def get_entity_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of every entity cache in this worker."""
+    return {
+        "backend": ENTITY_CACHE_BACKEND,
+        "ttl_seconds": ENTITY_CACHE_TTL_SECONDS,
+        "caches": [user_cache.stats(), transaction_cache.stats()],
+    }
@@ -1,18 +1,26 @@
+import time
 import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from app.db import shared_state
+
 class JobService:
     """
-    Simple in-memory job tracker for background tasks.
-    In production, this would use Redis or a database.
+    Job tracker for background tasks.
+    In-memory by default; with STATE_BACKEND=sql jobs are stored in the
+    shared state database so any worker can report on any job.
     """
     _jobs: Dict[str, Dict[str, Any]] = {}
 
+    # Progress-only updates closer together than this are coalesced (sql backend)
+    PROGRESS_WRITE_INTERVAL = 0.25
+    _last_progress_write: Dict[str, float] = {}
+
     @classmethod
-    def create_job(cls, job_type: str) -> str:
-        job_id = str(uuid.uuid4())
-        cls._jobs[job_id] = {
+    def create_job(cls, job_type: str, job_id: str = None) -> str:
+        job_id = job_id or str(uuid.uuid4())
+        job = {
             "id": job_id,
             "type": job_type,
             "status": "pending",
@@ -22,10 +30,36 @@ class JobService:
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
         }
+        if shared_state.is_shared():
+            shared_state.insert_job(job)
+        else:
+            cls._jobs[job_id] = job
         return job_id
 
     @classmethod
     def update_job(cls, job_id: str, status: str = None, progress: int = None, result: Any = None, error: str = None):
+        if shared_state.is_shared():
+            values: Dict[str, Any] = {}
+            if status: values["status"] = status
+            if progress is not None: values["progress"] = progress
+            if result is not None: values["result"] = result
+            if error: values["error"] = error
+            if not values:
+                return
+
+            now = time.monotonic()
+            if list(values) == ["progress"] and progress < 100:
+                if now - cls._last_progress_write.get(job_id, 0.0) < cls.PROGRESS_WRITE_INTERVAL:
+                    return
+            if status in ("completed", "failed", "error"):
+                cls._last_progress_write.pop(job_id, None)
+            else:
+                cls._last_progress_write[job_id] = now
+
+            values["updated_at"] = datetime.now().isoformat()
+            shared_state.update_job(job_id, values)
+            return
+
         if job_id in cls._jobs:
             job = cls._jobs[job_id]
             if status: job["status"] = status
@@ -34,10 +68,24 @@ class JobService:
             if error: job["error"] = error
             job["updated_at"] = datetime.now().isoformat()
 
+    @classmethod
+    def reset_job(cls, job_id: str):
+        """Clear a finished job's outcome so it can be run again."""
+        values = {"status": "pending", "progress": 0, "result": None, "error": None,
+                  "updated_at": datetime.now().isoformat()}
+        if shared_state.is_shared():
+            shared_state.update_job(job_id, values)
+        elif job_id in cls._jobs:
+            cls._jobs[job_id].update(values)
+
     @classmethod
     def get_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        if shared_state.is_shared():
+            return shared_state.fetch_job(job_id)
         return cls._jobs.get(job_id)
 
     @classmethod
     def list_jobs(cls) -> Dict[str, Dict[str, Any]]:
+        if shared_state.is_shared():
+            return {job["id"]: job for job in shared_state.fetch_jobs()}
         return cls._jobs
@@ -0,0 +1,322 @@
+"""
+Metrics Service
+Minimal Prometheus-compatible metrics registry (counters, gauges,
+histograms) with text exposition for the /metrics endpoint.
+Values are per worker process.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra.items())
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelKey, List[float]] = {}  # bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration (seconds) of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self, **labels) -> Dict[str, float]:
+        """Count and sum observed so far for one label set."""
+        series = self._series.get(self._key(labels))
+        if series is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": series[-1], "sum": series[-2]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = self._header()
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus callbacks that refresh gauges at scrape time."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in Prometheus text format (0.0.4)
+    """
+    return REGISTRY.render()
+
+
+# ── Hot-path metrics ─────────────────────────────────────────────
+
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+EMBEDDING_BATCH_SECONDS = histogram(
+    "embedding_batch_duration_seconds", "Time to encode one batch of texts",
+)
+EMBEDDING_TEXTS_TOTAL = counter(
+    "embedding_texts_total", "Number of texts encoded into embeddings",
+)
+CHROMA_OPERATION_SECONDS = histogram(
+    "chroma_operation_duration_seconds", "ChromaDB call latency by operation", ["operation"],
+)
+MYSQL_UPSERT_SECONDS = histogram(
+    "mysql_upsert_duration_seconds", "Latency of api_list upsert batches",
+)
+MYSQL_UPSERT_ROWS_TOTAL = counter(
+    "mysql_upsert_rows_total", "Rows written by api_list upserts",
+)
+CSV_STAGE_SECONDS = histogram(
+    "csv_job_stage_duration_seconds", "Duration of each CSV ingestion stage", ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+DAG_TASK_SECONDS = histogram(
+    "dag_task_duration_seconds", "Duration of individual DAG tasks", ["status"],
+)
+LLM_CALL_SECONDS = histogram(
+    "llm_call_duration_seconds", "Latency of LLM calls made by the agent", ["model"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_TOKENS_TOTAL = counter(
+    "llm_tokens_total", "Tokens consumed by LLM calls", ["model", "kind"],
+)
+LLM_BACKEND_CALLS_TOTAL = counter(
+    "llm_backend_calls_total", "Routed LLM calls by backend and result (success/error)", ["backend", "result"],
+)
+LLM_BACKEND_SECONDS = histogram(
+    "llm_backend_duration_seconds", "Latency of successful routed LLM calls by backend", ["backend"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_HEDGES_TOTAL = counter(
+    "llm_hedges_total", "Hedged LLM calls by which request answered first (primary/hedge)", ["winner"],
+)
+AGENT_ITERATIONS = histogram(
+    "agent_iterations", "LLM calls needed to answer one agent query", ["mode"],
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 12, 15),
+)
+AGENT_PROMPT_TOKENS = histogram(
+    "agent_prompt_tokens", "Prompt tokens sent per agent LLM call", ["mode"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+AGENT_PARSE_ERRORS_TOTAL = counter(
+    "agent_parse_errors_total", "LLM outputs the agent could not parse (each costs a retry round trip)", ["mode"],
+)
+AGENT_PRECHECK_TOTAL = counter(
+    "agent_precheck_total", "Agent queries by feasibility pre-check result (pass/reject/skipped/error)", ["result"],
+)
+WORKFLOW_TEMPLATE_LOOKUPS_TOTAL = counter(
+    "workflow_template_lookups_total", "Agent queries by workflow template outcome (seed/miss/error)", ["result"],
+)
+CACHE_REQUESTS_TOTAL = counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"],
+)
+DB_POOL_CONNECTIONS = gauge(
+    "db_pool_connections", "SQLAlchemy pool connections by engine and state", ["engine", "state"],
+)
+DB_POOL_EVENTS = gauge(
+    "db_pool_events", "Cumulative SQLAlchemy pool events by engine and event", ["engine", "event"],
+)
+NOTIFICATION_QUEUE_DEPTH = gauge(
+    "notification_queue_depth", "Notification records waiting for the write-behind flusher",
+)
+NOTIFICATION_WRITES_TOTAL = counter(
+    "notification_writes_total", "Write-behind notification records by result (written/dropped/rejected)", ["result"],
+)
+NOTIFICATION_BATCH_SECONDS = histogram(
+    "notification_flush_duration_seconds", "Latency of one write-behind notification batch insert",
+)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup for hit-rate tracking"""
+    CACHE_REQUESTS_TOTAL.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _collect_pool_stats():
+    from app.db.mysql import get_pool_stats
+    stats = get_pool_stats()
+    for engine_name in ("sync", "async"):
+        snapshot = stats[engine_name]
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            if state in snapshot:
+                DB_POOL_CONNECTIONS.set(snapshot[state], engine=engine_name, state=state)
+        for event_name in ("checkouts", "connects", "invalidations", "pre_pings",
+                           "pre_ping_failures", "checkout_timeouts"):
+            DB_POOL_EVENTS.set(snapshot[event_name], engine=engine_name, event=event_name)
+
+
+REGISTRY.add_collector(_collect_pool_stats)
@@ -0,0 +1,106 @@
+"""
+Embedding Model Cache
+Bakes the sentence-transformers model into a local directory (safetensors)
+at image build time and loads it from there at runtime, with no network
+access. safetensors weights are memory-mapped, so every uvicorn worker on a
+host shares the same page-cache copy instead of holding its own.
+
+Kept free of app imports so the Dockerfile can run it as a plain script:
+    python app/services/model_cache.py --bake
+"""
+
+import argparse
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Tuple
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+MODEL_CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", "/opt/models"))
+
+
+def baked_model_path(model_name: str = EMBEDDING_MODEL) -> Path:
+    """Directory a baked model lives in, e.g. /opt/models/all-MiniLM-L6-v2"""
+    return MODEL_CACHE_DIR / model_name.replace("/", "__")
+
+
+def is_baked(model_name: str = EMBEDDING_MODEL) -> bool:
+    """
+    Check that a complete safetensors copy of the model is in the cache.
+
+    Returns:
+        bool: True if the model can be loaded offline from MODEL_CACHE_DIR
+    """
+    path = baked_model_path(model_name)
+    return (path / "modules.json").exists() and any(path.rglob("*.safetensors"))
+
+
+def bake_model(model_name: str = EMBEDDING_MODEL, force: bool = False) -> Path:
+    """
+    Download the model once and save it to the cache as safetensors.
+    Writes to a temp directory first so a half-written cache is never used.
+
+    Args:
+        model_name: Hugging Face model id
+        force: Re-bake even if the cache already holds the model
+
+    Returns:
+        Path: The baked model directory
+    """
+    from sentence_transformers import SentenceTransformer
+
+    path = baked_model_path(model_name)
+    if is_baked(model_name) and not force:
+        print(f"✅ Model already baked at {path}")
+        return path
+
+    print(f"📦 Baking {model_name} into {path}...")
+    model = SentenceTransformer(model_name, device="cpu")
+    tmp_path = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    model.save(str(tmp_path), safe_serialization=True)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    print(f"✅ Model baked at {path}")
+    return path
+
+
+def load_model(model_name: str = EMBEDDING_MODEL) -> Tuple[object, str]:
+    """
+    Load the embedding model, preferring the baked cache.
+
+    Args:
+        model_name: Hugging Face model id
+
+    Returns:
+        tuple: (SentenceTransformer, source) where source is "cache" or "hub"
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if is_baked(model_name):
+        path = baked_model_path(model_name)
+        return SentenceTransformer(str(path), device="cpu", local_files_only=True), "cache"
+
+    print(f"⚠️ {model_name} not baked in {MODEL_CACHE_DIR}, loading from the Hugging Face hub")
+    return SentenceTransformer(model_name), "hub"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake the embedding model into a local cache")
+    parser.add_argument("--bake", action="store_true", help="Download and save the model as safetensors")
+    parser.add_argument("--force", action="store_true", help="Re-bake even if already cached")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    if args.bake:
+        bake_model(args.model, force=args.force)
+
+    start = time.perf_counter()
+    load_model(args.model)
+    print(f"⏱️ Loaded {args.model} in {time.perf_counter() - start:.2f}s "
+          f"({'baked' if is_baked(args.model) else 'not baked'})")
+
+
+if __name__ == "__main__":
+    main()
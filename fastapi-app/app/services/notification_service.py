@@ -1,19 +1,46 @@
 """
 NotificationSystem Service
-Handles email and SMS notification operations
+Handles email and SMS notification operations.
+The routers use the async methods; the *_sync variants take a regular
+Session for background jobs and scripts on the sync engine and always
+write inline.
 """
 
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.services import notification_writer
+
+_INSERT_EMAIL = text("""
+    INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
+    VALUES (:id, 'email', :recipient, :subject, :message, 'sent')
+""")
+
+_INSERT_SMS = text("""
+    INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
+    VALUES (:id, 'sms', :recipient, NULL, :message, 'sent')
+""")
+
+
+def _sent(notification_id: str) -> Dict[str, Any]:
+    return {
+        "status": "sent",
+        "notification_id": notification_id
+    }
+
 
 class NotificationService:
-    """Service for NotificationSystem mock APIs"""
+    """
+    Service for NotificationSystem mock APIs.
+    With NOTIFICATION_WRITE_MODE=behind, single sends are queued and
+    written in batches by notification_writer instead of inline.
+    """
 
     @staticmethod
-    def send_email(email: str, subject: str, body: str, db: Session) -> Dict[str, Any]:
+    async def send_email(email: str, subject: str, body: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Send an email notification (mock - just logs to database)
         
@@ -21,69 +48,172 @@ class NotificationService:
             email: Recipient email address
             subject: Email subject
             body: Email body content
-            db: Database session
+            db: Async database session
             
         Returns:
             dict: Response with status
         """
+        notification_id = str(uuid.uuid4())
+        if notification_writer.is_enabled():
+            await notification_writer.enqueue({
+                "id": notification_id,
+                "notification_type": "email",
+                "recipient": email,
+                "subject": subject,
+                "message": body
+            })
+            return _sent(notification_id)
+
         try:
-            notification_id = str(uuid.uuid4())
+            await db.execute(_INSERT_EMAIL, {
+                "id": notification_id,
+                "recipient": email,
+                "subject": subject,
+                "message": body
+            })
+            await db.commit()
             
-            query = text("""
-                INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
-                VALUES (:id, 'email', :recipient, :subject, :message, 'sent')
-            """)
+            return _sent(notification_id)
+            
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    def send_email_sync(email: str, subject: str, body: str, db: Session) -> Dict[str, Any]:
+        """
+        send_email on a sync session
+        
+        Args:
+            email: Recipient email address
+            subject: Email subject
+            body: Email body content
+            db: Database session
             
-            db.execute(query, {
+        Returns:
+            dict: Response with status
+        """
+        notification_id = str(uuid.uuid4())
+        try:
+            db.execute(_INSERT_EMAIL, {
                 "id": notification_id,
                 "recipient": email,
                 "subject": subject,
                 "message": body
             })
             db.commit()
-            
-            return {
-                "status": "sent",
-                "notification_id": notification_id
-            }
-            
+            return _sent(notification_id)
         except Exception as e:
             db.rollback()
             raise e
 
     @staticmethod
-    def send_sms(phone_number: str, message: str, db: Session) -> Dict[str, Any]:
+    async def send_sms(phone_number: str, message: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Send an SMS notification (mock - just logs to database)
         
         Args:
             phone_number: Recipient phone number
             message: SMS message content
-            db: Database session
+            db: Async database session
             
         Returns:
             dict: Response with status
         """
+        notification_id = str(uuid.uuid4())
+        if notification_writer.is_enabled():
+            await notification_writer.enqueue({
+                "id": notification_id,
+                "notification_type": "sms",
+                "recipient": phone_number,
+                "subject": None,
+                "message": message
+            })
+            return _sent(notification_id)
+
         try:
-            notification_id = str(uuid.uuid4())
+            await db.execute(_INSERT_SMS, {
+                "id": notification_id,
+                "recipient": phone_number,
+                "message": message
+            })
+            await db.commit()
             
-            query = text("""
-                INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
-                VALUES (:id, 'sms', :recipient, NULL, :message, 'sent')
-            """)
+            return _sent(notification_id)
             
-            db.execute(query, {
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    def send_sms_sync(phone_number: str, message: str, db: Session) -> Dict[str, Any]:
+        """
+        send_sms on a sync session
+        
+        Args:
+            phone_number: Recipient phone number
+            message: SMS message content
+            db: Database session
+            
+        Returns:
+            dict: Response with status
+        """
+        notification_id = str(uuid.uuid4())
+        try:
+            db.execute(_INSERT_SMS, {
                 "id": notification_id,
                 "recipient": phone_number,
                 "message": message
             })
             db.commit()
-            
+            return _sent(notification_id)
+        except Exception as e:
+            db.rollback()
+            raise e
+
+    @staticmethod
+    async def send_email_batch(emails: List[Dict[str, str]], db: AsyncSession) -> Dict[str, Any]:
+        """
+        Send many email notifications with one multi-row INSERT and one commit
+
+        Args:
+            emails: Items with email, subject and body
+            db: Async database session
+
+        Returns:
+            dict: Response with status, count and per-item results (in request order)
+        """
+        try:
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "recipient": item["email"],
+                    "subject": item["subject"],
+                    "message": item["body"],
+                    "notification_type": "email",
+                    "status": "sent"
+                }
+                for item in emails
+            ]
+
+            # Only placeholders in VALUES, so the driver folds executemany into one multi-row INSERT
+            query = text("""
+                INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
+                VALUES (:id, :notification_type, :recipient, :subject, :message, :status)
+            """)
+
+            await db.execute(query, rows)
+            await db.commit()
+
             return {
                 "status": "sent",
-                "notification_id": notification_id
+                "count": len(rows),
+                "results": [
+                    {"index": i, "status": "sent", "notification_id": row["id"]}
+                    for i, row in enumerate(rows)
+                ]
             }
-            
+
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise e
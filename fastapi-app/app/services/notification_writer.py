@@ -0,0 +1,162 @@
+"""
+Notification Write-Behind Service
+Optional batching for mock_notifications logging. With
+NOTIFICATION_WRITE_MODE=behind, send_email/send_sms put the record on a
+bounded in-memory queue and return at once; a background task inserts
+queued records in batches of up to NOTIFICATION_FLUSH_BATCH rows every
+NOTIFICATION_FLUSH_SECONDS.
+
+When the queue is full, callers wait up to NOTIFICATION_ENQUEUE_TIMEOUT
+seconds for room (backpressure) and then get NotificationQueueFull.
+Queued records are flushed on shutdown, but records still queued when a
+process is killed are lost: use sync mode where every record matters.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+from app.services.metrics import NOTIFICATION_BATCH_SECONDS, NOTIFICATION_QUEUE_DEPTH, NOTIFICATION_WRITES_TOTAL
+
+load_dotenv()
+
+NOTIFICATION_WRITE_MODE = os.getenv("NOTIFICATION_WRITE_MODE", "sync").lower()
+if NOTIFICATION_WRITE_MODE not in ("sync", "behind"):
+    raise ValueError(f"NOTIFICATION_WRITE_MODE must be 'sync' or 'behind', got '{NOTIFICATION_WRITE_MODE}'")
+
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000"))
+NOTIFICATION_FLUSH_SECONDS = float(os.getenv("NOTIFICATION_FLUSH_SECONDS", "0.2"))
+NOTIFICATION_FLUSH_BATCH = int(os.getenv("NOTIFICATION_FLUSH_BATCH", "500"))
+NOTIFICATION_ENQUEUE_TIMEOUT = float(os.getenv("NOTIFICATION_ENQUEUE_TIMEOUT", "1.0"))
+# Attempts per batch before its records are dropped (logged and counted)
+NOTIFICATION_WRITE_ATTEMPTS = int(os.getenv("NOTIFICATION_WRITE_ATTEMPTS", "3"))
+
+# Only placeholders in VALUES, so the driver folds executemany into one multi-row INSERT
+_INSERT = text("""
+    INSERT INTO mock_notifications (id, notification_type, recipient, subject, message, status)
+    VALUES (:id, :notification_type, :recipient, :subject, :message, :status)
+""")
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+_queue: Optional[asyncio.Queue] = None
+_flusher: Optional[asyncio.Task] = None
+
+
+class NotificationQueueFull(Exception):
+    """Raised when the write-behind queue stays full past NOTIFICATION_ENQUEUE_TIMEOUT."""
+
+
+def is_enabled() -> bool:
+    """True when notifications are written behind (mode is 'behind' and the flusher is running)."""
+    return _queue is not None
+
+
+async def enqueue(record: Dict[str, Any]):
+    """
+    Queue one mock_notifications row for the flusher.
+
+    Args:
+        record: Row with id, notification_type, recipient, subject, message
+                (status defaults to "sent")
+
+    Raises:
+        NotificationQueueFull: No room within NOTIFICATION_ENQUEUE_TIMEOUT
+    """
+    try:
+        await asyncio.wait_for(_queue.put(record), NOTIFICATION_ENQUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        NOTIFICATION_WRITES_TOTAL.inc(result="rejected")
+        raise NotificationQueueFull(
+            f"Notification queue is full ({NOTIFICATION_QUEUE_SIZE} records waiting); retry shortly"
+        )
+    NOTIFICATION_QUEUE_DEPTH.set(_queue.qsize())
+
+
+async def _write_batch(batch: List[Dict[str, Any]]):
+    from app.db.mysql import AsyncSessionLocal
+
+    rows = [{"status": "sent", **record} for record in batch]
+    for attempt in range(1, NOTIFICATION_WRITE_ATTEMPTS + 1):
+        start = time.time()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(_INSERT, rows)
+                await db.commit()
+        except Exception as e:
+            if attempt == NOTIFICATION_WRITE_ATTEMPTS:
+                print(f"❌ Dropping {len(batch)} notification records after {attempt} attempts: {e}")
+                NOTIFICATION_WRITES_TOTAL.inc(len(batch), result="dropped")
+                return
+            print(f"⚠️ Notification batch insert failed (attempt {attempt}), retrying: {e}")
+            await asyncio.sleep(0.5 * attempt)
+            continue
+        NOTIFICATION_BATCH_SECONDS.observe(time.time() - start)
+        NOTIFICATION_WRITES_TOTAL.inc(len(batch), result="written")
+        return
+
+
+async def _flush_loop(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        first = await queue.get()
+        if first is _STOP:
+            break
+        batch = [first]
+        deadline = loop.time() + NOTIFICATION_FLUSH_SECONDS
+        while len(batch) < NOTIFICATION_FLUSH_BATCH:
+            try:
+                record = queue.get_nowait() if queue.qsize() else await asyncio.wait_for(
+                    queue.get(), max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                break
+            if record is _STOP:
+                stopping = True
+                break
+            batch.append(record)
+        NOTIFICATION_QUEUE_DEPTH.set(queue.qsize())
+        await _write_batch(batch)
+
+
+def _drain(queue: asyncio.Queue):
+    """Drain whatever is in the queue right now without waiting."""
+    while not queue.empty():
+        yield queue.get_nowait()
+
+
+def start_notification_writer():
+    """Start the flusher on the running event loop when NOTIFICATION_WRITE_MODE=behind."""
+    global _queue, _flusher
+    if NOTIFICATION_WRITE_MODE != "behind" or _flusher is not None:
+        return
+    _queue = asyncio.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+    _flusher = asyncio.get_running_loop().create_task(_flush_loop(_queue))
+    print(f"✅ Notification write-behind enabled (batch {NOTIFICATION_FLUSH_BATCH}, every {NOTIFICATION_FLUSH_SECONDS}s)")
+
+
+async def stop_notification_writer(timeout: float = 10.0):
+    """Stop accepting records and flush everything still queued."""
+    global _queue, _flusher
+    if _flusher is None:
+        return
+    queue, flusher = _queue, _flusher
+    # New notifications go through the synchronous path from here on
+    _queue = None
+    await queue.put(_STOP)
+    try:
+        await asyncio.wait_for(flusher, timeout)
+        # Producers that were blocked on a full queue may have added records after the stop marker
+        leftovers = [record for record in _drain(queue) if record is not _STOP]
+        if leftovers:
+            await _write_batch(leftovers)
+    except asyncio.TimeoutError:
+        print(f"⚠️ Notification flush did not finish within {timeout}s; {queue.qsize()} records lost")
+    _flusher = None
+    NOTIFICATION_QUEUE_DEPTH.set(0)
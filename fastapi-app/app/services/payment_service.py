@@ -1,26 +1,67 @@
 """
 PaymentSystem Service
-Handles payment processing and refund operations
+Handles payment processing and refund operations.
+The routers use the async methods; the *_sync variants take a regular
+Session for background jobs and scripts on the sync engine.
 """
 
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.services.entity_cache import transaction_cache
+
+_INSERT_PAYMENT = text("""
+    INSERT INTO mock_transactions (id, amount, currency, status, transaction_type)
+    VALUES (:id, :amount, :currency, 'completed', 'payment')
+""")
+
+_SELECT_PAYMENT = text("""
+    SELECT id, amount, currency
+    FROM mock_transactions
+    WHERE id = :transaction_id AND transaction_type = 'payment'
+""")
+
+_INSERT_REFUND = text("""
+    INSERT INTO mock_transactions (id, amount, currency, status, transaction_type, refund_id)
+    VALUES (:id, :amount, :currency, 'completed', 'refund', :original_txn_id)
+""")
+
+_NOT_FOUND = {
+    "status": "error",
+    "message": "Transaction not found"
+}
+
+
+def _transaction_from_row(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    return {"id": row[0], "amount": row[1], "currency": row[2]}
+
+
+def _refund_params(refund_id: str, original_txn: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": refund_id,
+        "amount": original_txn["amount"],
+        "currency": original_txn["currency"],
+        "original_txn_id": original_txn["id"]
+    }
+
 
 class PaymentService:
     """Service for PaymentSystem mock APIs"""
 
     @staticmethod
-    def process_payment(amount: float, currency: str, db: Session) -> Dict[str, Any]:
+    async def process_payment(amount: float, currency: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Process a payment transaction
         
         Args:
             amount: Payment amount
             currency: Currency code (e.g., USD, EUR)
-            db: Database session
+            db: Async database session
             
         Returns:
             dict: Response with status and transaction_id
@@ -28,76 +69,163 @@ class PaymentService:
         try:
             transaction_id = str(uuid.uuid4())
             
-            query = text("""
-                INSERT INTO mock_transactions (id, amount, currency, status, transaction_type)
-                VALUES (:id, :amount, :currency, 'completed', 'payment')
-            """)
-            
-            db.execute(query, {
+            await db.execute(_INSERT_PAYMENT, {
                 "id": transaction_id,
                 "amount": amount,
                 "currency": currency
             })
-            db.commit()
+            await db.commit()
             
             return {
                 "status": "success",
                 "transaction_id": transaction_id
             }
             
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    def process_payment_sync(amount: float, currency: str, db: Session) -> Dict[str, Any]:
+        """
+        process_payment on a sync session
+        
+        Args:
+            amount: Payment amount
+            currency: Currency code (e.g., USD, EUR)
+            db: Database session
+            
+        Returns:
+            dict: Response with status and transaction_id
+        """
+        try:
+            transaction_id = str(uuid.uuid4())
+            db.execute(_INSERT_PAYMENT, {
+                "id": transaction_id,
+                "amount": amount,
+                "currency": currency
+            })
+            db.commit()
+            return {
+                "status": "success",
+                "transaction_id": transaction_id
+            }
         except Exception as e:
             db.rollback()
             raise e
 
     @staticmethod
-    def refund_payment(transaction_id: str, db: Session) -> Dict[str, Any]:
+    async def process_payment_batch(payments: List[Dict[str, Any]], db: AsyncSession) -> Dict[str, Any]:
+        """
+        Process many payments with one multi-row INSERT in a single transaction
+
+        Args:
+            payments: Items with amount and currency
+            db: Async database session
+
+        Returns:
+            dict: Response with status, count and per-item results (in request order)
+        """
+        try:
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "amount": item["amount"],
+                    "currency": item["currency"],
+                    "status": "completed",
+                    "transaction_type": "payment"
+                }
+                for item in payments
+            ]
+
+            # Only placeholders in VALUES, so the driver folds executemany into one multi-row INSERT
+            query = text("""
+                INSERT INTO mock_transactions (id, amount, currency, status, transaction_type)
+                VALUES (:id, :amount, :currency, :status, :transaction_type)
+            """)
+
+            await db.execute(query, rows)
+            await db.commit()
+
+            return {
+                "status": "success",
+                "count": len(rows),
+                "results": [
+                    {"index": i, "status": "success", "transaction_id": row["id"]}
+                    for i, row in enumerate(rows)
+                ]
+            }
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    async def refund_payment(transaction_id: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Refund a payment transaction
         
         Args:
             transaction_id: Original transaction UUID
-            db: Database session
+            db: Async database session
             
         Returns:
             dict: Response with status and refund_id
         """
         try:
             # Check if transaction exists
-            check_query = text("""
-                SELECT id, amount, currency
-                FROM mock_transactions
-                WHERE id = :transaction_id AND transaction_type = 'payment'
-            """)
-            
-            original_txn = db.execute(check_query, {"transaction_id": transaction_id}).fetchone()
+            async def load_transaction():
+                row = (await db.execute(_SELECT_PAYMENT, {"transaction_id": transaction_id})).fetchone()
+                return _transaction_from_row(row)
+
+            original_txn = await transaction_cache.get_or_load(transaction_id, load_transaction)
             
             if not original_txn:
-                return {
-                    "status": "error",
-                    "message": "Transaction not found"
-                }
+                return dict(_NOT_FOUND)
             
             refund_id = str(uuid.uuid4())
             
             # Create refund transaction
-            refund_query = text("""
-                INSERT INTO mock_transactions (id, amount, currency, status, transaction_type, refund_id)
-                VALUES (:id, :amount, :currency, 'completed', 'refund', :original_txn_id)
-            """)
-            
-            db.execute(refund_query, {
-                "id": refund_id,
-                "amount": original_txn[1],
-                "currency": original_txn[2],
-                "original_txn_id": transaction_id
-            })
-            db.commit()
+            await db.execute(_INSERT_REFUND, _refund_params(refund_id, original_txn))
+            await db.commit()
+            await transaction_cache.invalidate(transaction_id)
             
             return {
                 "status": "success",
                 "refund_id": refund_id
             }
             
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    def refund_payment_sync(transaction_id: str, db: Session) -> Dict[str, Any]:
+        """
+        refund_payment on a sync session; reads the database directly, not the entity cache
+        
+        Args:
+            transaction_id: Original transaction UUID
+            db: Database session
+            
+        Returns:
+            dict: Response with status and refund_id
+        """
+        try:
+            row = db.execute(_SELECT_PAYMENT, {"transaction_id": transaction_id}).fetchone()
+            original_txn = _transaction_from_row(row)
+            if not original_txn:
+                return dict(_NOT_FOUND)
+
+            refund_id = str(uuid.uuid4())
+            db.execute(_INSERT_REFUND, _refund_params(refund_id, original_txn))
+            db.commit()
+            # Async workers may have the transaction cached
+            transaction_cache.invalidate_sync(transaction_id)
+            return {
+                "status": "success",
+                "refund_id": refund_id
+            }
         except Exception as e:
             db.rollback()
             raise e
@@ -0,0 +1,411 @@
+"""
+Workflow Run Queue Service
+Durable queue for workflow runs with a dedicated pool of DAG worker threads.
+
+Runs are rows in a `workflow_runs` table (SQLite inside the workflows volume
+by default, MySQL via RUN_QUEUE_URL), so queued and in-flight runs survive a
+reload. Workers claim runs by priority, honour a per-workflow concurrency
+limit and hold a lease that is renewed while the run executes. If a process
+dies mid-run its lease expires and another worker picks the run up again
+(at-least-once), up to RUN_MAX_ATTEMPTS. Runs checkpoint completed tasks,
+so a reclaimed or requeued run resumes after the last task that succeeded.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, Text, and_, func, insert, or_, select, update
+from dotenv import load_dotenv
+
+from app.db.state_store import get_store_engine
+from app.services.job_service import JobService
+from app.services.workflow_index import WORKFLOWS_DIR, set_workflow_status
+from app.services.workflow_store import append_run_event, local_dag_path
+
+load_dotenv()
+
+RUN_QUEUE_URL = os.getenv("RUN_QUEUE_URL", f"sqlite:///{WORKFLOWS_DIR / '.runs.sqlite3'}")
+RUN_WORKERS = int(os.getenv("RUN_WORKERS", "2"))
+RUN_WORKFLOW_CONCURRENCY = int(os.getenv("RUN_WORKFLOW_CONCURRENCY", "1"))
+RUN_LEASE_SECONDS = float(os.getenv("RUN_LEASE_SECONDS", "120"))
+RUN_MAX_ATTEMPTS = int(os.getenv("RUN_MAX_ATTEMPTS", "3"))
+RUN_POLL_SECONDS = float(os.getenv("RUN_POLL_SECONDS", "0.5"))
+
+_EXHAUSTED_ERROR = f"Worker lease expired {RUN_MAX_ATTEMPTS} times"
+
+_metadata = MetaData()
+
+workflow_runs = Table(
+    "workflow_runs",
+    _metadata,
+    Column("id", String(36), primary_key=True),
+    Column("workflow_id", String(64), nullable=False),
+    Column("priority", Integer, nullable=False, default=0),
+    Column("status", String(16), nullable=False, default="queued"),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("lease_owner", String(128), nullable=True),
+    Column("lease_expires_at", Float, nullable=True),
+    Column("enqueued_at", Float, nullable=False),
+    Column("started_at", Float, nullable=True),
+    Column("finished_at", Float, nullable=True),
+    Column("error", Text, nullable=True),
+    Index("ix_workflow_runs_claim", "status", "priority", "enqueued_at"),
+    Index("ix_workflow_runs_workflow", "workflow_id", "status"),
+)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+# Identifies this process in lease_owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+_pool: List[threading.Thread] = []
+_pool_stop = threading.Event()
+_wake = threading.Event()
+_held_runs: Dict[str, float] = {}
+_held_lock = threading.Lock()
+
+
+def _get_engine():
+    """Helper to get the queue engine and create the table on first use"""
+    global _schema_ready
+    if RUN_QUEUE_URL.startswith("sqlite"):
+        WORKFLOWS_DIR.mkdir(parents=True, exist_ok=True)
+    engine = get_store_engine(RUN_QUEUE_URL)
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                _metadata.create_all(engine, checkfirst=True)
+                _schema_ready = True
+    return engine
+
+
+# ── Queue operations ─────────────────────────────────────────────
+
+def enqueue_run(workflow_id: str, priority: int = 0) -> str:
+    """
+    Queue a workflow run.
+
+    Args:
+        workflow_id: Workflow folder name
+        priority: Higher runs first; equal priorities run in FIFO order
+
+    Returns:
+        str: Run id (also the JobService job id used for progress polling)
+    """
+    run_id = JobService.create_job("workflow_run")
+    with _get_engine().begin() as conn:
+        conn.execute(insert(workflow_runs).values(
+            id=run_id,
+            workflow_id=workflow_id,
+            priority=priority,
+            status="queued",
+            attempts=0,
+            enqueued_at=time.time(),
+        ))
+    _wake.set()
+    return run_id
+
+
+def get_run(run_id: str) -> Optional[Dict[str, Any]]:
+    """Load one queue entry, or None if unknown."""
+    with _get_engine().connect() as conn:
+        row = conn.execute(select(workflow_runs).where(workflow_runs.c.id == run_id)).fetchone()
+    return dict(row._mapping) if row else None
+
+
+def get_queue_stats() -> Dict[str, Any]:
+    """
+    Summarise the queue for monitoring.
+
+    Returns:
+        dict: counts by status, oldest queued age and pool settings
+    """
+    now = time.time()
+    with _get_engine().connect() as conn:
+        counts = dict(conn.execute(
+            select(workflow_runs.c.status, func.count()).group_by(workflow_runs.c.status)
+        ).fetchall())
+        oldest = conn.execute(
+            select(func.min(workflow_runs.c.enqueued_at)).where(workflow_runs.c.status == "queued")
+        ).scalar()
+    return {
+        "counts": {status: counts.get(status, 0) for status in ("queued", "running", "completed", "failed")},
+        "oldest_queued_seconds": round(now - oldest, 3) if oldest else 0.0,
+        "workers": RUN_WORKERS,
+        "workers_alive": sum(1 for t in _pool if t.is_alive()),
+        "workflow_concurrency": RUN_WORKFLOW_CONCURRENCY,
+        "worker_id": WORKER_ID,
+    }
+
+
+def _claimable(now: float):
+    return or_(
+        workflow_runs.c.status == "queued",
+        and_(workflow_runs.c.status == "running", workflow_runs.c.lease_expires_at < now),
+    )
+
+
+def _fail_exhausted(conn, now: float) -> List[Dict[str, Any]]:
+    """
+    Give up on runs whose lease expired too many times.
+
+    Returns:
+        list: The runs this call failed (id, workflow_id), so the caller can
+        settle their job and run log once the transaction has committed
+    """
+    exhausted = and_(
+        workflow_runs.c.status == "running",
+        workflow_runs.c.lease_expires_at < now,
+        workflow_runs.c.attempts >= RUN_MAX_ATTEMPTS,
+    )
+    candidates = conn.execute(
+        select(workflow_runs.c.id, workflow_runs.c.workflow_id).where(exhausted)
+    ).fetchall()
+
+    failed = []
+    for row in candidates:
+        # Another worker may fail the same run concurrently; only one update wins
+        if conn.execute(
+            update(workflow_runs)
+            .where(and_(workflow_runs.c.id == row.id, exhausted))
+            .values(status="failed", finished_at=now, lease_owner=None, error=_EXHAUSTED_ERROR)
+        ).rowcount:
+            failed.append({"id": row.id, "workflow_id": row.workflow_id})
+    return failed
+
+
+def _over_workflow_limit(conn, run: Dict[str, Any], now: float) -> bool:
+    """
+    After claiming, check the per-workflow limit. Only runs claimed later
+    than the first RUN_WORKFLOW_CONCURRENCY live ones give their claim back.
+    """
+    live = conn.execute(
+        select(workflow_runs.c.id)
+        .where(and_(
+            workflow_runs.c.workflow_id == run["workflow_id"],
+            workflow_runs.c.status == "running",
+            workflow_runs.c.lease_expires_at >= now,
+        ))
+        .order_by(workflow_runs.c.started_at, workflow_runs.c.id)
+    ).scalars().all()
+    return run["id"] in live[RUN_WORKFLOW_CONCURRENCY:]
+
+
+def claim_next_run() -> Optional[Dict[str, Any]]:
+    """
+    Atomically claim the highest-priority runnable entry.
+
+    Returns:
+        dict | None: The claimed run, or None if nothing is runnable
+    """
+    engine = _get_engine()
+    now = time.time()
+
+    with engine.begin() as conn:
+        exhausted = _fail_exhausted(conn, now)
+        candidates = conn.execute(
+            select(workflow_runs)
+            .where(_claimable(now))
+            .order_by(workflow_runs.c.priority.desc(), workflow_runs.c.enqueued_at)
+            .limit(20)
+        ).fetchall()
+
+    for run in exhausted:
+        JobService.update_job(run["id"], status="failed", progress=100, error=_EXHAUSTED_ERROR)
+        _record_run_outcome(run["workflow_id"], run["id"], "failed", _EXHAUSTED_ERROR)
+
+    busy = set()
+    for row in candidates:
+        run = dict(row._mapping)
+        if run["workflow_id"] in busy:
+            continue
+
+        with engine.begin() as conn:
+            claimed = conn.execute(
+                update(workflow_runs)
+                .where(and_(workflow_runs.c.id == run["id"], _claimable(now)))
+                .values(status="running", lease_owner=WORKER_ID, lease_expires_at=now + RUN_LEASE_SECONDS,
+                        attempts=workflow_runs.c.attempts + 1, started_at=now)
+            ).rowcount
+        if not claimed:
+            continue
+
+        with engine.begin() as conn:
+            if _over_workflow_limit(conn, run, now):
+                conn.execute(
+                    update(workflow_runs)
+                    .where(and_(workflow_runs.c.id == run["id"], workflow_runs.c.lease_owner == WORKER_ID))
+                    .values(status="queued", lease_owner=None, lease_expires_at=None,
+                            attempts=workflow_runs.c.attempts - 1, started_at=None)
+                )
+                busy.add(run["workflow_id"])
+                continue
+
+        run.update(status="running", lease_owner=WORKER_ID, attempts=run["attempts"] + 1)
+        with _held_lock:
+            _held_runs[run["id"]] = now
+        return run
+
+    return None
+
+
+def _renew_leases():
+    """Extend the lease on every run this process is executing."""
+    with _held_lock:
+        run_ids = list(_held_runs)
+    if not run_ids:
+        return
+    with _get_engine().begin() as conn:
+        conn.execute(
+            update(workflow_runs)
+            .where(and_(workflow_runs.c.id.in_(run_ids), workflow_runs.c.lease_owner == WORKER_ID))
+            .values(lease_expires_at=time.time() + RUN_LEASE_SECONDS)
+        )
+
+
+def finish_run(run_id: str, status: str, error: Optional[str] = None):
+    """Mark a claimed run completed or failed and release its lease."""
+    with _held_lock:
+        _held_runs.pop(run_id, None)
+    with _get_engine().begin() as conn:
+        conn.execute(
+            update(workflow_runs)
+            .where(and_(workflow_runs.c.id == run_id, workflow_runs.c.lease_owner == WORKER_ID))
+            .values(status=status, finished_at=time.time(), lease_owner=None, lease_expires_at=None, error=error)
+        )
+
+
+def requeue_run(run_id: str) -> bool:
+    """
+    Put a failed run back on the queue so it resumes from its checkpoint.
+
+    Returns:
+        bool: True if the run was failed and is now queued again
+    """
+    with _get_engine().begin() as conn:
+        updated = conn.execute(
+            update(workflow_runs)
+            .where(and_(workflow_runs.c.id == run_id, workflow_runs.c.status == "failed"))
+            .values(status="queued", attempts=0, enqueued_at=time.time(), started_at=None,
+                    finished_at=None, error=None)
+        ).rowcount
+    if updated:
+        _wake.set()
+    return bool(updated)
+
+
+# ── Execution ────────────────────────────────────────────────────
+
+def _record_run_outcome(workflow_id: str, run_id: str, status: str, error: Optional[str] = None):
+    """Append the outcome to the workflow's run log; a completed run makes the workflow active."""
+    try:
+        append_run_event(workflow_id, run_id, status, error)
+        if status == "completed":
+            set_workflow_status(workflow_id, "active")
+    except Exception as e:
+        print(f"⚠️ Could not record outcome of run {run_id}: {e}")
+
+
+def execute_run(run: Dict[str, Any]):
+    """Run a claimed workflow and record progress and outcome."""
+    from app.services.dag_runner import run_dag
+
+    run_id, workflow_id = run["id"], run["workflow_id"]
+    if JobService.get_job(run_id) is None:
+        # Job state was in memory of a process that has since restarted
+        JobService.create_job("workflow_run", job_id=run_id)
+    JobService.update_job(run_id, status="running", progress=0)
+
+    dag_path = local_dag_path(workflow_id)
+    if dag_path is None:
+        error = f"No airflow_dag.py found for {workflow_id}"
+        JobService.update_job(run_id, status="failed", progress=100, error=error)
+        finish_run(run_id, "failed", error)
+        return
+
+    def on_update(task_id, status, idx, total):
+        progress = int(((idx + 1) / total) * 100) if status != "running" else int((idx / total) * 100)
+        JobService.update_job(run_id, progress=progress)
+
+    try:
+        result = run_dag(str(dag_path), on_update, run_id=run_id)
+    except Exception as e:
+        result = {"status": "failed", "tasks": [], "error": str(e)}
+
+    if result["status"] == "completed":
+        JobService.update_job(run_id, status="completed", progress=100, result=result)
+        _record_run_outcome(workflow_id, run_id, "completed")
+        finish_run(run_id, "completed")
+    else:
+        error = result.get("error") or "One or more tasks failed"
+        JobService.update_job(run_id, status="failed", progress=100, result=result, error=error)
+        _record_run_outcome(workflow_id, run_id, "failed", error)
+        finish_run(run_id, "failed", error)
+
+
+# ── Worker pool ──────────────────────────────────────────────────
+
+def _worker_loop():
+    while not _pool_stop.is_set():
+        # Clear before claiming: a run enqueued while we claim keeps the wake-up for the wait below
+        _wake.clear()
+        try:
+            run = claim_next_run()
+        except Exception as e:
+            print(f"⚠️ Run queue claim failed: {e}")
+            run = None
+
+        if run is None:
+            _wake.wait(RUN_POLL_SECONDS)
+            continue
+
+        print(f"▶️ Running workflow {run['workflow_id']} (run {run['id']}, attempt {run['attempts']})")
+        try:
+            execute_run(run)
+        except Exception as e:
+            print(f"❌ Workflow run {run['id']} crashed: {e}")
+            finish_run(run["id"], "failed", str(e))
+
+
+def _lease_loop():
+    while not _pool_stop.wait(RUN_LEASE_SECONDS / 3):
+        try:
+            _renew_leases()
+        except Exception as e:
+            print(f"⚠️ Run lease renewal failed: {e}")
+
+
+def start_run_workers():
+    """Start the DAG worker threads and the lease keeper (idempotent)."""
+    if _pool or RUN_WORKERS <= 0:
+        return
+    _pool_stop.clear()
+    for i in range(RUN_WORKERS):
+        thread = threading.Thread(target=_worker_loop, name=f"dag-worker-{i}", daemon=True)
+        thread.start()
+        _pool.append(thread)
+    keeper = threading.Thread(target=_lease_loop, name="dag-lease-keeper", daemon=True)
+    keeper.start()
+    _pool.append(keeper)
+    print(f"✅ Run queue started with {RUN_WORKERS} DAG workers ({WORKER_ID})")
+
+
+def stop_run_workers(timeout: float = 5.0):
+    """
+    Stop claiming new runs. Runs still executing keep their lease until it
+    expires and are then picked up again by another worker.
+
+    Args:
+        timeout: Total time to wait for the threads, shared by all of them
+    """
+    _pool_stop.set()
+    _wake.set()
+    deadline = time.monotonic() + timeout
+    for thread in _pool:
+        thread.join(timeout=max(0.0, deadline - time.monotonic()))
+    _pool.clear()
@@ -0,0 +1,241 @@
+"""
+Tracing Service
+Lightweight request-scoped spans with an OpenTelemetry-compatible data
+model. Finished spans go to an in-memory ring buffer (queryable by
+request id) and optionally to a JSON-lines file.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Number of traces (not spans) kept in memory
+TRACE_BUFFER_TRACES = int(os.getenv("TRACE_BUFFER_TRACES", "500"))
+# Spans per trace cap, protects memory on very chatty requests
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "2000"))
+# Optional JSON-lines export file
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_current_request_id: ContextVar[Optional[str]] = ContextVar("current_request_id", default=None)
+
+
+class Span:
+    """One timed operation. Field names follow the OTLP JSON span model."""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "request_id",
+                 "start_time_unix_nano", "end_time_unix_nano", "attributes", "status", "events")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str],
+                 request_id: Optional[str], attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.request_id = request_id
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = {"code": "UNSET"}
+        self.events: List[Dict[str, Any]] = []
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, error: BaseException):
+        self.status = {"code": "ERROR", "message": str(error)}
+        self.add_event("exception", {"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    def end(self):
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = time.time_ns()
+            if self.status["code"] == "UNSET":
+                self.status = {"code": "OK"}
+            _exporter.export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_unix_nano is None:
+            return None
+        return round((self.end_time_unix_nano - self.start_time_unix_nano) / 1e6, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "request_id": self.request_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": self.status,
+            "events": self.events,
+        }
+
+
+class _SpanExporter:
+    """Ring buffer of recent traces plus optional JSON-lines file output."""
+
+    def __init__(self, max_traces: int, export_file: str = ""):
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._request_to_trace: Dict[str, str] = {}
+        self._max_traces = max_traces
+        self._export_file = export_file
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = []
+                self._traces[span.trace_id] = spans
+                while len(self._traces) > self._max_traces:
+                    _, old_spans = self._traces.popitem(last=False)
+                    if old_spans and old_spans[0].request_id:
+                        self._request_to_trace.pop(old_spans[0].request_id, None)
+            if span.request_id:
+                self._request_to_trace[span.request_id] = span.trace_id
+            if len(spans) < TRACE_MAX_SPANS:
+                spans.append(span)
+
+            if self._export_file:
+                try:
+                    with open(self._export_file, "a") as f:
+                        f.write(json.dumps(span.to_dict(), default=str) + "\n")
+                except OSError as e:
+                    print(f"⚠️ Trace export failed: {e}")
+
+    def get_trace(self, request_or_trace_id: str) -> List[Span]:
+        with self._lock:
+            trace_id = self._request_to_trace.get(request_or_trace_id, request_or_trace_id)
+            return list(self._traces.get(trace_id, []))
+
+
+_exporter = _SpanExporter(TRACE_BUFFER_TRACES, TRACE_EXPORT_FILE)
+
+
+def new_request_id() -> str:
+    return secrets.token_hex(16)
+
+
+def get_request_id() -> Optional[str]:
+    return _current_request_id.get()
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def begin_span(name: str, attributes: Optional[Dict[str, Any]] = None,
+               parent: Optional[Span] = None) -> Optional[Span]:
+    """
+    Create a span without making it current. The caller must call end().
+    Useful for callback-style APIs where start and end happen in different frames.
+    """
+    if not TRACING_ENABLED:
+        return None
+    parent = parent or _current_span.get()
+    request_id = _current_request_id.get()
+    trace_id = parent.trace_id if parent else (request_id or secrets.token_hex(16))
+    return Span(name, trace_id, parent.span_id if parent else None, request_id, attributes)
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Time the with-block as a child of the current span.
+
+    Example:
+        with start_span("chroma.query", {"top_k": 5}) as span:
+            ...
+            span.set_attribute("results", 3)
+    """
+    span = begin_span(name, attributes)
+    if span is None:
+        yield _NoopSpan()
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def request_scope(request_id: str, name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Root span for one inbound request; all nested spans share its trace.
+    """
+    token = _current_request_id.set(request_id)
+    try:
+        with start_span(name, attributes) as span:
+            yield span
+    finally:
+        _current_request_id.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator that wraps a sync or async function in a span.
+    """
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def get_trace(request_id: str) -> List[Dict[str, Any]]:
+    """
+    Finished spans for a request id (or trace id), ordered by start time
+    """
+    spans = _exporter.get_trace(request_id)
+    return [s.to_dict() for s in sorted(spans, key=lambda s: s.start_time_unix_nano)]
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
@@ -1,26 +1,74 @@
 """
 UserSystem Service
-Handles user creation and retrieval operations
+Handles user creation and retrieval operations.
+The routers use the async methods; the *_sync variants take a regular
+Session for background jobs and scripts on the sync engine.
 """
 
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+
+from app.services.entity_cache import user_cache
+
+_INSERT_USER = text("""
+    INSERT INTO mock_users (id, username, email)
+    VALUES (:id, :username, :email)
+""")
+
+_SELECT_USER = text("""
+    SELECT id, username, email, created_at
+    FROM mock_users
+    WHERE id = :user_id
+""")
+
+
+def _user_from_row(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    return {
+        "id": row[0],
+        "username": row[1],
+        "email": row[2],
+        "created_at": str(row[3])
+    }
+
+
+def _duplicate_error(error: Exception) -> Optional[Dict[str, Any]]:
+    if "Duplicate entry" in str(error):
+        return {
+            "status": "error",
+            "message": "Username or email already exists"
+        }
+    return None
+
+
+def _user_response(user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not user:
+        return {
+            "status": "error",
+            "message": "User not found"
+        }
+    return {
+        "status": "success",
+        "user": user
+    }
 
 
 class UserService:
     """Service for UserSystem mock APIs"""
 
     @staticmethod
-    def create_user(username: str, email: str, db: Session) -> Dict[str, Any]:
+    async def create_user(username: str, email: str, db: AsyncSession) -> Dict[str, Any]:
         """
         Create a new user in mock_users table
         
         Args:
             username: User's username
             email: User's email address
-            db: Database session
+            db: Async database session
             
         Returns:
             dict: Response with status and user_id
@@ -28,17 +76,14 @@ class UserService:
         try:
             user_id = str(uuid.uuid4())
             
-            query = text("""
-                INSERT INTO mock_users (id, username, email)
-                VALUES (:id, :username, :email)
-            """)
-            
-            db.execute(query, {
+            await db.execute(_INSERT_USER, {
                 "id": user_id,
                 "username": username,
                 "email": email
             })
-            db.commit()
+            await db.commit()
+            # Misses aren't cached, so no other worker can hold this id: drop locally only
+            await user_cache.invalidate(user_id, broadcast=False)
             
             return {
                 "status": "success",
@@ -46,47 +91,150 @@ class UserService:
             }
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             # Handle duplicate username/email
-            if "Duplicate entry" in str(e):
-                return {
-                    "status": "error",
-                    "message": "Username or email already exists"
-                }
+            duplicate = _duplicate_error(e)
+            if duplicate:
+                return duplicate
             raise e
 
     @staticmethod
-    def get_user(user_id: str, db: Session) -> Dict[str, Any]:
+    def create_user_sync(username: str, email: str, db: Session) -> Dict[str, Any]:
         """
-        Get user details by ID
+        create_user on a sync session
         
         Args:
-            user_id: User's UUID
+            username: User's username
+            email: User's email address
             db: Database session
             
         Returns:
-            dict: Response with status and user data
+            dict: Response with status and user_id
         """
-        query = text("""
-            SELECT id, username, email, created_at
-            FROM mock_users
-            WHERE id = :user_id
-        """)
-        
-        result = db.execute(query, {"user_id": user_id}).fetchone()
-        
-        if not result:
+        try:
+            user_id = str(uuid.uuid4())
+            db.execute(_INSERT_USER, {
+                "id": user_id,
+                "username": username,
+                "email": email
+            })
+            db.commit()
+            user_cache.invalidate_sync(user_id, broadcast=False)
             return {
-                "status": "error",
-                "message": "User not found"
+                "status": "success",
+                "user_id": user_id
             }
-        
-        return {
-            "status": "success",
-            "user": {
-                "id": result[0],
-                "username": result[1],
-                "email": result[2],
-                "created_at": str(result[3])
+        except Exception as e:
+            db.rollback()
+            duplicate = _duplicate_error(e)
+            if duplicate:
+                return duplicate
+            raise e
+
+    @staticmethod
+    async def create_user_batch(users: List[Dict[str, str]], db: AsyncSession) -> Dict[str, Any]:
+        """
+        Create many users in one transaction. Items whose username or email
+        already exists (in the table or earlier in the batch) are reported
+        as errors; the rest are inserted with one multi-row INSERT.
+
+        Args:
+            users: Items with username and email
+            db: Async database session
+
+        Returns:
+            dict: Response with status, created/failed counts and per-item results (in request order)
+        """
+        results: List[Dict[str, Any]] = [None] * len(users)
+        try:
+            existing_query = text("""
+                SELECT username, email
+                FROM mock_users
+                WHERE username IN :usernames OR email IN :emails
+            """).bindparams(bindparam("usernames", expanding=True), bindparam("emails", expanding=True))
+
+            existing = (await db.execute(existing_query, {
+                "usernames": [u["username"] for u in users],
+                "emails": [u["email"] for u in users]
+            })).fetchall()
+
+            # MySQL's default collation compares case-insensitively
+            taken = {value.lower() for row in existing for value in row}
+            rows = []
+            for i, item in enumerate(users):
+                keys = {item["username"].lower(), item["email"].lower()}
+                if keys & taken:
+                    results[i] = {"index": i, "status": "error", "message": "Username or email already exists"}
+                    continue
+                taken |= keys
+                rows.append((i, {"id": str(uuid.uuid4()), "username": item["username"], "email": item["email"]}))
+
+            query = _INSERT_USER
+
+            if rows:
+                try:
+                    await db.execute(query, [row for _, row in rows])
+                except Exception as e:
+                    if "Duplicate entry" not in str(e):
+                        raise
+                    # A concurrent request took some of the names: insert one by one
+                    await db.rollback()
+                    for i, row in list(rows):
+                        try:
+                            async with db.begin_nested():
+                                await db.execute(query, row)
+                        except Exception as row_error:
+                            if "Duplicate entry" not in str(row_error):
+                                raise
+                            results[i] = {"index": i, "status": "error", "message": "Username or email already exists"}
+                            rows.remove((i, row))
+            await db.commit()
+
+            for i, row in rows:
+                results[i] = {"index": i, "status": "success", "user_id": row["id"]}
+
+            created = len(rows)
+            return {
+                "status": "success" if created == len(users) else ("partial" if created else "error"),
+                "created": created,
+                "failed": len(users) - created,
+                "results": results
             }
-        }
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+    @staticmethod
+    async def get_user(user_id: str, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Get user details by ID
+        
+        Args:
+            user_id: User's UUID
+            db: Async database session
+            
+        Returns:
+            dict: Response with status and user data
+        """
+        async def load_user():
+            row = (await db.execute(_SELECT_USER, {"user_id": user_id})).fetchone()
+            return _user_from_row(row)
+
+        user = await user_cache.get_or_load(user_id, load_user)
+        return _user_response(user)
+
+    @staticmethod
+    def get_user_sync(user_id: str, db: Session) -> Dict[str, Any]:
+        """
+        get_user on a sync session; reads the database directly, not the entity cache
+        
+        Args:
+            user_id: User's UUID
+            db: Database session
+            
+        Returns:
+            dict: Response with status and user data
+        """
+        row = db.execute(_SELECT_USER, {"user_id": user_id}).fetchone()
+        return _user_response(_user_from_row(row))
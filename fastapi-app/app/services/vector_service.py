@@ -1,36 +1,96 @@
-from sentence_transformers import SentenceTransformer
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, TYPE_CHECKING
 import os
+import threading
+import time
 
-# Global storage for vectors and texts
+from app.services.metrics import (
+    CHROMA_OPERATION_SECONDS,
+    EMBEDDING_BATCH_SECONDS,
+    EMBEDDING_TEXTS_TOTAL,
+)
+from app.services.tracing import start_span, traced
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Global storage for the embedding model
 _model = None
-_chroma_client = None
-_collection = None
+_model_lock = threading.Lock()
+_model_state: Dict[str, Any] = {"status": "not_loaded", "error": None, "load_seconds": None, "source": None}
+
+API_COLLECTION = "api_vectors"
 
-def _get_model(model_name: str = "all-MiniLM-L6-v2") -> SentenceTransformer:
-    """Helper function to load model once"""
+def _get_model(model_name: str = None) -> "SentenceTransformer":
+    """Helper function to load model once (baked cache first, see model_cache)"""
     global _model
     if _model is None:
-        _model = SentenceTransformer(model_name)
+        with _model_lock:
+            if _model is None:
+                from app.services.model_cache import EMBEDDING_MODEL, load_model
+                _model_state.update(status="loading", error=None)
+                start = time.perf_counter()
+                try:
+                    model, source = load_model(model_name or EMBEDDING_MODEL)
+                except Exception as e:
+                    _model_state.update(status="failed", error=str(e))
+                    raise
+                _model = model
+                _model_state.update(status="ready", source=source,
+                                    load_seconds=round(time.perf_counter() - start, 3))
     return _model
 
 
-def _get_chroma_collection():
-    """Helper to get or create ChromaDB collection"""
-    global _chroma_client, _collection
-    if _collection is None:
-        from app.db.chroma import get_chroma_client
-        _chroma_client = get_chroma_client()
-        _collection = _chroma_client.get_or_create_collection(name="api_vectors")
-    return _collection
+def warm_up_model_in_background() -> threading.Thread:
+    """
+    Load the embedding model on a daemon thread so the server can accept
+    traffic (liveness) while the encoder is still loading (readiness).
+    """
+    def _load():
+        try:
+            _get_model()
+            print(f"✅ Vector Model Loaded and Ready! ({_model_state['load_seconds']}s)")
+        except Exception as e:
+            print(f"❌ Vector Model failed to load: {e}")
+
+    thread = threading.Thread(target=_load, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_model_status() -> Dict[str, Any]:
+    """
+    Report embedding model state for the readiness probe.
+
+    Returns:
+        dict: status (not_loaded|loading|ready|failed), error, load_seconds, source
+    """
+    return dict(_model_state)
+
 
+def _with_collection(operation_name: str, operation):
+    """Helper to run an operation on the API collection with retries"""
+    from app.db.chroma import with_collection
+    with start_span(f"chroma.{operation_name}", {"collection": API_COLLECTION}), \
+            CHROMA_OPERATION_SECONDS.time(operation=operation_name):
+        return with_collection(API_COLLECTION, operation)
 
+
+def _encode(texts: List[str]):
+    """Helper to encode a batch of texts and record embedding metrics"""
+    model = _get_model()
+    start = time.perf_counter()
+    with start_span("embedding.encode", {"batch_size": len(texts)}):
+        embeddings = model.encode(texts)
+    EMBEDDING_BATCH_SECONDS.observe(time.perf_counter() - start)
+    EMBEDDING_TEXTS_TOTAL.inc(len(texts))
+    return embeddings
+
+
+@traced("vector.store_in_chroma")
 def store_in_chroma(records: List[Dict[str, Any]], embeddings: List[List[float]]):
     """
     Store records and their embeddings in ChromaDB
     """
-    collection = _get_chroma_collection()
-    
     ids = [r["id"] for r in records]
     metadatas = [
         {
@@ -45,12 +105,12 @@ def store_in_chroma(records: List[Dict[str, Any]], embeddings: List[List[float]]
         for r in records
     ]
     
-    collection.add(
+    _with_collection("add", lambda collection: collection.add(
         ids=ids,
         embeddings=embeddings,
         metadatas=metadatas,
         documents=documents
-    )
+    ))
     print(f"✅ Stored {len(ids)} vectors in ChromaDB")
 
 
@@ -70,36 +130,21 @@ def encode_text(texts: List[str]) -> List[List[float]]:
     """
     Turn text into vectors (embeddings)
     """
-    model = _get_model()
-    embeddings = model.encode(texts)
+    embeddings = _encode(texts)
     return embeddings.tolist()
 
 
-def search_similar(query: str, top_k: int = 10) -> List[Dict[str, Any]]:
-    """
-    Search for similar APIs in ChromaDB with Hybrid Re-ranking.
-    Combines vector similarity with keyword matches in metadata.
-    """
-    collection = _get_chroma_collection()
-    model = _get_model()
-    
-    query_vector = model.encode([query]).tolist()
-    
-    # Get results from vector search
-    results = collection.query(
-        query_embeddings=query_vector,
-        n_results=top_k
-    )
-    
+def _rerank(query: str, results: Dict[str, Any], index: int) -> List[Dict[str, Any]]:
+    """Hybrid re-ranking of one query's vector hits (see search_similar)."""
     formatted_results = []
-    if not results or not results['ids'] or not results['ids'][0]:
+    if not results or not results['ids'] or not results['ids'][index]:
         return []
 
     query_lower = query.lower()
 
-    for i in range(len(results['ids'][0])):
-        dist = float(results['distances'][0][i])
-        metadata = results['metadatas'][0][i]
+    for i in range(len(results['ids'][index])):
+        dist = float(results['distances'][index][i])
+        metadata = results['metadatas'][index][i]
         
         # Hybrid Scoring: Boost if query matches system_name or api_name
         # Distance is lower for better match (0.0 is perfect).
@@ -115,11 +160,11 @@ def search_similar(query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         hybrid_distance = max(0, dist - boost)
 
         formatted_results.append({
-            "id": results['ids'][0][i],
+            "id": results['ids'][index][i],
             "distance": dist,
             "hybrid_distance": hybrid_distance,
             "metadata": metadata,
-            "document": results['documents'][0][i]
+            "document": results['documents'][index][i]
         })
     
     # Re-rank based on hybrid distance
@@ -127,6 +172,33 @@ def search_similar(query: str, top_k: int = 10) -> List[Dict[str, Any]]:
     
     return formatted_results
 
+def search_similar(query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search for similar APIs in ChromaDB with Hybrid Re-ranking.
+    Combines vector similarity with keyword matches in metadata.
+    """
+    return search_similar_batch([query], top_k=top_k)[0]
+
+@traced("vector.search_similar")
+def search_similar_batch(queries: List[str], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+    """
+    search_similar for several queries with one encode call and one Chroma query.
+
+    Returns:
+        list: Re-ranked results per query, in input order
+    """
+    if not queries:
+        return []
+    query_vectors = _encode(queries).tolist()
+
+    # Get results from vector search
+    results = _with_collection("query", lambda collection: collection.query(
+        query_embeddings=query_vectors,
+        n_results=top_k
+    ))
+
+    return [_rerank(query, results, i) for i, query in enumerate(queries)]
+
 def reindex_all_apis():
     """
     Sync all APIs from MySQL to ChromaDB.
@@ -139,26 +211,21 @@ def reindex_all_apis():
     if not records:
         return {"success": True, "count": 0, "message": "No APIs found in MySQL to index."}
     
-    # 2. Get Chroma collection
-    collection = _get_chroma_collection()
-    
-    # 3. Wipe current collection (Optional: or just upsert)
-    # For re-index, wiping is safer if we want perfect sync
+    # 2. Wipe current collection (Optional: or just upsert)
+    # For re-index, wiping is safer if we want perfect sync.
+    # delete_collection also drops the cached handle so it gets re-created.
+    from app.db.chroma import delete_collection
     try:
-        global _chroma_client
-        _chroma_client.delete_collection(name="api_vectors")
-        global _collection
-        _collection = None # Reset so it gets re-created
-        collection = _get_chroma_collection()
+        delete_collection(API_COLLECTION)
     except Exception as e:
         print(f"Warning during re-index cleanup: {e}")
 
-    # 4. Prepare data for Chroma
+    # 3. Prepare data for Chroma
     from app.services.csv_service import CSVService
     texts = CSVService.prepare_api_texts(records)
     embeddings = encode_text(texts)
     
-    # 5. Store in Chroma
+    # 4. Store in Chroma
     store_in_chroma(records, embeddings)
     
     return {"success": True, "count": len(records)}
@@ -168,5 +235,4 @@ def get_all_vectors(limit: int = 100):
     """
     Get all vectors and metadata from ChromaDB
     """
-    collection = _get_chroma_collection()
-    return collection.get(limit=limit)
+    return _with_collection("get", lambda collection: collection.get(limit=limit))
@@ -0,0 +1,297 @@
+"""
+Workflow Index Service
+Keeps a metadata catalog of saved workflows so listing does not have to
+scan and parse every workflow.json on each request.
+"""
+
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, delete, func, select, update
+from dotenv import load_dotenv
+
+from app.db.state_store import get_store_engine, upsert
+
+load_dotenv()
+
+WORKFLOWS_DIR = Path(os.getenv(
+    "WORKFLOWS_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "workflows"),
+))
+
+# SQLite file inside the workflows volume by default; point at MySQL to share it
+WORKFLOW_INDEX_URL = os.getenv("WORKFLOW_INDEX_URL", f"sqlite:///{WORKFLOWS_DIR / '.index.sqlite3'}")
+
+# How often the fallback watcher reconciles the index with manual edits on disk
+WORKFLOW_INDEX_POLL_SECONDS = float(os.getenv("WORKFLOW_INDEX_POLL_SECONDS", "10"))
+
+SORTABLE_COLUMNS = {"id", "created_at", "name", "status", "step_count", "updated_at"}
+
+_metadata = MetaData()
+
+workflow_index = Table(
+    "workflow_index",
+    _metadata,
+    Column("id", String(64), primary_key=True),
+    Column("name", String(255), nullable=False, default="Untitled"),
+    Column("status", String(32), nullable=False, default="draft"),
+    Column("created_at", String(64), nullable=False, default=""),
+    Column("step_count", Integer, nullable=False, default=0),
+    Column("file_mtime", Float, nullable=False, default=0.0),
+    Column("updated_at", Float, nullable=False, default=0.0),
+    Index("ix_workflow_index_status_created", "status", "created_at"),
+    Index("ix_workflow_index_created", "created_at"),
+)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+_watcher_thread: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def _get_engine():
+    """Helper to get the index engine and create the table on first use"""
+    global _schema_ready
+    if WORKFLOW_INDEX_URL.startswith("sqlite"):
+        WORKFLOWS_DIR.mkdir(parents=True, exist_ok=True)
+    engine = get_store_engine(WORKFLOW_INDEX_URL)
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                _metadata.create_all(engine, checkfirst=True)
+                _schema_ready = True
+    return engine
+
+
+def _count_steps(steps: Any) -> int:
+    if isinstance(steps, dict):
+        steps = steps.get("raw_info", [])
+    return len(steps) if isinstance(steps, list) else 0
+
+
+def summarize_workflow(data: Dict[str, Any], fallback_id: str = "") -> Dict[str, Any]:
+    """
+    Build the listing summary for a workflow.json payload
+
+    Args:
+        data: Parsed workflow.json content
+        fallback_id: Folder name used when the payload has no id
+
+    Returns:
+        dict: id, name, status, created_at, step_count
+    """
+    return {
+        "id": data.get("id", fallback_id),
+        "name": data.get("name", "Untitled"),
+        "status": data.get("status", "draft"),
+        "created_at": data.get("created_at", ""),
+        "step_count": _count_steps(data.get("steps", [])),
+    }
+
+
+def _workflow_file(workflow_id: str) -> Path:
+    return WORKFLOWS_DIR / workflow_id / "workflow.json"
+
+
+def _file_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def index_workflow(data: Dict[str, Any], file_mtime: Optional[float] = None):
+    """
+    Insert or refresh a workflow in the index.
+    Call this after every write to a workflow.json.
+
+    Args:
+        data: Workflow payload as written to disk
+        file_mtime: mtime of the written file (looked up when omitted)
+    """
+    summary = summarize_workflow(data)
+    if not summary["id"]:
+        return
+    if file_mtime is None:
+        file_mtime = _file_mtime(_workflow_file(summary["id"]))
+
+    engine = _get_engine()
+    with engine.begin() as conn:
+        upsert(conn, workflow_index, {
+            **summary,
+            "file_mtime": file_mtime,
+            "updated_at": datetime.now().timestamp(),
+        }, key_columns=["id"])
+
+
+def set_workflow_status(workflow_id: str, status: str, file_mtime: Optional[float] = None):
+    """
+    Update only the status column of an indexed workflow
+    """
+    values = {"status": status, "updated_at": datetime.now().timestamp()}
+    if file_mtime is not None:
+        values["file_mtime"] = file_mtime
+
+    engine = _get_engine()
+    with engine.begin() as conn:
+        conn.execute(update(workflow_index).where(workflow_index.c.id == workflow_id).values(**values))
+
+
+def remove_workflow(workflow_id: str):
+    """
+    Drop a workflow from the index
+    """
+    engine = _get_engine()
+    with engine.begin() as conn:
+        conn.execute(delete(workflow_index).where(workflow_index.c.id == workflow_id))
+
+
+def list_indexed_workflows(
+    status: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Page through indexed workflows
+
+    Args:
+        status: Only return workflows with this status
+        sort: Column to sort on (see SORTABLE_COLUMNS); id, the folder
+              name, matches the order of the old directory listing
+        order: "asc" or "desc"
+        limit: Page size (None returns everything)
+        offset: Number of rows to skip
+
+    Returns:
+        tuple: (list of workflow summaries, total rows matching the filter)
+    """
+    if sort not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort}'. Allowed: {', '.join(sorted(SORTABLE_COLUMNS))}")
+
+    sort_column = workflow_index.c[sort]
+    sort_expr = sort_column.asc() if order == "asc" else sort_column.desc()
+
+    query = select(
+        workflow_index.c.id,
+        workflow_index.c.name,
+        workflow_index.c.status,
+        workflow_index.c.created_at,
+        workflow_index.c.step_count,
+    )
+    count_query = select(func.count()).select_from(workflow_index)
+    if status:
+        query = query.where(workflow_index.c.status == status)
+        count_query = count_query.where(workflow_index.c.status == status)
+
+    # Tie-break on id so pages are stable
+    query = query.order_by(sort_expr, workflow_index.c.id.asc())
+    if limit is not None:
+        query = query.limit(limit).offset(offset)
+    elif offset:
+        query = query.offset(offset)
+
+    engine = _get_engine()
+    with engine.connect() as conn:
+        total = conn.execute(count_query).scalar_one()
+        rows = [dict(row._mapping) for row in conn.execute(query)]
+
+    return rows, total
+
+
+def indexed_mtimes() -> Dict[str, float]:
+    """
+    File mtime of every indexed workflow, as recorded when it was indexed
+
+    Returns:
+        dict: workflow id -> workflow.json mtime
+    """
+    engine = _get_engine()
+    with engine.connect() as conn:
+        return {
+            row.id: row.file_mtime
+            for row in conn.execute(select(workflow_index.c.id, workflow_index.c.file_mtime))
+        }
+
+
+def reconcile_index() -> Dict[str, int]:
+    """
+    Sync the index with the workflow storage.
+    Only workflows whose version (workflow.json mtime on the filesystem
+    backend) changed since they were indexed are parsed, so this stays
+    cheap even with many workflows.
+
+    Returns:
+        dict: Counts of added/updated and removed entries
+    """
+    from app.services.workflow_store import read_workflow, workflow_versions
+
+    known = indexed_mtimes()
+    versions = workflow_versions()
+
+    refreshed = 0
+    for workflow_id, version in versions.items():
+        if known.get(workflow_id) == version:
+            continue
+        # Through the store so statuses from the run log are kept; bypass
+        # its cache, which may still hold the copy from before the change
+        try:
+            data = read_workflow(workflow_id, use_cache=False)
+        except Exception as e:
+            # One broken workflow must not stop the others from being indexed
+            print(f"⚠️ Skipping workflow {workflow_id} in index reconcile: {e}")
+            continue
+        if data is None:
+            continue
+        index_workflow(data, file_mtime=version)
+        refreshed += 1
+
+    removed = 0
+    for workflow_id in set(known) - set(versions):
+        remove_workflow(workflow_id)
+        removed += 1
+
+    return {"refreshed": refreshed, "removed": removed}
+
+
+def _watch_loop():
+    while not _watcher_stop.wait(WORKFLOW_INDEX_POLL_SECONDS):
+        try:
+            reconcile_index()
+        except Exception as e:
+            print(f"⚠️ Workflow index reconcile failed: {e}")
+
+
+def start_index_watcher():
+    """
+    Reconcile once, then keep polling the workflow storage in a
+    background thread so manual edits reach the index.
+    """
+    global _watcher_thread
+    try:
+        result = reconcile_index()
+        print(f"✅ Workflow index ready ({result['refreshed']} refreshed, {result['removed']} removed)")
+    except Exception as e:
+        print(f"⚠️ Workflow index bootstrap failed: {e}")
+
+    if _watcher_thread is not None or WORKFLOW_INDEX_POLL_SECONDS <= 0:
+        return
+    _watcher_stop.clear()
+    _watcher_thread = threading.Thread(target=_watch_loop, name="workflow-index-watcher", daemon=True)
+    _watcher_thread.start()
+
+
+def stop_index_watcher():
+    """
+    Stop the background reconcile thread
+    """
+    global _watcher_thread
+    _watcher_stop.set()
+    if _watcher_thread is not None:
+        _watcher_thread.join(timeout=2)
+        _watcher_thread = None
@@ -0,0 +1,598 @@
+"""
+Workflow Repository
+Storage backends for the files of a saved workflow (workflow.json,
+airflow_dag.py, ...) and its run log, selected by WORKFLOW_STORAGE:
+
+- filesystem (default): <WORKFLOWS_DIR>/<id>/ folders on a volume. Files
+  are written to a temp file and renamed into place under a per-workflow
+  lock (thread lock + flock on <id>/.lock), run outcomes are appended to
+  <id>/runs.log.
+- sql: rows in the workflow_files and workflow_run_events tables of
+  WORKFLOW_STORAGE_URL (SQLite by default, MySQL to share across
+  containers).
+- s3: objects <prefix><id>/<file> in an S3-compatible bucket (AWS, MinIO).
+  Each run outcome is its own object under <id>/runs/, since objects can't
+  be appended to. Needs boto3, except with a file:// endpoint, which uses
+  LocalObjectStore, a directory-backed stand-in for local runs.
+
+Every backend reports a version per workflow (mtime or write time of
+workflow.json) that the workflow index uses to find changed workflows.
+DAGs of the sql and s3 backends are copied to WORKFLOW_LOCAL_DIR before
+they run, so run checkpoints stay local to the replica that ran them.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, Float, Index, Integer, MetaData, PrimaryKeyConstraint, String, Table, Text, insert, select
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+from app.db.state_store import get_store_engine, upsert
+from app.services.workflow_index import WORKFLOWS_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: in-process locking only
+    fcntl = None
+
+load_dotenv()
+
+WORKFLOW_STORAGE = os.getenv("WORKFLOW_STORAGE", "filesystem").lower()
+if WORKFLOW_STORAGE not in ("filesystem", "sql", "s3"):
+    raise ValueError(f"WORKFLOW_STORAGE must be 'filesystem', 'sql' or 's3', got '{WORKFLOW_STORAGE}'")
+
+WORKFLOW_STORAGE_URL = os.getenv("WORKFLOW_STORAGE_URL", f"sqlite:///{WORKFLOWS_DIR / '.workflows.sqlite3'}")
+WORKFLOW_S3_BUCKET = os.getenv("WORKFLOW_S3_BUCKET", "workflows")
+WORKFLOW_S3_PREFIX = os.getenv("WORKFLOW_S3_PREFIX", "")
+# Empty for AWS, e.g. http://minio:9000 for MinIO, file:///path for the local stand-in
+WORKFLOW_S3_ENDPOINT_URL = os.getenv("WORKFLOW_S3_ENDPOINT_URL", "")
+WORKFLOW_S3_REGION = os.getenv("WORKFLOW_S3_REGION", "us-east-1")
+# Where DAGs of the sql/s3 backends are materialized to run (and checkpoint)
+WORKFLOW_LOCAL_DIR = Path(os.getenv("WORKFLOW_LOCAL_DIR", str(WORKFLOWS_DIR)))
+
+WORKFLOW_FILE = "workflow.json"
+DAG_FILE = "airflow_dag.py"
+GRAPH_FILE = "graph.json"
+RUN_LOG_FILE = "runs.log"
+LOCK_FILE = ".lock"
+
+
+def atomic_write(path: Path, content: str, mode: int = 0o666):
+    """
+    Write a file through a temp file and rename, so it is never seen half-written.
+
+    Args:
+        path: Destination file
+        content: Text to write
+        mode: Permissions of the final file
+    """
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class WorkflowRepository(ABC):
+    """Where workflow files and run logs are stored. Subclasses implement one backend."""
+
+    name = "base"
+
+    @abstractmethod
+    def write_files(self, workflow_id: str, files: Dict[str, str]) -> float:
+        """
+        Write files of a workflow, in the given order.
+
+        Args:
+            workflow_id: Workflow ID
+            files: File name -> content; put workflow.json last so a visible
+                   workflow always has its other files
+
+        Returns:
+            float: Version of the workflow after the write
+        """
+
+    @abstractmethod
+    def read_file(self, workflow_id: str, name: str) -> Optional[str]:
+        """Content of one file of a workflow, or None if it doesn't exist."""
+
+    def exists(self, workflow_id: str) -> bool:
+        return self.read_file(workflow_id, WORKFLOW_FILE) is not None
+
+    @abstractmethod
+    def append_run_event(self, workflow_id: str, event: Dict[str, Any]):
+        """Record one run outcome (run_id, status, at, error)."""
+
+    @abstractmethod
+    def read_run_log(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """Run outcomes of a workflow, oldest first."""
+
+    @abstractmethod
+    def versions(self) -> Dict[str, float]:
+        """
+        Version of every stored workflow.
+
+        Returns:
+            dict: workflow id -> version (changes whenever workflow.json is rewritten)
+        """
+
+    def local_path(self, workflow_id: str, name: str) -> Optional[Path]:
+        """
+        Local file with the content of a workflow file, for code that needs a
+        path (the DAG runner). The copy is only rewritten when the content
+        changed, so checkpoints keyed on the DAG's hash stay valid.
+
+        Returns:
+            Path: Local file, or None if the workflow file doesn't exist
+        """
+        content = self.read_file(workflow_id, name)
+        if content is None:
+            return None
+        path = WORKFLOW_LOCAL_DIR / workflow_id / name
+        try:
+            if path.read_text() == content:
+                return path
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, content)
+        return path
+
+
+# ── Filesystem ─────────────────────────────────────────────────────────
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+class FilesystemWorkflowRepository(WorkflowRepository):
+    """Workflow folders under a directory, usually a volume shared by the workers."""
+
+    name = "filesystem"
+
+    def __init__(self, root: Path = WORKFLOWS_DIR):
+        self.root = root
+
+    def workflow_dir(self, workflow_id: str) -> Path:
+        return self.root / workflow_id
+
+    @contextmanager
+    def lock(self, workflow_id: str) -> Iterator[None]:
+        """Hold the write lock of one workflow (threads and worker processes)."""
+        with _locks_guard:
+            lock = _locks.setdefault(str(self.workflow_dir(workflow_id)), threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            directory = self.workflow_dir(workflow_id)
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(directory / LOCK_FILE, "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def write_files(self, workflow_id: str, files: Dict[str, str]) -> float:
+        directory = self.workflow_dir(workflow_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        os.chmod(directory, 0o777)
+        with self.lock(workflow_id):
+            for name, content in files.items():
+                atomic_write(directory / name, content)
+            return self._mtime(workflow_id)
+
+    def read_file(self, workflow_id: str, name: str) -> Optional[str]:
+        try:
+            return (self.workflow_dir(workflow_id) / name).read_text()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️ Unreadable {name} in workflow {workflow_id}: {e}")
+            return None
+
+    def exists(self, workflow_id: str) -> bool:
+        return (self.workflow_dir(workflow_id) / WORKFLOW_FILE).is_file()
+
+    def append_run_event(self, workflow_id: str, event: Dict[str, Any]):
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self.lock(workflow_id):
+            with open(self.workflow_dir(workflow_id) / RUN_LOG_FILE, "a") as f:
+                f.write(line)
+
+    def read_run_log(self, workflow_id: str) -> List[Dict[str, Any]]:
+        try:
+            lines = (self.workflow_dir(workflow_id) / RUN_LOG_FILE).read_text().splitlines()
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️ Unreadable run log of workflow {workflow_id}: {e}")
+            return []
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn last line from a crashed writer
+                continue
+        return events
+
+    def _mtime(self, workflow_id: str) -> float:
+        try:
+            return (self.workflow_dir(workflow_id) / WORKFLOW_FILE).stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def versions(self) -> Dict[str, float]:
+        versions = {}
+        if not self.root.exists():
+            return versions
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    mtime = self._mtime(entry.name)
+                    if mtime:
+                        versions[entry.name] = mtime
+        return versions
+
+    def local_path(self, workflow_id: str, name: str) -> Optional[Path]:
+        path = self.workflow_dir(workflow_id) / name
+        return path if path.is_file() else None
+
+
+# ── SQL ────────────────────────────────────────────────────────────────
+
+_metadata = MetaData()
+
+workflow_files = Table(
+    "workflow_files",
+    _metadata,
+    Column("workflow_id", String(64), nullable=False),
+    Column("name", String(64), nullable=False),
+    # MySQL's TEXT stops at 64 KB, generated DAGs can be longer
+    Column("content", Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False),
+    Column("updated_at", Float, nullable=False),
+    PrimaryKeyConstraint("workflow_id", "name"),
+)
+
+workflow_run_events = Table(
+    "workflow_run_events",
+    _metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("workflow_id", String(64), nullable=False),
+    Column("run_id", String(36), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("at", Float, nullable=False),
+    Column("error", Text, nullable=True),
+    Index("ix_workflow_run_events_workflow", "workflow_id", "id"),
+)
+
+
+class SQLWorkflowRepository(WorkflowRepository):
+    """Workflow files and run outcomes as rows of a SQLAlchemy database."""
+
+    name = "sql"
+
+    def __init__(self, url: str = WORKFLOW_STORAGE_URL):
+        self.url = url
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _get_engine(self):
+        """Helper to get the storage engine and create the tables on first use"""
+        if self.url.startswith("sqlite"):
+            WORKFLOWS_DIR.mkdir(parents=True, exist_ok=True)
+        engine = get_store_engine(self.url)
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    _metadata.create_all(engine, checkfirst=True)
+                    self._schema_ready = True
+        return engine
+
+    def write_files(self, workflow_id: str, files: Dict[str, str]) -> float:
+        now = time.time()
+        # One transaction: other replicas see all files or none
+        with self._get_engine().begin() as conn:
+            for name, content in files.items():
+                upsert(conn, workflow_files, {
+                    "workflow_id": workflow_id,
+                    "name": name,
+                    "content": content,
+                    "updated_at": now,
+                }, key_columns=["workflow_id", "name"])
+        return now
+
+    def read_file(self, workflow_id: str, name: str) -> Optional[str]:
+        with self._get_engine().connect() as conn:
+            return conn.execute(
+                select(workflow_files.c.content)
+                .where(workflow_files.c.workflow_id == workflow_id, workflow_files.c.name == name)
+            ).scalar()
+
+    def exists(self, workflow_id: str) -> bool:
+        with self._get_engine().connect() as conn:
+            return conn.execute(
+                select(workflow_files.c.workflow_id)
+                .where(workflow_files.c.workflow_id == workflow_id, workflow_files.c.name == WORKFLOW_FILE)
+            ).first() is not None
+
+    def append_run_event(self, workflow_id: str, event: Dict[str, Any]):
+        with self._get_engine().begin() as conn:
+            conn.execute(insert(workflow_run_events).values(
+                workflow_id=workflow_id,
+                run_id=event["run_id"],
+                status=event["status"],
+                at=event["at"],
+                error=event.get("error"),
+            ))
+
+    def read_run_log(self, workflow_id: str) -> List[Dict[str, Any]]:
+        query = (
+            select(workflow_run_events.c.run_id, workflow_run_events.c.status,
+                   workflow_run_events.c.at, workflow_run_events.c.error)
+            .where(workflow_run_events.c.workflow_id == workflow_id)
+            .order_by(workflow_run_events.c.id.asc())
+        )
+        with self._get_engine().connect() as conn:
+            rows = conn.execute(query).fetchall()
+        events = []
+        for row in rows:
+            event = {"run_id": row.run_id, "status": row.status, "at": row.at}
+            if row.error:
+                event["error"] = row.error
+            events.append(event)
+        return events
+
+    def versions(self) -> Dict[str, float]:
+        with self._get_engine().connect() as conn:
+            return {
+                row.workflow_id: row.updated_at
+                for row in conn.execute(
+                    select(workflow_files.c.workflow_id, workflow_files.c.updated_at)
+                    .where(workflow_files.c.name == WORKFLOW_FILE)
+                )
+            }
+
+
+# ── S3-compatible object store ─────────────────────────────────────────
+
+class ObjectNotFound(Exception):
+    """Raised by LocalObjectStore for a missing key, shaped like botocore's ClientError."""
+
+    def __init__(self, key: str):
+        super().__init__(f"NoSuchKey: {key}")
+        self.response = {"Error": {"Code": "NoSuchKey", "Message": key}}
+
+
+class LocalObjectStore:
+    """
+    Directory-backed stand-in for the part of the S3 client API the
+    repository uses (put/get/head object, list_objects_v2). Objects are
+    files under <root>/<bucket>/<key>, so several processes pointed at the
+    same directory share a bucket, like a local MinIO would.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        path = (self.root / bucket / key).resolve()
+        if not str(path).startswith(str((self.root / bucket).resolve()) + os.sep):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    @staticmethod
+    def _modified(path: Path) -> datetime:
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, Body.decode() if isinstance(Body, bytes) else Body)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        try:
+            body = path.read_bytes()
+            return {"Body": io.BytesIO(body), "LastModified": self._modified(path)}
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            raise ObjectNotFound(Key)
+
+    def head_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        if not path.is_file():
+            raise ObjectNotFound(Key)
+        return {"LastModified": self._modified(path), "ContentLength": path.stat().st_size}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", ContinuationToken: Optional[str] = None,
+                        MaxKeys: int = 1000, **kwargs: Any) -> Dict[str, Any]:
+        base = self.root / Bucket
+        keys = []
+        if base.exists():
+            for path in base.rglob("*"):
+                key = path.relative_to(base).as_posix()
+                # Temp files of in-flight writes are not objects yet
+                if path.is_file() and key.startswith(Prefix) and not path.name.startswith("."):
+                    keys.append(key)
+        keys.sort()
+        if ContinuationToken:
+            keys = [k for k in keys if k > ContinuationToken]
+        page = keys[:MaxKeys]
+        response = {
+            "Contents": [{"Key": k, "LastModified": self._modified(base / k)} for k in page],
+            "KeyCount": len(page),
+            "IsTruncated": len(keys) > MaxKeys,
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+
+def _is_missing(error: Exception) -> bool:
+    code = str(getattr(error, "response", {}).get("Error", {}).get("Code", ""))
+    return code in ("NoSuchKey", "404", "NotFound")
+
+
+def create_s3_client(endpoint_url: str = WORKFLOW_S3_ENDPOINT_URL):
+    """
+    S3 client for the workflow bucket.
+
+    Args:
+        endpoint_url: Empty for AWS, an http(s) URL for MinIO and other
+                      S3-compatible servers, file:///path for LocalObjectStore
+
+    Returns:
+        A boto3 S3 client or a LocalObjectStore
+    """
+    if endpoint_url.startswith("file://"):
+        return LocalObjectStore(urlparse(endpoint_url).path)
+    try:
+        import boto3
+    except ImportError:
+        raise RuntimeError("WORKFLOW_STORAGE=s3 needs boto3 (pip install boto3), "
+                           "or a file:// WORKFLOW_S3_ENDPOINT_URL for the local stand-in")
+    # Credentials come from the usual AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY variables
+    return boto3.client("s3", endpoint_url=endpoint_url or None, region_name=WORKFLOW_S3_REGION)
+
+
+class S3WorkflowRepository(WorkflowRepository):
+    """Workflow files and run outcomes as objects in an S3-compatible bucket."""
+
+    name = "s3"
+
+    def __init__(self, client: Any = None, bucket: str = WORKFLOW_S3_BUCKET, prefix: str = WORKFLOW_S3_PREFIX):
+        self.client = client if client is not None else create_s3_client()
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, workflow_id: str, name: str) -> str:
+        return f"{self.prefix}{workflow_id}/{name}"
+
+    def _list(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            yield from page.get("Contents", [])
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
+
+    def write_files(self, workflow_id: str, files: Dict[str, str]) -> float:
+        for name, content in files.items():
+            self.client.put_object(Bucket=self.bucket, Key=self._key(workflow_id, name), Body=content.encode())
+        head = self.client.head_object(Bucket=self.bucket, Key=self._key(workflow_id, WORKFLOW_FILE))
+        return head["LastModified"].timestamp()
+
+    def read_file(self, workflow_id: str, name: str) -> Optional[str]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(workflow_id, name))
+        except Exception as e:
+            if _is_missing(e):
+                return None
+            raise
+        try:
+            return response["Body"].read().decode()
+        except UnicodeDecodeError as e:
+            print(f"⚠️ Unreadable {name} in workflow {workflow_id}: {e}")
+            return None
+
+    def exists(self, workflow_id: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(workflow_id, WORKFLOW_FILE))
+        except Exception as e:
+            if _is_missing(e):
+                return False
+            raise
+        return True
+
+    def append_run_event(self, workflow_id: str, event: Dict[str, Any]):
+        # Objects can't be appended to; one object per outcome, named to sort by time
+        key = self._key(workflow_id, f"runs/{event['at']:014.3f}-{event['run_id']}.json")
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=json.dumps(event).encode())
+
+    def read_run_log(self, workflow_id: str) -> List[Dict[str, Any]]:
+        events = []
+        for obj in self._list(self._key(workflow_id, "runs/")):
+            try:
+                body = self.client.get_object(Bucket=self.bucket, Key=obj["Key"])["Body"].read()
+                events.append(json.loads(body))
+            except Exception as e:
+                if not _is_missing(e):
+                    raise
+        return events
+
+    def versions(self) -> Dict[str, float]:
+        versions = {}
+        suffix = f"/{WORKFLOW_FILE}"
+        for obj in self._list(self.prefix):
+            key = obj["Key"][len(self.prefix):]
+            if key.endswith(suffix) and key.count("/") == 1:
+                versions[key[:-len(suffix)]] = obj["LastModified"].timestamp()
+        return versions
+
+
+# ── Selection ──────────────────────────────────────────────────────────
+
+_repository: Optional[WorkflowRepository] = None
+_repository_lock = threading.Lock()
+
+
+def create_repository(storage: Optional[str] = None) -> WorkflowRepository:
+    """
+    Build the repository for a storage backend.
+
+    Args:
+        storage: "filesystem", "sql" or "s3" (defaults to WORKFLOW_STORAGE)
+
+    Returns:
+        WorkflowRepository
+    """
+    storage = (storage or WORKFLOW_STORAGE).lower()
+    if storage == "filesystem":
+        return FilesystemWorkflowRepository()
+    if storage == "sql":
+        return SQLWorkflowRepository()
+    if storage == "s3":
+        return S3WorkflowRepository()
+    raise ValueError(f"Unknown workflow storage '{storage}'")
+
+
+def get_repository() -> WorkflowRepository:
+    """The repository selected by WORKFLOW_STORAGE, created on first use."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = create_repository()
+                print(f"✅ Workflow storage: {_repository.name}")
+    return _repository
+
+
+def set_repository(repository: WorkflowRepository):
+    """Swap the repository in use, e.g. to point benchmarks at another backend."""
+    global _repository
+    with _repository_lock:
+        _repository = repository
@@ -0,0 +1,216 @@
+"""
+Workflow Store Service
+Reads and writes saved workflows through the repository selected by
+WORKFLOW_STORAGE (see workflow_repository):
+
+- create_workflow writes airflow_dag.py before workflow.json, so a visible
+  workflow always has its DAG.
+- Run outcomes are appended to the workflow's run log instead of
+  rewriting workflow.json; read_workflow folds the log into the status it
+  returns.
+- Reads go through a per-worker TTL/LRU cache. Every entry remembers the
+  generation of its workflow ("workflow:<id>") it was loaded at; writes
+  bump that workflow's generation through shared_state, so with
+  STATE_BACKEND=sql the other workers drop their copies of it within
+  STATE_GENERATION_CACHE_SECONDS and keep every other workflow cached. Changes made behind
+  the app's back (manual edits) show up after WORKFLOW_CACHE_TTL_SECONDS.
+
+The functions block; async code calls them through asyncio.to_thread or
+read_workflow_async so the event loop is never stalled on storage I/O.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.db.shared_state import bump_generation, get_generation
+from app.services.cache import TTLCache
+from app.services.dag_graph import extract_graph, source_digest
+from app.services.workflow_repository import DAG_FILE, GRAPH_FILE, WORKFLOW_FILE, get_repository
+
+load_dotenv()
+
+# 0 disables the read cache
+WORKFLOW_CACHE_TTL_SECONDS = float(os.getenv("WORKFLOW_CACHE_TTL_SECONDS", "5"))
+WORKFLOW_CACHE_MAX_ENTRIES = int(os.getenv("WORKFLOW_CACHE_MAX_ENTRIES", "2000"))
+
+_cache = TTLCache("workflows", max_entries=WORKFLOW_CACHE_MAX_ENTRIES, ttl=WORKFLOW_CACHE_TTL_SECONDS)
+
+
+def new_workflow_id() -> str:
+    return f"wf_{uuid.uuid4().hex[:8]}"
+
+
+def _generation_key(workflow_id: str) -> str:
+    return f"workflow:{workflow_id}"
+
+
+def _invalidate(workflow_id: str):
+    """Drop a workflow's cached files here and in every other worker."""
+    for name in (WORKFLOW_FILE, DAG_FILE, GRAPH_FILE):
+        _cache.invalidate((workflow_id, name))
+    bump_generation(_generation_key(workflow_id))
+
+
+def _cached(workflow_id: str, name: str, loader, use_cache: bool) -> Any:
+    if not use_cache or WORKFLOW_CACHE_TTL_SECONDS <= 0:
+        return loader()
+    generation = get_generation(_generation_key(workflow_id))
+    cached = _cache.get((workflow_id, name))
+    if cached is not None and cached[0] == generation:
+        return copy.deepcopy(cached[1])
+    value = loader()
+    # Misses are not cached, so a workflow saved by another worker is seen at once
+    if value is not None:
+        _cache.set((workflow_id, name), (generation, copy.deepcopy(value)))
+    return value
+
+
+def create_workflow(workflow_id: str, data: Dict[str, Any], dag_python: str,
+                    extra_files: Optional[Dict[str, str]] = None) -> float:
+    """
+    Store a new workflow.
+    The DAG goes first, so a visible workflow.json always has its DAG.
+
+    Args:
+        workflow_id: Workflow ID
+        data: workflow.json payload
+        dag_python: airflow_dag.py source
+        extra_files: Further files to store with the workflow (name -> content)
+
+    Returns:
+        float: Version of the written workflow.json (its mtime on the filesystem backend)
+    """
+    files = {DAG_FILE: dag_python, **(extra_files or {}), WORKFLOW_FILE: json.dumps(data, indent=4)}
+    version = get_repository().write_files(workflow_id, files)
+    _invalidate(workflow_id)
+    return version
+
+
+def append_run_event(workflow_id: str, run_id: str, status: str, error: Optional[str] = None):
+    """
+    Append one run outcome to the workflow's run log.
+
+    Args:
+        workflow_id: Workflow that ran
+        run_id: Run (job) ID
+        status: "completed" or "failed"
+        error: Failure message
+    """
+    event = {"run_id": run_id, "status": status, "at": round(time.time(), 3)}
+    if error:
+        event["error"] = error[:500]
+    get_repository().append_run_event(workflow_id, event)
+    _invalidate(workflow_id)
+
+
+def read_run_log(workflow_id: str) -> List[Dict[str, Any]]:
+    """Run outcomes of a workflow, oldest first."""
+    return get_repository().read_run_log(workflow_id)
+
+
+def _load_workflow(workflow_id: str) -> Optional[Dict[str, Any]]:
+    repository = get_repository()
+    content = repository.read_file(workflow_id, WORKFLOW_FILE)
+    if content is None:
+        return None
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    data.setdefault("id", workflow_id)
+
+    runs = repository.read_run_log(workflow_id)
+    if runs:
+        if any(run["status"] == "completed" for run in runs):
+            data["status"] = "active"
+        data["last_run"] = runs[-1]
+        data["run_count"] = len(runs)
+    return data
+
+
+def read_workflow(workflow_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Load workflow.json with its run log folded in: a workflow that has
+    completed a run is "active", and last_run / run_count are added.
+
+    Args:
+        workflow_id: Workflow ID
+        use_cache: Serve from the read cache when possible
+
+    Returns:
+        dict: Workflow payload, or None if missing or unreadable
+    """
+    return _cached(workflow_id, WORKFLOW_FILE, lambda: _load_workflow(workflow_id), use_cache)
+
+
+def read_dag(workflow_id: str) -> Optional[str]:
+    """airflow_dag.py source of a workflow, or None if missing."""
+    return _cached(workflow_id, DAG_FILE, lambda: get_repository().read_file(workflow_id, DAG_FILE), True)
+
+
+def _load_graph(workflow_id: str) -> Optional[Dict[str, Any]]:
+    dag_python = read_dag(workflow_id)
+    if dag_python is None:
+        return None
+    try:
+        graph = json.loads(get_repository().read_file(workflow_id, GRAPH_FILE) or "null")
+    except json.JSONDecodeError:
+        graph = None
+    # Workflows saved before graphs were stored, or whose DAG was edited since
+    if not isinstance(graph, dict) or graph.get("source_sha256") != source_digest(dag_python):
+        graph = extract_graph(dag_python)
+    return graph
+
+
+def read_graph(workflow_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Task graph of a workflow's DAG (see dag_graph.extract_graph): the stored
+    graph.json, or extracted from airflow_dag.py when that is missing or stale.
+
+    Returns:
+        dict: Graph, or None if the workflow has no DAG
+    """
+    return _cached(workflow_id, GRAPH_FILE, lambda: _load_graph(workflow_id), True)
+
+
+def workflow_exists(workflow_id: str) -> bool:
+    return get_repository().exists(workflow_id)
+
+
+def workflow_versions() -> Dict[str, float]:
+    """Version of every stored workflow (workflow id -> version)."""
+    return get_repository().versions()
+
+
+def local_dag_path(workflow_id: str) -> Optional[Path]:
+    """
+    Local path of a workflow's airflow_dag.py for the DAG runner; DAGs of
+    remote backends are copied to WORKFLOW_LOCAL_DIR first.
+
+    Returns:
+        Path: DAG file, or None if the workflow has no DAG
+    """
+    return get_repository().local_path(workflow_id, DAG_FILE)
+
+
+async def read_workflow_async(workflow_id: str) -> Optional[Dict[str, Any]]:
+    return await asyncio.to_thread(read_workflow, workflow_id)
+
+
+def get_workflow_cache_stats() -> Dict[str, Any]:
+    """Storage backend and read cache statistics of this worker."""
+    return {
+        **_cache.stats(),
+        "storage": get_repository().name,
+        "ttl_seconds": WORKFLOW_CACHE_TTL_SECONDS,
+    }
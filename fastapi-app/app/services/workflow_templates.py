@@ -0,0 +1,266 @@
+"""
+Workflow Template Service
+Embeds the step lists of saved workflows so a new request that looks like
+an earlier one can start from that workflow instead of from scratch.
+
+Each workflow becomes one vector in the workflow_templates collection
+(cosine space), built from its originating prompt, name and steps. For a
+new prompt the closest template is looked up and, depending on
+WORKFLOW_TEMPLATE_MODE:
+
+- seed (default): above WORKFLOW_TEMPLATE_SEED_SIMILARITY the template's
+  steps and DAG are handed to the agent as a worked example, which it
+  adapts to the new request's parameters.
+- off: no lookups.
+
+New workflows are added as they are saved. A background thread
+(start_template_sync) reconciles the collection with the workflow index
+every WORKFLOW_TEMPLATE_SYNC_SECONDS so manual edits and deletions are
+picked up; lookups never sync inline.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.services.tracing import start_span, traced
+from app.services.workflow_index import indexed_mtimes
+from app.services.workflow_store import read_dag, read_workflow
+
+load_dotenv()
+
+WORKFLOW_TEMPLATE_MODE = os.getenv("WORKFLOW_TEMPLATE_MODE", "seed").lower()
+if WORKFLOW_TEMPLATE_MODE == "reuse":
+    # Copies kept the old request's parameters; the agent now always adapts the template
+    print("⚠️ WORKFLOW_TEMPLATE_MODE=reuse was removed, using seed")
+    WORKFLOW_TEMPLATE_MODE = "seed"
+if WORKFLOW_TEMPLATE_MODE not in ("off", "seed"):
+    raise ValueError(f"WORKFLOW_TEMPLATE_MODE must be 'off' or 'seed', got '{WORKFLOW_TEMPLATE_MODE}'")
+
+WORKFLOW_TEMPLATE_SEED_SIMILARITY = float(os.getenv("WORKFLOW_TEMPLATE_SEED_SIMILARITY", "0.75"))
+# 0: sync once at start only (saves still add their workflow)
+WORKFLOW_TEMPLATE_SYNC_SECONDS = float(os.getenv("WORKFLOW_TEMPLATE_SYNC_SECONDS", "30"))
+# Longer DAGs are cut when used as a seed to keep the prompt small
+WORKFLOW_TEMPLATE_MAX_DAG_CHARS = int(os.getenv("WORKFLOW_TEMPLATE_MAX_DAG_CHARS", "4000"))
+
+TEMPLATE_COLLECTION = "workflow_templates"
+_COLLECTION_METADATA = {"hnsw:space": "cosine"}
+
+_sync_lock = threading.Lock()
+_sync_thread: Optional[threading.Thread] = None
+_sync_stop = threading.Event()
+
+
+def _with_collection(operation):
+    from app.db.chroma import with_collection
+    return with_collection(TEMPLATE_COLLECTION, operation, metadata=_COLLECTION_METADATA)
+
+
+def _structured_steps(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Steps of a workflow.json, or [] when they were saved as free text (raw_info)."""
+    steps = data.get("steps")
+    if not isinstance(steps, list):
+        return []
+    return [s for s in steps if isinstance(s, dict)]
+
+
+def template_text(data: Dict[str, Any]) -> str:
+    """
+    Text embedded for a workflow: its prompt (when recorded), name and steps.
+
+    Args:
+        data: Parsed workflow.json content
+
+    Returns:
+        str: Text to embed, empty if the workflow has no structured steps
+    """
+    steps = _structured_steps(data)
+    if not steps:
+        return ""
+    parts = [data.get("prompt") or "", str(data.get("name", "")).replace("_", " ")]
+    for step in steps:
+        parts.append(f"{step.get('system', '')} {step.get('api', '')}: {step.get('description') or ''}".strip())
+    return "\n".join(p for p in parts if p)
+
+
+def _upsert(workflows: List[Dict[str, Any]], mtimes: Dict[str, float]):
+    """Embed and store workflows; ones without structured steps are dropped from the collection."""
+    from app.services.vector_service import encode_text
+
+    usable = [(wf, template_text(wf)) for wf in workflows]
+    unusable = [wf["id"] for wf, text in usable if not text]
+    usable = [(wf, text) for wf, text in usable if text]
+
+    if usable:
+        embeddings = encode_text([text for _, text in usable])
+        _with_collection(lambda c: c.upsert(
+            ids=[wf["id"] for wf, _ in usable],
+            embeddings=embeddings,
+            documents=[text for _, text in usable],
+            metadatas=[{
+                "name": str(wf.get("name", "Untitled")),
+                "step_count": len(_structured_steps(wf)),
+                "file_mtime": mtimes.get(wf["id"], 0.0),
+            } for wf, _ in usable],
+        ))
+    if unusable:
+        _with_collection(lambda c: c.delete(ids=unusable))
+
+
+def index_template(data: Dict[str, Any], file_mtime: float = 0.0):
+    """
+    Add or refresh one workflow in the template collection.
+    Call this after a workflow.json is written.
+
+    Args:
+        data: Workflow payload as written to disk
+        file_mtime: mtime of the written file
+    """
+    if WORKFLOW_TEMPLATE_MODE == "off" or not data.get("id"):
+        return
+    _upsert([data], {data["id"]: file_mtime})
+
+
+@traced("templates.sync")
+def sync_templates() -> Dict[str, int]:
+    """
+    Reconcile the template collection with the workflow index: embed
+    workflows that are new or changed since they were embedded and drop
+    deleted ones.
+
+    Returns:
+        dict: Counts of embedded and removed templates
+    """
+    with _sync_lock:
+        workflows = indexed_mtimes()
+        existing = _with_collection(lambda c: c.get(include=["metadatas"]))
+        embedded = {
+            wf_id: (meta or {}).get("file_mtime")
+            for wf_id, meta in zip(existing["ids"], existing["metadatas"])
+        }
+
+        changed = [wf_id for wf_id, mtime in workflows.items() if embedded.get(wf_id) != mtime]
+        payloads = [data for data in map(read_workflow, changed) if data is not None]
+        if payloads:
+            _upsert(payloads, workflows)
+
+        removed = [wf_id for wf_id in embedded if wf_id not in workflows]
+        if removed:
+            _with_collection(lambda c: c.delete(ids=removed))
+    return {"embedded": len(payloads), "removed": len(removed)}
+
+
+def _sync_loop():
+    # First pass here rather than in startup: it may embed the whole library
+    while True:
+        try:
+            result = sync_templates()
+            if result["embedded"] or result["removed"]:
+                print(f"✅ Workflow templates synced ({result['embedded']} embedded, {result['removed']} removed)")
+        except Exception as e:
+            print(f"⚠️ Workflow template sync failed: {e}")
+        if WORKFLOW_TEMPLATE_SYNC_SECONDS <= 0 or _sync_stop.wait(WORKFLOW_TEMPLATE_SYNC_SECONDS):
+            return
+
+
+def start_template_sync():
+    """
+    Reconcile the template collection with the workflow index in a
+    background thread, once at start and then every WORKFLOW_TEMPLATE_SYNC_SECONDS.
+    """
+    global _sync_thread
+    if WORKFLOW_TEMPLATE_MODE == "off" or _sync_thread is not None:
+        return
+    _sync_stop.clear()
+    _sync_thread = threading.Thread(target=_sync_loop, name="workflow-template-sync", daemon=True)
+    _sync_thread.start()
+
+
+def stop_template_sync():
+    """
+    Stop the background template sync thread
+    """
+    global _sync_thread
+    _sync_stop.set()
+    if _sync_thread is not None:
+        _sync_thread.join(timeout=2)
+        _sync_thread = None
+
+
+def rebuild_templates() -> Dict[str, int]:
+    """Drop the template collection and embed every indexed workflow again."""
+    from app.db.chroma import delete_collection
+    try:
+        delete_collection(TEMPLATE_COLLECTION)
+    except Exception as e:
+        print(f"Warning during template collection cleanup: {e}")
+    return sync_templates()
+
+
+@traced("templates.find")
+def find_template(prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Closest saved workflow for a prompt, if it clears WORKFLOW_TEMPLATE_SEED_SIMILARITY.
+
+    Args:
+        prompt: User prompt
+
+    Returns:
+        dict: workflow_id, name, similarity, steps, dag_python; or None
+    """
+    if WORKFLOW_TEMPLATE_MODE == "off":
+        return None
+
+    from app.services.vector_service import encode_text
+
+    query_vector = encode_text([prompt])
+    with start_span("chroma.query", {"collection": TEMPLATE_COLLECTION}):
+        results = _with_collection(lambda c: c.query(query_embeddings=query_vector, n_results=1))
+
+    if not results["ids"] or not results["ids"][0]:
+        return None
+    similarity = round(1 - float(results["distances"][0][0]), 4)
+    workflow_id = results["ids"][0][0]
+    data = read_workflow(workflow_id) if similarity >= WORKFLOW_TEMPLATE_SEED_SIMILARITY else None
+    if data is None:
+        return None
+
+    return {
+        "workflow_id": workflow_id,
+        "name": data.get("name", "Untitled"),
+        "prompt": data.get("prompt"),
+        "similarity": similarity,
+        "steps": _structured_steps(data),
+        "dag_python": read_dag(workflow_id) or "",
+    }
+
+
+def seed_prompt(template: Dict[str, Any]) -> str:
+    """
+    Few-shot block appended to the agent's input for a matching template.
+
+    Args:
+        template: find_template result
+
+    Returns:
+        str: Worked example for the agent
+    """
+    dag_python = template["dag_python"]
+    if len(dag_python) > WORKFLOW_TEMPLATE_MAX_DAG_CHARS:
+        dag_python = dag_python[:WORKFLOW_TEMPLATE_MAX_DAG_CHARS].rstrip() + "\n# ... (truncated)"
+    lines = [
+        f"A saved workflow '{template['name']}' ({template['workflow_id']}) matches this request "
+        f"(similarity {template['similarity']:.2f}). Use it as a starting point:",
+    ]
+    if template.get("prompt"):
+        lines.append(f"Its request: {template['prompt']}")
+    lines += [
+        f"Its steps: {json.dumps(template['steps'])}",
+        f"Its airflow_dag.py:\n```python\n{dag_python}\n```",
+        "The APIs in these steps exist; only search for capabilities they don't cover. "
+        "Adapt names and parameters to this request, then report feasibility and save it as a new workflow.",
+    ]
+    return "\n".join(lines)
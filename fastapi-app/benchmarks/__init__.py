@@ -0,0 +1,4 @@
+"""
+Benchmarks and load tests for the FastAPI backend.
+Run modules with `python -m benchmarks.<name>` from the fastapi-app directory.
+"""
@@ -0,0 +1,51 @@
+"""
+Agent loop overhead with an offline LLM.
+
+Drives `run_agent` end to end (tool calls or ReAct parsing, Chroma search,
+workflow persistence) with the fake LLM's canned transcript so everything
+except provider latency is measured. With --use-env and LLM_PROVIDER=replay
+a recorded Gemini cassette is replayed instead. Reports LLM calls per query
+alongside latency.
+"""
+
+from typing import Dict
+
+from benchmarks.stats import latency_summary, stopwatch
+from benchmarks.synthetic_catalog import generate_catalog
+
+PROMPT = "When a new user signs up, create their account and send them a welcome email"
+
+
+def run(iterations: int = None, catalog_size: int = None, quick: bool = False) -> Dict[str, Dict]:
+    from app.agents import open_router
+    from app.agents.llm_providers import LLM_PROVIDER
+    from benchmarks.stand_ins import index_catalog, reset_vectors
+
+    iterations = iterations or (3 if quick else 20)
+    catalog_size = catalog_size or (200 if quick else 2000)
+
+    reset_vectors()
+    index_catalog(generate_catalog(catalog_size))
+
+    latencies = []
+    llm_calls = []
+    prompt_tokens = []
+    for _ in range(iterations):
+        with stopwatch() as elapsed:
+            result = open_router.run_agent(PROMPT)
+        if not result["workflow_id"]:
+            raise RuntimeError(f"Agent run did not persist a workflow: {result['content'][:200]}")
+        latencies.append(elapsed["seconds"])
+        llm_calls.append(result["iterations"])
+        prompt_tokens.extend(result["prompt_tokens"])
+
+    summary = latency_summary(latencies)
+    summary["catalog_size"] = catalog_size
+    summary["mode"] = open_router.AGENT_MODE
+    summary["provider"] = LLM_PROVIDER
+    summary["llm_calls_per_query"] = sum(llm_calls) / len(llm_calls)
+    summary["prompt_tokens_per_call"] = round(sum(prompt_tokens) / len(prompt_tokens), 1)
+    print(f"🤖 agent run ({summary['provider']} LLM, {summary['mode']}): p50 {summary['p50_ms']}ms, "
+          f"p99 {summary['p99_ms']}ms, {summary['llm_calls_per_query']:.1f} LLM calls/query, "
+          f"{summary['prompt_tokens_per_call']} prompt tokens/call")
+    return summary
@@ -0,0 +1,76 @@
+"""
+DAG runner overhead.
+
+Generates no-op DAGs that are either wide (N independent tasks) or deep
+(a chain of N tasks) and measures `run_dag` wall time minus time spent
+inside the task callables, i.e. parsing, scheduling, XCom, stdout capture
+and tracing overhead.
+"""
+
+import os
+import tempfile
+from typing import Dict, List
+
+from benchmarks.stats import stopwatch
+
+DEFAULT_SIZES = [10, 100, 500]
+QUICK_SIZES = [10, 100]
+REPEATS = 3
+
+DAG_HEADER = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+
+
+def noop(**kwargs):
+    return kwargs.get("n", 0)
+
+
+with DAG("bench_{shape}_{size}", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+'''
+
+
+def build_dag_source(shape: str, size: int) -> str:
+    lines = [DAG_HEADER.format(shape=shape, size=size)]
+    for i in range(size):
+        lines.append(f"    t{i} = PythonOperator(task_id='t{i}', python_callable=noop, op_kwargs={{'n': {i}}})")
+    if shape == "deep":
+        for i in range(1, size):
+            lines.append(f"    t{i - 1} >> t{i}")
+    return "\n".join(lines) + "\n"
+
+
+def run(sizes: List[int] = None, quick: bool = False) -> Dict[str, Dict]:
+    from app.services.dag_runner import run_dag
+
+    sizes = sizes or (QUICK_SIZES if quick else DEFAULT_SIZES)
+    workdir = tempfile.mkdtemp(prefix="wfgen-bench-dag-")
+    results = {}
+
+    for shape in ("wide", "deep"):
+        for size in sizes:
+            path = os.path.join(workdir, f"{shape}_{size}.py")
+            with open(path, "w") as f:
+                f.write(build_dag_source(shape, size))
+
+            timings = []
+            for _ in range(REPEATS):
+                with stopwatch() as elapsed:
+                    outcome = run_dag(path)
+                if outcome["status"] != "completed":
+                    raise RuntimeError(f"{shape} DAG of {size} tasks failed: {outcome.get('error')}")
+                task_ms = sum(t["duration_ms"] for t in outcome["tasks"])
+                timings.append((elapsed["seconds"] * 1000, task_ms))
+
+            total_ms = min(t[0] for t in timings)
+            overhead_ms = min(t[0] - t[1] for t in timings)
+            results[f"{shape}_{size}"] = {
+                "shape": shape,
+                "tasks": size,
+                "total_ms": round(total_ms, 3),
+                "overhead_ms": round(overhead_ms, 3),
+                "overhead_per_task_ms": round(overhead_ms / size, 4),
+            }
+            print(f"🧩 {shape} DAG x{size}: {results[f'{shape}_{size}']['overhead_per_task_ms']}ms/task overhead")
+
+    return results
@@ -0,0 +1,58 @@
+"""
+CSV ingestion throughput.
+
+Runs the same background job the /csv/process-async endpoint schedules
+(transform -> embed -> existence scan -> upsert -> Chroma) over synthetic
+catalogs of increasing size and reports rows/s plus per-stage time.
+"""
+
+from typing import Dict, List
+
+from benchmarks.stats import stopwatch
+from benchmarks.synthetic_catalog import catalog_to_csv, generate_catalog
+
+DEFAULT_SIZES = [100, 1000, 5000]
+QUICK_SIZES = [50, 200]
+STAGES = ["transform", "embedding", "existence_scan", "mysql", "chroma"]
+
+
+def _stage_totals() -> Dict[str, float]:
+    from app.services.metrics import CSV_STAGE_SECONDS
+    return {stage: CSV_STAGE_SECONDS.summary(stage=stage)["sum"] for stage in STAGES}
+
+
+def run(sizes: List[int] = None, quick: bool = False) -> Dict[str, Dict]:
+    from app.api.csv import background_csv_processor
+    from app.services.job_service import JobService
+    from app.services.vector_service import encode_text
+    from benchmarks.stand_ins import reset_api_list, reset_vectors
+
+    sizes = sizes or (QUICK_SIZES if quick else DEFAULT_SIZES)
+    encode_text(["warm up the embedding model"])
+    results = {}
+
+    for size in sizes:
+        reset_api_list()
+        reset_vectors()
+        content = catalog_to_csv(generate_catalog(size))
+
+        before = _stage_totals()
+        job_id = JobService.create_job("csv_benchmark")
+        with stopwatch() as elapsed:
+            background_csv_processor(job_id, content, f"synthetic_{size}.csv")
+        after = _stage_totals()
+
+        job = JobService.get_job(job_id)
+        if job["status"] != "completed":
+            raise RuntimeError(f"Ingestion of {size} rows failed: {job.get('error')}")
+
+        results[str(size)] = {
+            "rows": size,
+            "seconds": round(elapsed["seconds"], 3),
+            "rows_per_s": round(size / elapsed["seconds"], 2),
+            "stages_s": {stage: round(after[stage] - before[stage], 3) for stage in STAGES},
+            "saved": job["result"]["mysql_saved"],
+        }
+        print(f"📥 ingestion {size} rows: {results[str(size)]['rows_per_s']} rows/s")
+
+    return results
@@ -0,0 +1,42 @@
+"""
+Re-index time versus catalog size.
+
+Loads api_list with N synthetic rows and times `reindex_all_apis`
+(MySQL read -> embed everything -> rebuild the Chroma collection).
+"""
+
+from typing import Dict, List
+
+from benchmarks.stats import stopwatch
+from benchmarks.synthetic_catalog import generate_catalog
+
+DEFAULT_SIZES = [1000, 5000, 20_000]
+QUICK_SIZES = [200, 1000]
+
+
+def run(sizes: List[int] = None, quick: bool = False) -> Dict[str, Dict]:
+    from app.services.vector_service import encode_text, reindex_all_apis
+    from benchmarks.stand_ins import load_api_list, reset_api_list, reset_vectors
+
+    sizes = sizes or (QUICK_SIZES if quick else DEFAULT_SIZES)
+    encode_text(["warm up the embedding model"])
+    results = {}
+
+    for size in sizes:
+        reset_api_list()
+        reset_vectors()
+        load_api_list(generate_catalog(size))
+
+        with stopwatch() as elapsed:
+            outcome = reindex_all_apis()
+        if outcome.get("count") != size:
+            raise RuntimeError(f"Re-index of {size} rows indexed {outcome.get('count')}")
+
+        results[str(size)] = {
+            "rows": size,
+            "seconds": round(elapsed["seconds"], 3),
+            "rows_per_s": round(size / elapsed["seconds"], 2),
+        }
+        print(f"♻️ reindex {size} rows: {results[str(size)]['seconds']}s")
+
+    return results
@@ -0,0 +1,67 @@
+"""
+Vector search latency and throughput.
+
+Indexes a synthetic catalog, then issues `search_similar` queries
+sequentially (p50/p99 latency) and from a thread pool (QPS).
+"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.stats import latency_summary, stopwatch
+from benchmarks.synthetic_catalog import VERBS, ENTITIES, generate_catalog
+
+QUERY_TEMPLATES = [
+    "{verb} {entity}",
+    "I need to {verb} a {entity} and notify the customer",
+    "workflow step that can {verb} {entity} records",
+]
+
+
+def _queries(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        rng.choice(QUERY_TEMPLATES).format(verb=rng.choice(VERBS)[0].lower(), entity=rng.choice(ENTITIES)[1])
+        for _ in range(count)
+    ]
+
+
+def _timed_search(query: str, top_k: int) -> float:
+    from app.services.vector_service import search_similar
+    with stopwatch() as elapsed:
+        search_similar(query, top_k=top_k)
+    return elapsed["seconds"]
+
+
+def run(catalog_size: int = None, queries: int = None, concurrency: int = 8,
+        top_k: int = 10, quick: bool = False) -> Dict[str, Dict]:
+    from benchmarks.stand_ins import index_catalog, reset_vectors
+
+    catalog_size = catalog_size or (500 if quick else 10_000)
+    queries = queries or (50 if quick else 500)
+
+    reset_vectors()
+    index_catalog(generate_catalog(catalog_size))
+    workload = _queries(queries)
+    _timed_search(workload[0], top_k)  # warm-up
+
+    sequential = [_timed_search(q, top_k) for q in workload]
+    seq_summary = latency_summary(sequential)
+    seq_summary["qps"] = round(len(sequential) / sum(sequential), 2)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        with stopwatch() as elapsed:
+            concurrent = list(pool.map(lambda q: _timed_search(q, top_k), workload))
+    conc_summary = latency_summary(concurrent)
+    conc_summary["qps"] = round(len(concurrent) / elapsed["seconds"], 2)
+    conc_summary["concurrency"] = concurrency
+
+    print(f"🔎 search over {catalog_size} APIs: p50 {seq_summary['p50_ms']}ms, "
+          f"p99 {seq_summary['p99_ms']}ms, {conc_summary['qps']} QPS @ {concurrency} threads")
+    return {
+        "catalog_size": catalog_size,
+        "top_k": top_k,
+        "sequential": seq_summary,
+        "concurrent": conc_summary,
+    }
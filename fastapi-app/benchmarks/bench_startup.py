@@ -0,0 +1,131 @@
+"""
+Cold-start profile.
+
+Imports `app.main` in a fresh interpreter under `-X importtime` and reports
+total import time plus the slowest modules and top-level packages. With
+--serve it also starts uvicorn and measures time until /live and /ready
+answer 200.
+
+Usage:
+    python -m benchmarks.bench_startup                   # import-time report
+    python -m benchmarks.bench_startup --serve --port 8099
+    python -m benchmarks.bench_startup --output /tmp/startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str = "app.main", top: int = 15) -> Dict:
+    """
+    Import `module` in a subprocess with -X importtime and summarise it.
+
+    Returns:
+        dict: total_s, top modules by self time, top packages by summed self time
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    total_us = next((cum for name, _, cum in rows if name == module), sum(r[1] for r in rows))
+    return {
+        "module": module,
+        "total_s": round(total_us / 1e6, 3),
+        "modules_imported": len(rows),
+        "top_self_ms": {name: round(us / 1000, 1) for name, us, _ in sorted(rows, key=lambda r: -r[1])[:top]},
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in sorted(packages.items(), key=lambda p: -p[1])[:top]},
+    }
+
+
+def _wait_for(client: httpx.Client, url: str, deadline: float) -> float:
+    while time.monotonic() < deadline:
+        try:
+            resp = client.get(url)
+        except httpx.TransportError:
+            resp = None
+        if resp is not None and resp.status_code == 200:
+            return time.monotonic()
+        if resp is not None and resp.status_code == 503 and resp.json().get("model", {}).get("status") == "failed":
+            raise RuntimeError(f"{url}: model failed to load: {resp.json()['model']['error']}")
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready before deadline")
+
+
+def time_to_serve(port: int = 8099, timeout: float = 180.0) -> Dict[str, float]:
+    """Start uvicorn and measure seconds until /live and /ready return 200."""
+    start = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=2.0) as client:
+            live = _wait_for(client, "/live", start + timeout)
+            ready = _wait_for(client, "/ready", start + timeout)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {"live_s": round(live - start, 3), "ready_s": round(ready - start, 3)}
+
+
+def run(quick: bool = False, serve: bool = False, port: int = 8099) -> Dict:
+    result = {"imports": profile_imports()}
+    if serve:
+        result["serve"] = time_to_serve(port)
+    print(f"⏱️ import app.main: {result['imports']['total_s']}s")
+    return result
+
+
+def _print_report(result: Dict):
+    imports = result["imports"]
+    print(f"\nimport {imports['module']}: {imports['total_s']}s ({imports['modules_imported']} modules)")
+    print("\nSlowest packages (self time, ms):")
+    for name, ms in imports["top_packages_ms"].items():
+        print(f"  {name:<40} {ms:>10.1f}")
+    print("\nSlowest modules (self time, ms):")
+    for name, ms in imports["top_self_ms"].items():
+        print(f"  {name:<40} {ms:>10.1f}")
+    if "serve" in result:
+        print(f"\n/live after {result['serve']['live_s']}s, /ready after {result['serve']['ready_s']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and startup profile")
+    parser.add_argument("--serve", action="store_true", help="Also time /live and /ready under uvicorn")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    result = run(serve=args.serve, port=args.port)
+    _print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
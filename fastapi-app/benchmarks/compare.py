@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files.
+
+Prints every numeric metric side by side with the relative change and flags
+regressions beyond a threshold. Latency-like metrics (*_ms, *seconds, *_s)
+are better when lower; throughput metrics (*_per_s, qps) when higher.
+Exits non-zero if any regression is flagged, so it can gate CI.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Optional
+
+HIGHER_IS_BETTER = ("_per_s", "qps")
+LOWER_IS_BETTER = ("_ms", "seconds", "_s")
+
+
+def _flatten(data, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix] = float(data)
+    return flat
+
+
+def _direction(metric: str) -> Optional[int]:
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    base = _flatten(baseline.get("results", {}))
+    cand = _flatten(candidate.get("results", {}))
+
+    print(f"Baseline:  {baseline['meta'].get('git_sha')}  ({args.baseline})")
+    print(f"Candidate: {candidate['meta'].get('git_sha')}  ({args.candidate})\n")
+    print(f"{'metric':<55} {'baseline':>12} {'candidate':>12} {'change':>9}")
+
+    regressions = []
+    for metric in sorted(set(base) & set(cand)):
+        direction = _direction(metric)
+        old, new = base[metric], cand[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if direction is not None and change * direction < -args.threshold:
+            flag = " ⚠️"
+            regressions.append(metric)
+        elif direction is not None and change * direction > args.threshold:
+            flag = " ✅"
+        print(f"{metric:<55} {old:>12.3f} {new:>12.3f} {change:>+8.1f}%{flag}")
+
+    missing = sorted(set(base) ^ set(cand))
+    if missing:
+        print(f"\nOnly in one file: {', '.join(missing)}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold}%")
+        sys.exit(1)
+    print("\n✅ No regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
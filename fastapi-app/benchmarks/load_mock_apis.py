@@ -0,0 +1,128 @@
+"""
+Load test for the mock UserSystem / PaymentSystem / NotificationSystem APIs.
+
+Fires concurrent requests at a running backend and reports throughput and
+latency percentiles. Run it once against a build that still uses the sync
+session and once against the async one to compare.
+
+Usage:
+    python -m benchmarks.load_mock_apis --base-url http://localhost:8001 \
+        --concurrency 50 --duration 20 --output results/load_async.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _seed_user(client: httpx.AsyncClient) -> str:
+    suffix = uuid.uuid4().hex[:8]
+    resp = await client.post("/api/user/create", json={
+        "username": f"load_{suffix}",
+        "email": f"load_{suffix}@example.com",
+    })
+    resp.raise_for_status()
+    return resp.json()["user_id"]
+
+
+def _scenarios(user_id: str) -> List[Dict]:
+    return [
+        {"method": "GET", "url": f"/api/user/{user_id}"},
+        {"method": "POST", "url": "/api/payment/process", "json": {"amount": 10.5, "currency": "USD"}},
+        {"method": "POST", "url": "/api/notification/email", "json": {
+            "email": "load@example.com", "subject": "Load test", "body": "ping"}},
+    ]
+
+
+async def _worker(client: httpx.AsyncClient, scenarios: List[Dict], deadline: float,
+                  latencies: Dict[str, List[float]], errors: Dict[str, int], offset: int):
+    i = offset
+    while time.perf_counter() < deadline:
+        scenario = scenarios[i % len(scenarios)]
+        i += 1
+        key = f"{scenario['method']} {scenario['url'].split('/')[2]}"
+        start = time.perf_counter()
+        try:
+            resp = await client.request(scenario["method"], scenario["url"], json=scenario.get("json"))
+            ok = resp.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if ok:
+            latencies.setdefault(key, []).append(elapsed_ms)
+        else:
+            errors[key] = errors.get(key, 0) + 1
+
+
+async def run_load_test(base_url: str, concurrency: int, duration: float) -> Dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        user_id = await _seed_user(client)
+        scenarios = _scenarios(user_id)
+
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _worker(client, scenarios, deadline, latencies, errors, n)
+            for n in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(all_latencies),
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(all_latencies, 50), 2),
+        "p99_ms": round(_percentile(all_latencies, 99), 2),
+        "per_endpoint": {
+            key: {
+                "requests": len(values),
+                "mean_ms": round(statistics.fmean(values), 2),
+                "p50_ms": round(_percentile(values, 50), 2),
+                "p99_ms": round(_percentile(values, 99), 2),
+                "errors": errors.get(key, 0),
+            }
+            for key, values in latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the mock system APIs")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--output", help="Optional path to write the JSON result")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.base_url, args.concurrency, args.duration))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
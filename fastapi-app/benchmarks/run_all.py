@@ -0,0 +1,88 @@
+"""
+Run the offline benchmark suite and write JSON results.
+
+Everything runs in-process against local stand-ins (ephemeral Chroma,
+SQLite, fake LLM), so numbers are comparable between commits on the same
+machine. Results land in benchmarks/results/<git sha>.json by default.
+
+Usage:
+    python -m benchmarks.run_all                     # full suite
+    python -m benchmarks.run_all --quick             # small sizes, for CI/smoke
+    python -m benchmarks.run_all --only search dag
+    python -m benchmarks.compare results/a.json results/b.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.stand_ins import configure_local_env
+
+BENCHMARKS = ["startup", "ingestion", "search", "reindex", "dag", "agent"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _git_sha() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run a subset of benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Use small sizes")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<sha>.json)")
+    parser.add_argument("--use-env", action="store_true",
+                        help="Keep exported DATABASE_URL/CHROMA_* etc. instead of the local stand-ins")
+    args = parser.parse_args()
+
+    workdir = configure_local_env(use_existing_env=args.use_env)
+
+    import importlib
+    from benchmarks.stand_ins import reset_api_list
+    reset_api_list()
+
+    sha = _git_sha()
+    report = {
+        "meta": {
+            "git_sha": sha,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "database_url": os.environ["DATABASE_URL"].split("@")[-1],
+            "chroma_mode": os.environ["CHROMA_MODE"],
+        },
+        "results": {},
+    }
+
+    failed = False
+    for name in args.only or BENCHMARKS:
+        print(f"\n▶️ Running {name} benchmark...")
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        try:
+            report["results"][name] = module.run(quick=args.quick)
+        except Exception as e:
+            failed = True
+            print(f"❌ {name} benchmark failed: {e}")
+            report["results"][name] = {"error": str(e)}
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{sha}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {output} (scratch dir: {workdir})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Local stand-ins for the benchmark suite.
+
+Points the app at an in-process ephemeral Chroma, a SQLite file in place of
+MySQL and a scratch workflows directory. Call configure_local_env() before
+importing anything from `app`.
+"""
+
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+API_LIST_DDL = """
+CREATE TABLE IF NOT EXISTS api_list (
+    id VARCHAR(36) PRIMARY KEY,
+    system_name VARCHAR(255) NOT NULL,
+    api_name VARCHAR(255) NOT NULL,
+    params_values TEXT,
+    return_values TEXT,
+    description VARCHAR(500),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def configure_local_env(workdir: Optional[str] = None, use_existing_env: bool = False) -> str:
+    """
+    Set the environment variables the app reads at import time.
+
+    Args:
+        workdir: Scratch directory (a temp dir by default)
+        use_existing_env: Keep already-exported values, e.g. to benchmark
+                          against a real MySQL container instead of SQLite
+
+    Returns:
+        str: The scratch directory in use
+    """
+    workdir = workdir or os.getenv("BENCH_WORKDIR") or tempfile.mkdtemp(prefix="wfgen-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.sqlite3")
+
+    values = {
+        "CHROMA_MODE": "ephemeral",
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "WORKFLOWS_DIR": os.path.join(workdir, "workflows"),
+        "WORKFLOW_INDEX_POLL_SECONDS": "0",
+        "CSV_UI_PACING": "false",
+        "LLM_PROVIDER": "fake",
+        # bench_agent repeats one prompt; templates would short-circuit the loop it measures
+        "WORKFLOW_TEMPLATE_MODE": "off",
+    }
+    for key, value in values.items():
+        if use_existing_env:
+            os.environ.setdefault(key, value)
+        else:
+            os.environ[key] = value
+    return workdir
+
+
+def reset_api_list():
+    """Drop and recreate the api_list table in the configured database."""
+    import sqlalchemy as sa
+    from app.db.mysql import engine
+
+    with engine.begin() as conn:
+        conn.execute(sa.text("DROP TABLE IF EXISTS api_list"))
+        conn.execute(sa.text(API_LIST_DDL))
+
+
+def load_api_list(records: List[Dict[str, Any]], batch_size: int = 5000):
+    """Bulk insert catalog records straight into api_list."""
+    import json
+    import sqlalchemy as sa
+    from app.db.mysql import engine
+
+    sql = sa.text("""
+        INSERT INTO api_list (id, system_name, api_name, params_values, return_values, description)
+        VALUES (:id, :system_name, :api_name, :params_values, :return_values, :description)
+    """)
+    for i in range(0, len(records), batch_size):
+        chunk = [
+            {
+                **{k: r[k] for k in ("id", "system_name", "api_name", "description")},
+                "params_values": json.dumps(r.get("params_values", {})),
+                "return_values": json.dumps(r.get("return_values", {})),
+            }
+            for r in records[i:i + batch_size]
+        ]
+        with engine.begin() as conn:
+            conn.execute(sql, chunk)
+
+
+def reset_vectors():
+    """Wipe the in-process Chroma instance."""
+    from app.db.chroma import reset_chroma
+    reset_chroma()
+
+
+def index_catalog(records: List[Dict[str, Any]], batch_size: int = 1000):
+    """Embed catalog records and store them in Chroma, in batches."""
+    from app.services.csv_service import CSVService
+    from app.services.vector_service import encode_text, store_in_chroma
+
+    for i in range(0, len(records), batch_size):
+        chunk = records[i:i + batch_size]
+        store_in_chroma(chunk, encode_text(CSVService.prepare_api_texts(chunk)))
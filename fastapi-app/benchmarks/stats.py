@@ -0,0 +1,37 @@
+"""Small helpers shared by the benchmark modules."""
+
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    """p50/p99/mean/max in milliseconds for a list of latencies in seconds."""
+    ms = [v * 1000 for v in latencies_s]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+@contextmanager
+def stopwatch():
+    """Yields a dict whose "seconds" key is filled in when the block exits."""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
@@ -0,0 +1,138 @@
+"""
+Synthetic API catalog generator.
+
+Scales unstructured_data/mockApi.csv up to any size (e.g. 100k rows) by
+combining systems, verbs and entities into plausible, distinct APIs. Output
+is deterministic for a given seed so results are comparable across commits.
+
+Usage:
+    python -m benchmarks.synthetic_catalog --rows 100000 --output /tmp/catalog.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+SEED_CSV = Path(__file__).resolve().parent.parent.parent / "unstructured_data" / "mockApi.csv"
+
+SYSTEMS = [
+    "UserSystem", "PaymentSystem", "NotificationSystem", "BillingSystem", "InventorySystem",
+    "OrderSystem", "ShippingSystem", "CRMSystem", "SupportSystem", "AnalyticsSystem",
+    "HRSystem", "PayrollSystem", "AuthSystem", "CatalogSystem", "PricingSystem",
+    "MarketingSystem", "LoyaltySystem", "ReportingSystem", "ComplianceSystem", "DocumentSystem",
+    "SchedulingSystem", "WarehouseSystem", "ProcurementSystem", "LedgerSystem", "TaxSystem",
+]
+VERBS = [
+    ("Create", "create a new"), ("Get", "get details of a"), ("Update", "update an existing"),
+    ("Delete", "delete a"), ("List", "list all"), ("Search", "search for a"),
+    ("Approve", "approve a"), ("Cancel", "cancel a"), ("Export", "export a"), ("Sync", "synchronise a"),
+]
+ENTITIES = [
+    ("User", "user"), ("Account", "account"), ("Invoice", "invoice"), ("Order", "order"),
+    ("Payment", "payment"), ("Refund", "refund"), ("Shipment", "shipment"), ("Ticket", "support ticket"),
+    ("Product", "product"), ("Coupon", "coupon"), ("Subscription", "subscription"), ("Employee", "employee"),
+    ("Payslip", "payslip"), ("Report", "report"), ("Document", "document"), ("Appointment", "appointment"),
+    ("Lead", "sales lead"), ("Campaign", "marketing campaign"), ("Warehouse", "warehouse"), ("Supplier", "supplier"),
+]
+PARAM_TYPES = ["string", "number", "boolean"]
+
+
+def _read_seed_rows() -> List[Dict[str, Any]]:
+    with open(SEED_CSV, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["params_values"] = json.loads(row["params_values"])
+        row["return_values"] = json.loads(row["return_values"])
+    return rows
+
+
+def generate_catalog(rows: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Build `rows` catalog records, starting with the real mock APIs.
+
+    Args:
+        rows: Number of records to produce
+        seed: RNG seed (same seed, same catalog)
+
+    Returns:
+        list: Records shaped like api_list rows
+    """
+    rng = random.Random(seed)
+    seed_rows = _read_seed_rows()
+    records: List[Dict[str, Any]] = []
+
+    for row in seed_rows[:rows]:
+        records.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "system_name": row["system_name"],
+            "api_name": row["api_name"],
+            "params_values": row["params_values"],
+            "return_values": row["return_values"],
+            "description": row["description"],
+        })
+
+    combos = len(SYSTEMS) * len(VERBS) * len(ENTITIES)
+    n = 0
+    while len(records) < rows:
+        system = SYSTEMS[n % len(SYSTEMS)]
+        verb, verb_text = VERBS[(n // len(SYSTEMS)) % len(VERBS)]
+        entity, entity_text = ENTITIES[(n // (len(SYSTEMS) * len(VERBS))) % len(ENTITIES)]
+        version = n // combos
+        api_name = f"{verb}{entity}" + (f"V{version + 1}" if version else "")
+
+        params = [
+            {"name": f"{entity.lower()}_id" if verb != "Create" else "name", "type": "string", "required": True}
+        ] + [
+            {"name": f"field_{k}", "type": rng.choice(PARAM_TYPES), "required": rng.random() < 0.3}
+            for k in range(rng.randint(0, 3))
+        ]
+        records.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "system_name": system,
+            "api_name": api_name,
+            "params_values": params,
+            "return_values": {"status": "success", f"{entity.lower()}_id": "uuid"},
+            "description": f"API to {verb_text} {entity_text} in the {system.replace('System', '')} system"
+                           + (f" (v{version + 1})" if version else ""),
+        })
+        n += 1
+
+    return records
+
+
+def catalog_to_csv(records: List[Dict[str, Any]]) -> bytes:
+    """Serialise records in the same column layout as mockApi.csv."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=["id", "system_name", "api_name", "params_values",
+                                             "return_values", "description"])
+    writer.writeheader()
+    for r in records:
+        writer.writerow({
+            **r,
+            "params_values": json.dumps(r["params_values"]),
+            "return_values": json.dumps(r["return_values"]),
+        })
+    return buf.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic API catalog CSV")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(catalog_to_csv(generate_catalog(args.rows, args.seed)))
+    print(f"✅ Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
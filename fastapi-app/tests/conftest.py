@@ -0,0 +1,8 @@
+"""Point the app's storage at a scratch directory before any app module is imported."""
+
+import os
+
+from benchmarks.stand_ins import configure_local_env
+
+configure_local_env()
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
@@ -0,0 +1,46 @@
+"""A malformed native tool call is fed back to the model instead of failing the query."""
+
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.agents import open_router
+
+
+class _ScriptedChatModel(BaseChatModel):
+    """Returns the scripted messages in order."""
+
+    script: List[AIMessage]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "_ScriptedChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        message = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def test_malformed_tool_call_is_retried(monkeypatch):
+    malformed = AIMessage(content="", additional_kwargs={"tool_calls": [{
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "search_apis", "arguments": "{not json"},
+    }]})
+    model = _ScriptedChatModel(script=[malformed, AIMessage(content="Not feasible.")])
+    monkeypatch.setattr(open_router, "get_llm", lambda: model)
+
+    executor = open_router.get_tool_calling_executor()
+    response = executor.invoke({"input": "send an email"})
+
+    assert response["output"] == "Not feasible."
+    assert model.calls == 2
+    assert open_router._collect_results(response["intermediate_steps"])["parse_errors"] == 1
@@ -0,0 +1,55 @@
+"""with_collection retries and stale-handle refresh, against a fake collection resolver."""
+
+import httpx
+import pytest
+
+from app.db import chroma
+
+
+class _Collection:
+    def count(self):
+        return 3
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    monkeypatch.setattr(chroma.time, "sleep", lambda seconds: None)
+
+
+def test_transport_error_while_resolving_is_retried(monkeypatch):
+    calls = []
+
+    def resolve(name, metadata=None):
+        calls.append(name)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused")
+        return _Collection()
+
+    monkeypatch.setattr(chroma, "get_or_create_collection", resolve)
+    assert chroma.with_collection("api_vectors", lambda c: c.count()) == 3
+    assert len(calls) == 2
+
+
+def test_retries_are_bounded(monkeypatch):
+    def resolve(name, metadata=None):
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(chroma, "get_or_create_collection", resolve)
+    with pytest.raises(httpx.ConnectError):
+        chroma.with_collection("api_vectors", lambda c: c.count(), max_retries=2)
+
+
+def test_stale_handle_is_refreshed_once(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(chroma, "get_or_create_collection", lambda name, metadata=None: _Collection())
+    monkeypatch.setattr(chroma, "invalidate_collection", invalidated.append)
+    attempts = []
+
+    def operation(collection):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("Collection api_vectors does not exist.")
+        return collection.count()
+
+    assert chroma.with_collection("api_vectors", operation) == 3
+    assert invalidated == ["api_vectors"]
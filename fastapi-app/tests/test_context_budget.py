@@ -0,0 +1,94 @@
+"""Search-result budgeting and scratchpad compression for the agent."""
+
+from langchain_core.agents import AgentAction
+
+from app.agents.context_budget import (
+    ContextBudget,
+    budget_scope,
+    compress_steps,
+    current_budget,
+)
+
+
+def _hit(system, api, distance=0.1, description="Does a thing"):
+    return {"metadata": {"system_name": system, "api_name": api, "description": description},
+            "distance": distance}
+
+
+def _step(tool, observation):
+    return AgentAction(tool=tool, tool_input="q", log=f"Action: {tool}"), observation
+
+
+def test_search_results_stay_within_the_budget():
+    budget = ContextBudget(search_tokens=40)
+    text = budget.format_search_results([_hit("Pay", "charge"), _hit("Pay", "refund"), _hit("Mail", "send")])
+
+    assert "API: charge" in text
+    assert "Match Score: 90%" in text
+    assert text.count("System: ") == 2
+    assert "(1 more matches omitted" in text
+
+
+def test_best_hit_is_shown_even_when_it_exceeds_the_budget():
+    budget = ContextBudget(search_tokens=1)
+    text = budget.format_search_results([_hit("Pay", "charge", description="x" * 500), _hit("Pay", "refund")])
+
+    assert "API: charge" in text
+    assert "API: refund" not in text
+    # Long descriptions are cut before they reach the prompt
+    assert "x" * 161 not in text
+    assert "(1 more matches omitted" in text
+
+
+def test_repeated_hits_are_listed_by_name():
+    budget = ContextBudget()
+    budget.format_search_results([_hit("Pay", "charge")])
+    text = budget.format_search_results([_hit("Pay", "charge"), _hit("Mail", "send")])
+
+    assert "API: send" in text
+    assert "API: charge" not in text
+    assert "Also matched (already shown above): Pay.charge" in text
+
+
+def test_no_results():
+    assert ContextBudget().format_search_results([]).startswith("No similar APIs found")
+
+
+def test_budget_scope_isolates_queries():
+    with budget_scope() as budget:
+        assert current_budget() is budget
+        budget.format_search_results([_hit("Pay", "charge")])
+    with budget_scope():
+        assert "API: charge" in current_budget().format_search_results([_hit("Pay", "charge")])
+
+
+def test_older_observations_are_summarized():
+    search = "System: Pay | API: charge\nDescription: d\nMatch Score: 90%"
+    steps = [_step("search_apis", search), _step("other", "y" * 1000), _step("other", "recent"), _step("other", "newest")]
+
+    compressed = compress_steps(steps, keep_recent=2, budget_tokens=10_000)
+
+    assert compressed[0][1] == "[earlier search results: Pay.charge]"
+    assert compressed[1][1].endswith("… [truncated]")
+    assert len(compressed[1][1]) < 300
+    assert [obs for _, obs in compressed[2:]] == ["recent", "newest"]
+    # The actions themselves, and the caller's list, are untouched
+    assert [action for action, _ in compressed] == [action for action, _ in steps]
+    assert steps[1][1] == "y" * 1000
+
+
+def test_recent_observations_shrink_when_over_budget_except_the_newest():
+    steps = [_step("other", "a" * 2000), _step("other", "b" * 2000), _step("other", "c" * 2000)]
+
+    compressed = compress_steps(steps, keep_recent=2, budget_tokens=600)
+
+    assert compressed[1][1].endswith("… [truncated]")
+    assert compressed[2][1] == "c" * 2000
+    # Within budget, the recent observations stay verbatim
+    relaxed = compress_steps(steps, keep_recent=2, budget_tokens=10_000)
+    assert [obs for _, obs in relaxed[1:]] == ["b" * 2000, "c" * 2000]
+
+
+def test_fewer_steps_than_keep_recent():
+    steps = [_step("other", "only")]
+    assert compress_steps(steps, keep_recent=2) == steps
@@ -0,0 +1,178 @@
+"""Static task-graph extraction and save-time validation of airflow_dag.py sources."""
+
+import pytest
+
+from app.services import dag_graph
+from app.services.dag_graph import extract_graph, validate_for_save
+
+HEADER = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+'''
+
+
+def _dag(body: str, functions: str = "def a(**kwargs):\n    pass\n\n\ndef b(**kwargs):\n    pass\n\n\ndef c(**kwargs):\n    pass\n") -> str:
+    indented = "\n".join(f"    {line}" if line else "" for line in body.strip().splitlines())
+    return f"{HEADER}\n\n{functions}\n\nwith DAG('graph_dag', start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:\n{indented}\n"
+
+
+def _edges(graph):
+    return {(edge["upstream"], edge["downstream"]) for edge in graph["edges"]}
+
+
+def test_linear_chain():
+    source = _dag('''
+t1 = PythonOperator(task_id="a", python_callable=a)
+t2 = PythonOperator(task_id="b", python_callable=b)
+t3 = PythonOperator(task_id="c", python_callable=c)
+t1 >> t2 >> t3
+''')
+    graph = extract_graph(source)
+    assert graph["valid"] and graph["static"]
+    assert graph["dag_id"] == "graph_dag"
+    assert [task["task_id"] for task in graph["tasks"]] == ["a", "b", "c"]
+    assert _edges(graph) == {("a", "b"), ("b", "c")}
+    assert graph["order"] == ["a", "b", "c"]
+    assert graph["source_sha256"] == dag_graph.source_digest(source)
+
+
+def test_fan_out_and_left_shift():
+    graph = extract_graph(_dag('''
+t1 = PythonOperator(task_id="a", python_callable=a)
+t2 = PythonOperator(task_id="b", python_callable=b)
+t3 = PythonOperator(task_id="c", python_callable=c)
+t1 >> [t2, t3]
+t3 << t2
+'''))
+    assert graph["valid"]
+    assert _edges(graph) == {("a", "b"), ("a", "c"), ("b", "c")}
+    assert graph["order"] == ["a", "b", "c"]
+
+
+def test_set_upstream_and_set_downstream():
+    graph = extract_graph(_dag('''
+t1 = PythonOperator(task_id="a", python_callable=a)
+t2 = PythonOperator(task_id="b", python_callable=b)
+t3 = PythonOperator(task_id="c", python_callable=c)
+t1.set_downstream(t2)
+t3.set_upstream([t1, t2])
+'''))
+    assert graph["valid"] and graph["static"]
+    assert _edges(graph) == {("a", "b"), ("a", "c"), ("b", "c")}
+
+
+def test_cycle_is_an_error():
+    graph = extract_graph(_dag('''
+t1 = PythonOperator(task_id="a", python_callable=a)
+t2 = PythonOperator(task_id="b", python_callable=b)
+t3 = PythonOperator(task_id="c", python_callable=c)
+t1 >> t2 >> t3 >> t1
+'''))
+    assert not graph["valid"]
+    assert graph["order"] is None
+    assert any("Cycle" in error for error in graph["errors"])
+
+
+def test_callable_defined_after_the_dag_is_an_error():
+    source = (f"{HEADER}\n\nwith DAG('late', start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:\n"
+              "    PythonOperator(task_id='late', python_callable=later)\n\n\n"
+              "def later(**kwargs):\n    pass\n")
+    graph = extract_graph(source)
+    assert not graph["valid"]
+    assert any("before it is defined" in error for error in graph["errors"])
+
+
+def test_undefined_callable_is_an_error():
+    graph = extract_graph(_dag('PythonOperator(task_id="a", python_callable=missing)'))
+    assert any("'missing', which is not defined" in error for error in graph["errors"])
+
+
+def test_forward_reference_inside_a_function_is_fine():
+    source = (f"{HEADER}\n\ndef build():\n"
+              "    with DAG('factory', start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:\n"
+              "        PythonOperator(task_id='later', python_callable=later)\n"
+              "    return dag\n\n\n"
+              "def later(**kwargs):\n    pass\n\n\n"
+              "dag = build()\n")
+    graph = extract_graph(source)
+    assert graph["valid"], graph["errors"]
+    assert [task["task_id"] for task in graph["tasks"]] == ["later"]
+
+
+def test_loop_built_tasks_are_not_static():
+    graph = extract_graph(_dag('''
+previous = None
+for name in ["a", "b"]:
+    task = PythonOperator(task_id=f"step_{name}", python_callable=a)
+    if previous:
+        previous >> task
+    previous = task
+'''))
+    assert graph["valid"], graph["errors"]
+    assert not graph["static"]
+    assert graph["order"] is None
+    assert graph["tasks"] == []
+    assert any("computed at run time" in warning for warning in graph["warnings"])
+    assert not any("No tasks found" in warning for warning in graph["warnings"])
+
+
+def test_imports_the_shims_do_not_provide():
+    source = _dag('PythonOperator(task_id="a", python_callable=a)').replace(
+        "from datetime import datetime\n",
+        "from datetime import datetime\nfrom airflow.operators.bash import BashOperator\nfrom airflow.utils.dates import days_ago\n",
+    )
+    graph = extract_graph(source)
+    assert not graph["valid"]
+    unavailable = [error for error in graph["errors"] if "not available to the DAG runner" in error]
+    assert len(unavailable) == 2
+
+
+def test_duplicate_task_ids_and_missing_fields():
+    graph = extract_graph(_dag('''
+PythonOperator(task_id="a", python_callable=a)
+PythonOperator(task_id="a", python_callable=b)
+PythonOperator(task_id="c")
+PythonOperator(python_callable=c)
+'''))
+    errors = " | ".join(graph["errors"])
+    assert "duplicate task_id 'a'" in errors
+    assert "task 'c' has no python_callable" in errors
+    assert "has no task_id" in errors
+
+
+def test_dependency_on_something_that_is_not_a_task():
+    graph = extract_graph(_dag('''
+t1 = PythonOperator(task_id="a", python_callable=a)
+t1 >> ghost
+'''))
+    assert any("'ghost', which is not a task" in error for error in graph["errors"])
+
+
+def test_syntax_error():
+    graph = extract_graph("with DAG('broken' as dag:\n")
+    assert not graph["valid"]
+    assert graph["errors"][0].startswith("Syntax error on line 1")
+
+
+def test_strict_mode_rejects_and_warn_mode_keeps(monkeypatch):
+    broken = _dag('PythonOperator(task_id="a", python_callable=missing)')
+    monkeypatch.setattr(dag_graph, "DAG_VALIDATION_MODE", "strict")
+    with pytest.raises(ValueError, match="not defined"):
+        validate_for_save(broken)
+    monkeypatch.setattr(dag_graph, "DAG_VALIDATION_MODE", "warn")
+    assert not validate_for_save(broken)["valid"]
+
+
+def test_no_operator_fallback_dag_is_saved(monkeypatch):
+    from app.agents.agent_tools import _persist_workflow
+    from app.services.workflow_store import read_dag, read_graph
+
+    monkeypatch.setattr(dag_graph, "DAG_VALIDATION_MODE", "strict")
+    workflow_id = _persist_workflow("Free text", {"raw_info": "send an email"}, "")
+
+    assert "pass" in read_dag(workflow_id)
+    graph = read_graph(workflow_id)
+    assert graph["valid"]
+    assert graph["dag_id"] == workflow_id
+    assert graph["tasks"] == []
+    assert any("No tasks found" in warning for warning in graph["warnings"])
@@ -0,0 +1,57 @@
+"""Task memoization must not share results between DAGs that differ only in globals."""
+
+from app.services.dag_runner import clear_task_memo, run_dag
+
+DAG_TEMPLATE = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+
+USER_ID = "{user_id}"
+
+
+def get_user(**kwargs):
+    return {{"id": USER_ID}}
+
+
+with DAG("{dag_id}", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+    PythonOperator(task_id="get_user", python_callable=get_user, memoize_ttl=600)
+'''
+
+
+def _run(tmp_path, name, user_id, dag_id="memo_dag"):
+    path = tmp_path / name / "airflow_dag.py"
+    path.parent.mkdir()
+    path.write_text(DAG_TEMPLATE.format(user_id=user_id, dag_id=dag_id))
+    result = run_dag(str(path))
+    assert result["status"] == "completed"
+    return result["tasks"][0]
+
+
+def test_globals_are_part_of_the_memo_key(tmp_path):
+    clear_task_memo()
+    alice = _run(tmp_path, "a", "alice")
+    # Same dag_id, task and code; only the global differs
+    bob = _run(tmp_path, "b", "bob")
+    assert not bob.get("cached")
+    assert "bob" in bob["return_value"]
+    assert "alice" in alice["return_value"]
+
+
+def test_same_dag_file_reuses_the_result(tmp_path):
+    clear_task_memo()
+    path = tmp_path / "wf" / "airflow_dag.py"
+    path.parent.mkdir()
+    path.write_text(DAG_TEMPLATE.format(user_id="alice", dag_id="memo_dag"))
+    first = run_dag(str(path))["tasks"][0]
+    second = run_dag(str(path))["tasks"][0]
+    assert not first.get("cached")
+    assert second["cached"]
+    assert second["return_value"] == first["return_value"]
+
+
+def test_results_do_not_cross_dag_files(tmp_path):
+    clear_task_memo()
+    _run(tmp_path, "a", "alice")
+    # Identical source in another workflow folder
+    other = _run(tmp_path, "b", "alice")
+    assert not other.get("cached")
@@ -0,0 +1,103 @@
+"""Retry, timeout and checkpoint behaviour of the DAG runner."""
+
+import os
+import threading
+
+from app.services import dag_runner
+from app.services.dag_runner import checkpoint_path, run_dag
+
+TIMEOUT_DAG = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+import threading
+import time
+
+CALLS = []
+RELEASE = threading.Event()
+
+
+def charge(**kwargs):
+    CALLS.append(1)
+    RELEASE.wait(5)
+
+
+with DAG("timeout_dag", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+    PythonOperator(task_id="charge", python_callable=charge, retries=2,
+                   retry_delay=timedelta(seconds=0), execution_timeout=timedelta(seconds=0.2))
+'''
+
+FLAKY_DAG = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+
+CALLS = []
+
+
+def flaky(**kwargs):
+    CALLS.append(1)
+    if len(CALLS) < 2:
+        raise ValueError("first attempt fails")
+    return len(CALLS)
+
+
+with DAG("flaky_dag", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+    PythonOperator(task_id="flaky", python_callable=flaky, retries=2, retry_delay=timedelta(seconds=0))
+'''
+
+TWO_TASK_DAG = '''from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+
+
+def first(**kwargs):
+    return 1
+
+
+def second(**kwargs):
+    return kwargs["ti"].xcom_pull(task_ids="first") + 1
+
+
+with DAG("two_tasks", start_date=datetime(2025, 1, 1), schedule_interval=None) as dag:
+    a = PythonOperator(task_id="first", python_callable=first)
+    b = PythonOperator(task_id="second", python_callable=second)
+    a >> b
+'''
+
+
+def _write(tmp_path, source):
+    path = tmp_path / "wf" / "airflow_dag.py"
+    path.parent.mkdir()
+    path.write_text(source)
+    return str(path)
+
+
+def test_timed_out_attempt_is_not_retried(tmp_path):
+    result = run_dag(_write(tmp_path, TIMEOUT_DAG))
+    task = result["tasks"][0]
+    assert result["status"] == "failed"
+    assert task["attempts"] == 1
+    assert "execution_timeout" in task["error"]
+    # Let the abandoned callable finish
+    for thread in threading.enumerate():
+        if thread.name == "dag-task-charge":
+            thread.join(6)
+
+
+def test_failed_attempt_is_retried(tmp_path):
+    result = run_dag(_write(tmp_path, FLAKY_DAG))
+    task = result["tasks"][0]
+    assert result["status"] == "completed"
+    assert task["attempts"] == 2
+
+
+def test_unwritable_checkpoint_does_not_fail_the_run(tmp_path, monkeypatch):
+    def _no_space(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(dag_runner.pickle, "dump", _no_space)
+    dag_path = _write(tmp_path, TWO_TASK_DAG)
+    result = run_dag(dag_path, run_id="run_1")
+    assert result["status"] == "completed"
+    assert [task["status"] for task in result["tasks"]] == ["success", "success"]
+    checkpoint_dir = os.path.dirname(checkpoint_path(dag_path, "run_1"))
+    assert not any(name.endswith(".tmp") for name in os.listdir(checkpoint_dir))
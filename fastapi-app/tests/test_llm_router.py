@@ -0,0 +1,110 @@
+"""Backend ordering, failover and hedging of the LLM router."""
+
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents import llm_router
+from app.agents.llm_router import RoutedChatModel, _backend_stats, route_order
+
+
+class _Backend:
+    """Stand-in backend: answers with its name, fails, or waits for a release."""
+
+    def __init__(self, name, error=None, release=None):
+        self.name = name
+        self.error = error
+        self.release = release
+        self.calls = 0
+
+    def invoke(self, messages, stop=None, config=None, **kwargs):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error:
+            raise self.error
+        return AIMessage(content=self.name)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(llm_router, "_stats", {})
+    monkeypatch.setattr(llm_router, "LLM_ROUTER_MIN_SAMPLES", 2)
+
+
+def _measure(name, seconds, calls=2):
+    for _ in range(calls):
+        _backend_stats(name).record(seconds, ok=True)
+
+
+def _ask(model):
+    result = model._generate([HumanMessage(content="hi")])
+    generation = result.generations[0]
+    return generation.message.content, generation.generation_info["backend"]
+
+
+def test_unmeasured_backends_come_first_in_configured_order():
+    _measure("fast", 0.1)
+    assert route_order(["fast", "new_a", "new_b"]) == ["new_a", "new_b", "fast"]
+
+
+def test_measured_backends_are_ranked_by_median_latency():
+    _measure("slow", 2.0)
+    _measure("fast", 0.1)
+    _measure("medium", 0.5)
+    assert route_order(["slow", "fast", "medium"]) == ["fast", "medium", "slow"]
+
+
+def test_failing_backend_cools_down_and_goes_last():
+    _measure("fast", 0.1)
+    _measure("slow", 2.0)
+    for _ in range(3):
+        _backend_stats("fast").record(0.1, ok=False)
+
+    assert not _backend_stats("fast").healthy()
+    assert route_order(["fast", "slow"]) == ["slow", "fast"]
+
+
+def test_failover_to_the_next_backend():
+    broken = _Backend("broken", error=RuntimeError("503"))
+    spare = _Backend("spare")
+    model = RoutedChatModel(backends=[("broken", broken), ("spare", spare)], hedge=False)
+
+    assert _ask(model) == ("spare", "spare")
+    assert broken.calls == spare.calls == 1
+    assert _backend_stats("broken").snapshot()["error_rate"] == 1.0
+
+
+def test_last_error_is_raised_when_every_backend_fails():
+    model = RoutedChatModel(backends=[
+        ("a", _Backend("a", error=RuntimeError("first"))),
+        ("b", _Backend("b", error=RuntimeError("second"))),
+    ], hedge=False)
+
+    with pytest.raises(RuntimeError, match="second"):
+        _ask(model)
+
+
+def test_slow_primary_is_hedged(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_ROUTER_HEDGE_AFTER_SECONDS", 0.05)
+    release = threading.Event()
+    slow = _Backend("slow", release=release)
+    quick = _Backend("quick")
+    model = RoutedChatModel(backends=[("slow", slow), ("quick", quick)], hedge=True)
+
+    try:
+        assert _ask(model) == ("quick", "quick")
+        assert slow.calls == 1
+    finally:
+        release.set()
+
+
+def test_hedged_mode_fails_over_when_the_primary_errors(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_ROUTER_HEDGE_AFTER_SECONDS", 5)
+    model = RoutedChatModel(backends=[
+        ("broken", _Backend("broken", error=RuntimeError("503"))),
+        ("spare", _Backend("spare")),
+    ], hedge=True)
+
+    assert _ask(model) == ("spare", "spare")
@@ -0,0 +1,93 @@
+"""Sync and async paths of the mock system services, on SQLite."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.services.notification_service import NotificationService
+from app.services.payment_service import PaymentService
+from app.services.user_service import UserService
+
+SCHEMA = [
+    """CREATE TABLE mock_users (
+        id CHAR(36) PRIMARY KEY,
+        username VARCHAR(255) NOT NULL UNIQUE,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE mock_transactions (
+        id CHAR(36) PRIMARY KEY,
+        amount DECIMAL(10, 2) NOT NULL,
+        currency VARCHAR(10) NOT NULL,
+        status VARCHAR(50) DEFAULT 'completed',
+        transaction_type VARCHAR(50) DEFAULT 'payment',
+        refund_id CHAR(36) NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE mock_notifications (
+        id CHAR(36) PRIMARY KEY,
+        notification_type VARCHAR(50) NOT NULL,
+        recipient VARCHAR(255) NOT NULL,
+        subject VARCHAR(255) NULL,
+        message TEXT NOT NULL,
+        status VARCHAR(50) DEFAULT 'sent',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "mock.sqlite3"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_sync_services(session):
+    created = UserService.create_user_sync("alice", "alice@example.com", session)
+    assert created["status"] == "success"
+    assert UserService.get_user_sync(created["user_id"], session)["user"]["username"] == "alice"
+    assert UserService.get_user_sync("missing", session)["status"] == "error"
+
+    payment = PaymentService.process_payment_sync(12.5, "USD", session)
+    refund = PaymentService.refund_payment_sync(payment["transaction_id"], session)
+    assert refund["status"] == "success"
+    assert PaymentService.refund_payment_sync("missing", session)["status"] == "error"
+
+    assert NotificationService.send_email_sync("a@example.com", "Hi", "Body", session)["status"] == "sent"
+    assert NotificationService.send_sms_sync("+100", "Hi", session)["status"] == "sent"
+    counts = session.execute(text(
+        "SELECT notification_type, COUNT(*) FROM mock_notifications GROUP BY notification_type ORDER BY 1"
+    )).fetchall()
+    assert [tuple(row) for row in counts] == [("email", 1), ("sms", 1)]
+
+
+def test_async_and_sync_paths_share_the_data(db_path, session):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            created = await UserService.create_user("bob", "bob@example.com", db)
+            payment = await PaymentService.process_payment(3, "EUR", db)
+            refund = await PaymentService.refund_payment(payment["transaction_id"], db)
+        await engine.dispose()
+        return created, refund
+
+    created, refund = asyncio.run(scenario())
+    assert refund["status"] == "success"
+    assert UserService.get_user_sync(created["user_id"], session)["user"]["email"] == "bob@example.com"
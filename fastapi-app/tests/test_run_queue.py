@@ -0,0 +1,91 @@
+"""Claiming, lease expiry and shutdown of the durable run queue."""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.services import run_queue
+from app.services.job_service import JobService
+from app.services.run_queue import claim_next_run, enqueue_run, finish_run, get_run, workflow_runs
+from app.services.workflow_store import create_workflow, read_run_log
+
+
+@pytest.fixture(autouse=True)
+def _empty_queue():
+    with run_queue._get_engine().begin() as conn:
+        conn.execute(delete(workflow_runs))
+    run_queue._held_runs.clear()
+    yield
+    run_queue._held_runs.clear()
+
+
+def _expire(run_id, attempts=None):
+    values = {"lease_expires_at": time.time() - 1}
+    if attempts is not None:
+        values["attempts"] = attempts
+    with run_queue._get_engine().begin() as conn:
+        conn.execute(update(workflow_runs).where(workflow_runs.c.id == run_id).values(**values))
+
+
+def test_claims_by_priority_then_fifo():
+    low_first = enqueue_run("wf_q1")
+    high = enqueue_run("wf_q2", priority=5)
+    low_second = enqueue_run("wf_q3")
+
+    claimed = [claim_next_run()["id"] for _ in range(3)]
+    assert claimed == [high, low_first, low_second]
+    assert claim_next_run() is None
+
+
+def test_workflow_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(run_queue, "RUN_WORKFLOW_CONCURRENCY", 1)
+    first = enqueue_run("wf_limited")
+    second = enqueue_run("wf_limited")
+
+    assert claim_next_run()["id"] == first
+    assert claim_next_run() is None
+    finish_run(first, "completed")
+    assert claim_next_run()["id"] == second
+
+
+def test_expired_lease_is_reclaimed():
+    run_id = enqueue_run("wf_lease")
+    assert claim_next_run()["attempts"] == 1
+    assert claim_next_run() is None
+
+    _expire(run_id)
+    reclaimed = claim_next_run()
+    assert reclaimed["id"] == run_id
+    assert reclaimed["attempts"] == 2
+
+
+def test_run_is_failed_after_max_attempts():
+    create_workflow("wf_exhausted", {"name": "exhausted"}, "x = 1\n")
+    run_id = enqueue_run("wf_exhausted")
+    claim_next_run()
+    JobService.update_job(run_id, status="running")
+    _expire(run_id, attempts=run_queue.RUN_MAX_ATTEMPTS)
+
+    assert claim_next_run() is None
+    assert get_run(run_id)["status"] == "failed"
+    assert JobService.get_job(run_id)["status"] == "failed"
+    assert read_run_log("wf_exhausted")[-1]["run_id"] == run_id
+
+
+def test_stop_waits_for_all_threads_within_one_timeout(monkeypatch):
+    release = threading.Event()
+    threads = [threading.Thread(target=release.wait, daemon=True) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    monkeypatch.setattr(run_queue, "_pool", list(threads))
+
+    start = time.monotonic()
+    run_queue.stop_run_workers(timeout=0.3)
+    elapsed = time.monotonic() - start
+    release.set()
+    run_queue._pool_stop.clear()
+
+    assert elapsed < 0.9
+    assert run_queue._pool == []
@@ -0,0 +1,36 @@
+"""Index reconcile against the configured workflow storage."""
+
+import json
+
+from app.services.workflow_index import WORKFLOWS_DIR, indexed_mtimes, list_indexed_workflows, reconcile_index
+from app.services.workflow_store import create_workflow, read_workflow
+
+
+def _save(workflow_id, name):
+    create_workflow(workflow_id, {"id": workflow_id, "name": name, "steps": []}, "x = 1\n")
+
+
+def test_unreadable_workflow_does_not_stop_reconcile():
+    _save("wf_bad", "bad")
+    _save("wf_good", "good")
+    # Not valid UTF-8
+    (WORKFLOWS_DIR / "wf_bad" / "workflow.json").write_bytes(b'{"name": "\xff\xfe"}')
+
+    assert read_workflow("wf_bad", use_cache=False) is None
+    reconcile_index()
+    assert "wf_good" in indexed_mtimes()
+
+
+def test_non_object_workflow_json_is_unreadable():
+    _save("wf_list", "list")
+    (WORKFLOWS_DIR / "wf_list" / "workflow.json").write_text(json.dumps([1, 2]))
+    assert read_workflow("wf_list", use_cache=False) is None
+
+
+def test_default_order_is_by_id_like_the_directory_listing():
+    for workflow_id, created_at in (("wf_order_b", "2025-01-01"), ("wf_order_a", "2025-06-01")):
+        create_workflow(workflow_id, {"id": workflow_id, "name": workflow_id, "created_at": created_at}, "x = 1\n")
+    reconcile_index()
+    ids = [row["id"] for row in list_indexed_workflows()[0]]
+    assert ids == sorted(ids)
+    assert ids.index("wf_order_a") < ids.index("wf_order_b")
@@ -0,0 +1,77 @@
+"""Round trips through every workflow storage backend, and the store's read cache."""
+
+import pytest
+
+from app.services.workflow_repository import (
+    DAG_FILE,
+    WORKFLOW_FILE,
+    FilesystemWorkflowRepository,
+    S3WorkflowRepository,
+    SQLWorkflowRepository,
+    WorkflowRepository,
+    create_s3_client,
+    get_repository,
+)
+from app.services.workflow_store import append_run_event, create_workflow, read_workflow
+
+
+@pytest.fixture(params=["filesystem", "sql", "s3"])
+def repository(request, tmp_path) -> WorkflowRepository:
+    if request.param == "filesystem":
+        return FilesystemWorkflowRepository(tmp_path / "workflows")
+    if request.param == "sql":
+        return SQLWorkflowRepository(f"sqlite:///{tmp_path / 'workflows.sqlite3'}")
+    return S3WorkflowRepository(create_s3_client(f"file://{tmp_path / 'bucket'}"), bucket="workflows", prefix="wf/")
+
+
+def test_files_round_trip(repository):
+    version = repository.write_files("wf_1", {DAG_FILE: "x = 1\n", WORKFLOW_FILE: '{"name": "one"}'})
+
+    assert repository.read_file("wf_1", DAG_FILE) == "x = 1\n"
+    assert repository.read_file("wf_1", WORKFLOW_FILE) == '{"name": "one"}'
+    assert repository.read_file("wf_1", "missing.txt") is None
+    assert repository.read_file("wf_missing", WORKFLOW_FILE) is None
+    assert repository.exists("wf_1")
+    assert not repository.exists("wf_missing")
+    assert repository.versions() == {"wf_1": version}
+
+
+def test_rewrite_changes_the_version(repository):
+    first = repository.write_files("wf_1", {WORKFLOW_FILE: '{"name": "one"}'})
+    repository.write_files("wf_2", {WORKFLOW_FILE: '{"name": "two"}'})
+    second = repository.write_files("wf_1", {WORKFLOW_FILE: '{"name": "uno"}'})
+
+    assert second >= first
+    assert repository.read_file("wf_1", WORKFLOW_FILE) == '{"name": "uno"}'
+    assert set(repository.versions()) == {"wf_1", "wf_2"}
+
+
+def test_run_log_round_trip(repository):
+    repository.write_files("wf_1", {WORKFLOW_FILE: "{}"})
+    assert repository.read_run_log("wf_1") == []
+
+    repository.append_run_event("wf_1", {"run_id": "r1", "status": "failed", "at": 100.0, "error": "boom"})
+    repository.append_run_event("wf_1", {"run_id": "r2", "status": "completed", "at": 101.0})
+
+    runs = repository.read_run_log("wf_1")
+    assert [(run["run_id"], run["status"]) for run in runs] == [("r1", "failed"), ("r2", "completed")]
+    assert runs[0]["error"] == "boom"
+    assert repository.read_run_log("wf_other") == []
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        WorkflowRepository()
+
+
+def test_run_outcome_keeps_other_workflows_cached():
+    create_workflow("wf_cache_a", {"name": "a"}, "x = 1\n")
+    create_workflow("wf_cache_b", {"name": "b"}, "x = 1\n")
+    assert read_workflow("wf_cache_b")["name"] == "b"
+    # Edited behind the store's back: only a reload would see it
+    get_repository().write_files("wf_cache_b", {WORKFLOW_FILE: '{"name": "edited"}'})
+
+    append_run_event("wf_cache_a", "r1", "completed")
+    assert read_workflow("wf_cache_b")["name"] == "b"
+    # The workflow that ran is reloaded with its new outcome
+    assert read_workflow("wf_cache_a")["last_run"]["run_id"] == "r1"
@@ -0,0 +1,46 @@
+"""Template lookups stay off the sync path; the background thread does the syncing."""
+
+import threading
+
+from app.services import workflow_templates
+
+
+def test_find_template_does_not_sync_inline(monkeypatch):
+    monkeypatch.setattr(workflow_templates, "WORKFLOW_TEMPLATE_MODE", "seed")
+
+    def _sync():
+        raise AssertionError("find_template must not sync the collection")
+
+    monkeypatch.setattr(workflow_templates, "sync_templates", _sync)
+    monkeypatch.setattr("app.services.vector_service.encode_text", lambda texts: [[0.0]])
+    monkeypatch.setattr(workflow_templates, "_with_collection", lambda operation: {"ids": [[]], "distances": [[]]})
+    assert workflow_templates.find_template("send an email") is None
+
+
+def test_background_sync_runs_until_stopped(monkeypatch):
+    monkeypatch.setattr(workflow_templates, "WORKFLOW_TEMPLATE_MODE", "seed")
+    monkeypatch.setattr(workflow_templates, "WORKFLOW_TEMPLATE_SYNC_SECONDS", 0.01)
+    synced = threading.Event()
+    calls = []
+
+    def _sync():
+        calls.append(1)
+        if len(calls) >= 2:
+            synced.set()
+        return {"embedded": 0, "removed": 0}
+
+    monkeypatch.setattr(workflow_templates, "sync_templates", _sync)
+    workflow_templates.start_template_sync()
+    try:
+        assert synced.wait(5)
+    finally:
+        workflow_templates.stop_template_sync()
+    count = len(calls)
+    assert workflow_templates._sync_thread is None
+    assert len(calls) == count
+
+
+def test_off_mode_starts_no_thread(monkeypatch):
+    monkeypatch.setattr(workflow_templates, "WORKFLOW_TEMPLATE_MODE", "off")
+    workflow_templates.start_template_sync()
+    assert workflow_templates._sync_thread is None
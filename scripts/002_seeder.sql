@@ -39,4 +39,22 @@ INSERT INTO api_list (id, system_name, api_name, params_values, return_values, d
  '[{"name":"phone_number","type":"string","required":true},{"name":"message","type":"string","required":true}]',
  '{"status":"sent"}',
  'API to send an SMS notification',
- '2026-02-07 10:25:00');
+ '2026-02-07 10:25:00'),
+
+('7', 'UserSystem', 'CreateUserBatch',
+ '[{"name":"users","type":"array","required":true,"items":[{"name":"username","type":"string","required":true},{"name":"email","type":"string","required":true}]}]',
+ '{"status":"success","created":"number","failed":"number","results":[{"index":"number","status":"string","user_id":"uuid"}]}',
+ 'API to create many users in one request; use instead of CreateUser when a workflow creates users in a loop',
+ '2026-02-07 10:30:00'),
+
+('8', 'PaymentSystem', 'ProcessPaymentBatch',
+ '[{"name":"payments","type":"array","required":true,"items":[{"name":"amount","type":"number","required":true},{"name":"currency","type":"string","required":true}]}]',
+ '{"status":"success","count":"number","results":[{"index":"number","status":"string","transaction_id":"uuid"}]}',
+ 'API to process many payments in one request; use instead of ProcessPayment when a workflow charges a list of payments',
+ '2026-02-07 10:35:00'),
+
+('9', 'NotificationSystem', 'SendEmailBatch',
+ '[{"name":"emails","type":"array","required":true,"items":[{"name":"email","type":"string","required":true},{"name":"subject","type":"string","required":true},{"name":"body","type":"string","required":true}]}]',
+ '{"status":"sent","count":"number","results":[{"index":"number","status":"string","notification_id":"uuid"}]}',
+ 'API to send many email notifications in one request; use instead of SendEmail when a workflow notifies a list of recipients',
+ '2026-02-07 10:40:00');
@@ -0,0 +1,28 @@
+-- 004_shared_state.sql
+-- Shared state for multi-worker deployments (STATE_BACKEND=sql).
+-- The backend also creates these tables on first use; this script just
+-- makes them part of the initial schema.
+
+USE myapp;
+
+-- ----------------- Tables -----------------
+
+-- Background job records (CSV ingestion, workflow runs)
+CREATE TABLE IF NOT EXISTS shared_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    type VARCHAR(64) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    progress INT NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at VARCHAR(32) NOT NULL,
+    updated_at VARCHAR(32) NOT NULL,
+    INDEX ix_shared_jobs_created (created_at)
+);
+
+-- Cache generation counters; bumping one invalidates that cache in every worker
+CREATE TABLE IF NOT EXISTS cache_generations (
+    name VARCHAR(128) PRIMARY KEY,
+    generation INT NOT NULL DEFAULT 0,
+    updated_at DOUBLE NOT NULL DEFAULT 0
+);
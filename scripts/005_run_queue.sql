@@ -0,0 +1,23 @@
+-- 005_run_queue.sql
+-- Durable workflow run queue (RUN_QUEUE_URL pointing at MySQL).
+-- The backend also creates this table on first use.
+
+USE myapp;
+
+-- ----------------- Tables -----------------
+
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    id VARCHAR(36) PRIMARY KEY,
+    workflow_id VARCHAR(64) NOT NULL,
+    priority INT NOT NULL DEFAULT 0,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    lease_owner VARCHAR(128),
+    lease_expires_at DOUBLE,
+    enqueued_at DOUBLE NOT NULL,
+    started_at DOUBLE,
+    finished_at DOUBLE,
+    error TEXT,
+    INDEX ix_workflow_runs_claim (status, priority, enqueued_at),
+    INDEX ix_workflow_runs_workflow (workflow_id, status)
+);
@@ -0,0 +1,28 @@
+-- 006_workflow_storage.sql
+-- Workflow files and run outcomes (WORKFLOW_STORAGE=sql with
+-- WORKFLOW_STORAGE_URL pointing at MySQL).
+-- The backend also creates these tables on first use.
+
+USE myapp;
+
+-- ----------------- Tables -----------------
+
+-- workflow.json, airflow_dag.py, ... of each saved workflow
+CREATE TABLE IF NOT EXISTS workflow_files (
+    workflow_id VARCHAR(64) NOT NULL,
+    name VARCHAR(64) NOT NULL,
+    content MEDIUMTEXT NOT NULL,
+    updated_at DOUBLE NOT NULL,
+    PRIMARY KEY (workflow_id, name)
+);
+
+-- Append-only run log; the latest outcomes decide a workflow's status
+CREATE TABLE IF NOT EXISTS workflow_run_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    workflow_id VARCHAR(64) NOT NULL,
+    run_id VARCHAR(36) NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    at DOUBLE NOT NULL,
+    error TEXT,
+    INDEX ix_workflow_run_events_workflow (workflow_id, id)
+);